@@ -0,0 +1,99 @@
+# 批量修改状态与批量删除
+# 管理后台一次提交一组 id：先用一条 SELECT 找出存在的记录，再按批执行
+# UPDATE ... WHERE id IN (...) 或 DELETE(先删标签关联再删记录)，由调用方在同一事务中提交；
+# 不存在的 id 不影响其他 id，在逐条结果中标记为 not_found
+from typing import List
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from facets import STATUS_VALUES
+
+# 单次请求的 id 数量上限
+MAX_IDS = 1000
+
+# 每条语句 IN 列表的长度(SQLite 旧版本单条语句最多 999 个参数)
+BATCH_SIZE = 500
+
+
+# 批量修改状态的请求模型
+class BulkStatusRequest(BaseModel):
+    ids: List[int]
+    status: str
+
+
+# 批量删除的请求模型
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
+
+# 校验并去重 id 列表(保持提交顺序)，无效时抛出 ValueError
+def parse_ids(ids: List[int]) -> list:
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError("ids 不能为空")
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"单次最多处理 {MAX_IDS} 条记录")
+    return ids
+
+
+# 解析状态值，无效时抛出 ValueError
+def parse_status(status: str) -> int:
+    if status not in STATUS_VALUES:
+        raise ValueError("无效的状态值")
+    return STATUS_VALUES[status]
+
+
+# 按 BATCH_SIZE 切分 id(或其他参数)列表，每批对应一条 IN 查询
+def batches(values: list):
+    for start in range(0, len(values), BATCH_SIZE):
+        yield values[start:start + BATCH_SIZE]
+
+
+# 查询存在的记录，返回 {id: 行}；columns 为后续需要用到的列(如删除文件所需的 slug、category)
+async def find_existing(db: AsyncSession, model, ids: list, columns=()) -> dict:
+    existing = {}
+    for batch in batches(ids):
+        rows = (await db.execute(select(model.id, *columns).where(model.id.in_(batch)))).all()
+        existing.update((row.id, row) for row in rows)
+    return existing
+
+
+# 批量修改状态，返回存在的记录 {id: 行}(行中包含修改前的 status)；不提交事务
+async def update_status(db: AsyncSession, model, ids: list, status: int) -> dict:
+    existing = await find_existing(db, model, ids, [model.status])
+    for batch in batches(list(existing)):
+        await db.execute(
+            update(model).where(model.id.in_(batch)).values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+    return existing
+
+
+# 批量删除记录及其标签关联，返回被删除的记录 {id: 行}；不提交事务
+async def delete_items(db: AsyncSession, model, link_entity_column, ids: list, columns=()) -> dict:
+    existing = await find_existing(db, model, ids, columns)
+    for batch in batches(list(existing)):
+        await db.execute(delete(link_entity_column.class_).where(link_entity_column.in_(batch)))
+        await db.execute(
+            delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+    return existing
+
+
+# 生成响应: 按提交顺序逐条给出结果，存在的记录为 result，不存在的为 not_found
+# warnings 为 {id: 说明}，如 markdown 文件删除失败(数据库记录已删除)
+def report(ids: list, existing: dict, result: str, warnings: dict = None) -> dict:
+    warnings = warnings or {}
+    results = []
+    for item_id in ids:
+        entry = {"id": item_id, "result": result if item_id in existing else "not_found"}
+        if item_id in warnings:
+            entry["warning"] = warnings[item_id]
+        results.append(entry)
+    return {
+        "results": results,
+        "succeeded": len(existing),
+        "not_found": len(ids) - len(existing)
+    }
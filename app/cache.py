@@ -0,0 +1,45 @@
+# 进程内缓存
+# 按命名空间(articles、books、projects 等)存放计算结果，
+# 对应实体的写接口调用 invalidate() 使整个命名空间失效
+import os
+import threading
+
+# 每个命名空间最多保存的条目数，超出时淘汰最早写入的条目(搜索词、分页参数的组合不受限制)
+MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+_lock = threading.Lock()
+_store = {}  # 命名空间 -> {key: value}
+_versions = {}  # 命名空间 -> 版本号，每次失效自增
+
+
+# 获取命名空间当前版本号
+def version(namespace: str) -> int:
+    return _versions.get(namespace, 0)
+
+
+# 读取缓存，未命中时等待 factory() 返回的协程计算并写入
+async def get_or_set(namespace: str, key, factory):
+    with _lock:
+        entries = _store.get(namespace)
+        if entries is not None and key in entries:
+            return entries[key]
+        start_version = _versions.get(namespace, 0)
+
+    value = await factory()
+
+    with _lock:
+        # 计算期间命名空间已失效时不写入，避免缓存旧数据
+        if _versions.get(namespace, 0) == start_version:
+            entries = _store.setdefault(namespace, {})
+            if len(entries) >= MAX_ENTRIES:
+                entries.pop(next(iter(entries)))
+            entries[key] = value
+    return value
+
+
+# 使一个或多个命名空间的缓存失效
+def invalidate(*namespaces: str):
+    with _lock:
+        for namespace in namespaces:
+            _versions[namespace] = _versions.get(namespace, 0) + 1
+            _store.pop(namespace, None)
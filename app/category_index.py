@@ -0,0 +1,209 @@
+# 文章分类索引
+# 启动时扫描一次 knowledge 目录并常驻内存，之后由创建分类、保存文章、删除文章等写操作增量维护，
+# /api/articles/categories 直接读取预先计算好的分类列表和分类树。
+# 可选的后台轮询线程负责同步绕过接口直接修改文件夹的情况。
+import logging
+import os
+import threading
+
+import cache
+
+logger = logging.getLogger("category_index")
+
+# 与 articles.py 中的物理路径保持一致
+KNOWLEDGE_BASE_PATH = "../frontend/dist/articles/knowledge"
+
+# 不计入文章的特殊文件
+EXCLUDED_FILES = {'README.md', '.gitkeep', 'index.md'}
+
+_lock = threading.Lock()
+_categories = {}  # 分类路径 -> 该文件夹下的 markdown 文件名集合
+_loaded = False
+_dirty = True
+_snapshot = {"categories": [], "tree": []}
+_watcher = None
+_stop_event = threading.Event()
+
+
+# 过滤隐藏文件夹、系统文件夹和 assets 文件夹
+def _is_visible_dir(name: str) -> bool:
+    return not name.startswith('.') and name != '__pycache__' and name != 'assets'
+
+
+# 判断是否为需要统计的 markdown 文件
+def _is_article_file(name: str) -> bool:
+    return name.endswith('.md') and name not in EXCLUDED_FILES and not name.startswith('.')
+
+
+# 扫描物理文件夹，返回 {分类路径: markdown 文件名集合}
+def _scan() -> dict:
+    categories = {}
+    abs_base_path = os.path.abspath(KNOWLEDGE_BASE_PATH)
+
+    # 确保基础路径存在
+    os.makedirs(abs_base_path, exist_ok=True)
+
+    for root, dirs, files in os.walk(abs_base_path):
+        dirs[:] = [d for d in dirs if _is_visible_dir(d)]
+
+        rel_path = os.path.relpath(root, abs_base_path)
+        # 跳过根目录本身
+        if rel_path == '.':
+            continue
+
+        category_path = rel_path.replace(os.sep, '/')
+        categories[category_path] = {f for f in files if _is_article_file(f)}
+
+    return categories
+
+
+# 分类路径及其所有上级路径，如 a/b/c -> a, a/b, a/b/c
+def _with_parents(category_path: str):
+    parts = category_path.strip('/').split('/')
+    return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+# 重新计算分类列表和嵌套分类树，调用方需持有锁
+def _rebuild_snapshot():
+    global _snapshot, _dirty
+
+    categories = [
+        {"path": path, "count": len(files), "articles": sorted(files)}
+        for path, files in sorted(_categories.items())
+    ]
+
+    # 构建嵌套树，total 为包含子分类在内的文章总数
+    nodes = {}
+    roots = []
+    for cat in categories:
+        path = cat["path"]
+        node = {
+            "name": path.rsplit('/', 1)[-1],
+            "path": path,
+            "count": cat["count"],
+            "total": cat["count"],
+            "children": []
+        }
+        nodes[path] = node
+        parent = path.rsplit('/', 1)[0] if '/' in path else None
+        if parent in nodes:
+            nodes[parent]["children"].append(node)
+        else:
+            roots.append(node)
+
+    # 路径已排序，父节点总在子节点之前，倒序累加即可得到子树总数
+    for cat in reversed(categories):
+        path = cat["path"]
+        parent = path.rsplit('/', 1)[0] if '/' in path else None
+        if parent in nodes:
+            nodes[parent]["total"] += nodes[path]["total"]
+
+    _snapshot = {"categories": categories, "tree": roots}
+    _dirty = False
+
+
+# 全量加载索引(启动时调用)
+def load():
+    global _categories, _loaded, _dirty
+    scanned = _scan()
+    with _lock:
+        _categories = scanned
+        _loaded = True
+        _dirty = True
+    logger.info("文章分类索引加载完成，共 %s 个分类", len(scanned))
+
+
+def _ensure_loaded():
+    if not _loaded:
+        load()
+
+
+# 获取预计算的分类列表和分类树
+def snapshot() -> dict:
+    _ensure_loaded()
+    with _lock:
+        if _dirty:
+            _rebuild_snapshot()
+        return _snapshot
+
+
+# 新增分类文件夹(包括自动创建的上级文件夹)
+def add_category(category_path: str):
+    if not category_path:
+        return
+    _ensure_loaded()
+    global _dirty
+    with _lock:
+        for path in _with_parents(category_path):
+            _categories.setdefault(path, set())
+        _dirty = True
+    cache.invalidate("articles")
+
+
+# 记录新保存的文章文件
+def add_article(category_path: str, filename: str):
+    # 根目录下的文件不属于任何分类
+    if not category_path or not _is_article_file(filename):
+        return
+    _ensure_loaded()
+    global _dirty
+    with _lock:
+        for path in _with_parents(category_path):
+            _categories.setdefault(path, set())
+        _categories[category_path.strip('/')].add(filename)
+        _dirty = True
+    cache.invalidate("articles")
+
+
+# 移除已删除的文章文件
+def remove_article(category_path: str, filename: str):
+    if not category_path:
+        return
+    _ensure_loaded()
+    global _dirty
+    with _lock:
+        files = _categories.get(category_path.strip('/'))
+        if files is not None and filename in files:
+            files.discard(filename)
+            _dirty = True
+    cache.invalidate("articles")
+
+
+# 后台轮询：定期重新扫描，发现外部修改时替换索引
+def _poll(interval: float):
+    global _categories, _dirty
+    while not _stop_event.wait(interval):
+        try:
+            scanned = _scan()
+        except Exception as e:
+            logger.warning("轮询扫描文章分类失败: %s", e)
+            continue
+        with _lock:
+            changed = scanned != _categories
+            if changed:
+                _categories = scanned
+                _dirty = True
+        if changed:
+            # 分类接口的 ETag 依赖 articles 版本号
+            cache.invalidate("articles")
+            logger.info("检测到文章目录外部修改，已刷新分类索引")
+
+
+# 启动后台轮询线程，interval 为轮询间隔(秒)
+def start_watcher(interval: float):
+    global _watcher
+    if _watcher is not None or interval <= 0:
+        return
+    _stop_event.clear()
+    _watcher = threading.Thread(target=_poll, args=(interval,), name="category-index-watcher", daemon=True)
+    _watcher.start()
+    logger.info("文章分类索引轮询已启动，间隔 %s 秒", interval)
+
+
+def stop_watcher():
+    global _watcher
+    if _watcher is None:
+        return
+    _stop_event.set()
+    _watcher.join(timeout=5)
+    _watcher = None
@@ -0,0 +1,173 @@
+# /api/* 响应压缩中间件
+# 根据 Accept-Encoding 选择 brotli 或 gzip，小于最小长度的响应原样返回；
+# 流式响应(多段 body)逐段压缩并立即刷新，不会等待全部内容生成。
+# 单个路由可用 @exempt 装饰器关闭压缩，例如健康检查等极小的响应。
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只使用 gzip
+    brotli = None
+
+# 小于该长度(字节)的响应不压缩
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))  # 基准测试中 5 的耗时约为 gzip-6 的一半
+
+# 可压缩的响应类型
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+# 路由装饰器: 关闭该路由的响应压缩
+def exempt(endpoint):
+    endpoint.compression_exempt = True
+    return endpoint
+
+
+# 选择响应编码，优先 brotli
+def choose_encoding(accept_encoding: str):
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+# 流式压缩器，compress() 返回已可发送的数据，finish() 返回剩余数据
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 输出 gzip 格式
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+    # 一次性压缩完整响应体
+    def compress_all(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, path_prefix: str = "/api", minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] == "HEAD"
+                or not scope["path"].startswith(self.path_prefix)):
+            return await self.app(scope, receive, send)
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        responder = _CompressionResponder(scope, send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, scope, send, encoding: str, minimum_size: int):
+        self.scope = scope
+        self.upstream_send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+        self.streaming = False
+        self.buffer = []
+
+    # 路由、状态码和响应头是否允许压缩
+    def _should_compress(self, headers: Headers) -> bool:
+        endpoint = self.scope.get("endpoint")
+        if getattr(endpoint, "compression_exempt", False):
+            return False
+        if self.start_message["status"] < 200 or self.start_message["status"] in (204, 206, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return False
+        return True
+
+    def _set_encoding_headers(self, headers: MutableHeaders):
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # 压缩后的表示与原始内容不同，强 ETag 改为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 等到第一段 body 再决定是否压缩
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            # pathsend/zerocopysend 等扩展消息不压缩，先补发暂存的响应头，之后的消息全部直接转发
+            if not self.passthrough and self.compressor is None and self.start_message is not None:
+                self.passthrough = True
+                await self.upstream_send(self.start_message)
+            return await self.upstream_send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = Headers(raw=self.start_message["headers"])
+            if not self._should_compress(headers) or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.upstream_send(self.start_message)
+                return await self.upstream_send(message)
+
+            self.compressor = _Compressor(self.encoding)
+            # 长度已知的响应(内容已在内存中，如经过 BaseHTTPMiddleware 分段转发)收齐后整体压缩，保留 Content-Length；
+            # 长度未知的流式响应逐段压缩并刷新，改用分块传输
+            self.streaming = "content-length" not in headers
+            headers = MutableHeaders(raw=list(self.start_message["headers"]))
+            self.start_message["headers"] = headers.raw
+            self._set_encoding_headers(headers)
+            if self.streaming:
+                await self.upstream_send(self.start_message)
+
+        if not self.streaming:
+            self.buffer.append(body)
+            if more_body:
+                return
+            compressed = self.compressor.compress_all(b"".join(self.buffer))
+            MutableHeaders(raw=self.start_message["headers"])["content-length"] = str(len(compressed))
+            await self.upstream_send(self.start_message)
+            return await self.upstream_send({"type": "http.response.body", "body": compressed})
+
+        if more_body:
+            chunk = self.compressor.compress(body) if body else b""
+            if chunk:
+                await self.upstream_send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            tail = self.compressor.compress(body) if body else b""
+            await self.upstream_send({"type": "http.response.body", "body": tail + self.compressor.finish()})
@@ -7,9 +7,13 @@ from datetime import datetime
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 sys.path.append("..")
+import database
+import metrics
 from database import Admin, get_db
 
 load_dotenv()
@@ -45,8 +49,8 @@ def generate_token() -> str:
 
 
 # 验证管理员密码 - 哈希对比
-def verify_admin_password(db: Session, username: str, password: str) -> bool:
-    admin = db.query(Admin).filter(Admin.username == username).first()
+async def verify_admin_password(db: AsyncSession, username: str, password: str) -> bool:
+    admin = await db.scalar(select(Admin).where(Admin.username == username))
     if not admin:
         return False
 
@@ -55,7 +59,7 @@ def verify_admin_password(db: Session, username: str, password: str) -> bool:
     return input_password_hash == admin.password_hash
 
 
-# 创建管理员账户 - 使用哈希存储密码
+# 创建管理员账户 - 使用哈希存储密码(供 init_db.py 初始化脚本使用同步会话)
 def create_admin(db: Session, username: str, password: str):
     password_hash = hash_password(password)
     admin = Admin(username=username, password_hash=password_hash)
@@ -67,18 +71,18 @@ def create_admin(db: Session, username: str, password: str):
 
 # 管理员登录接口
 @router.post("/admin/login", response_model=AdminLoginResponse)
-async def admin_login(login_data: AdminLoginRequest, db: Session = Depends(get_db)):
+async def admin_login(login_data: AdminLoginRequest, db: AsyncSession = Depends(get_db)):
     try:
         # 验证用户名和密码
-        if verify_admin_password(db, login_data.username, login_data.password):
+        if await verify_admin_password(db, login_data.username, login_data.password):
             # 生成token
             token = generate_token()
 
             # 更新管理员的登录token
-            admin = db.query(Admin).filter(Admin.username == login_data.username).first()
+            admin = await db.scalar(select(Admin).where(Admin.username == login_data.username))
             admin.login_token = token
             admin.last_login = datetime.utcnow()
-            db.commit()
+            await db.commit()
 
             return AdminLoginResponse(
                 message="登录成功",
@@ -99,13 +103,13 @@ async def admin_login(login_data: AdminLoginRequest, db: Session = Depends(get_d
 
 # 管理员登出接口
 @router.post("/admin/logout")
-async def admin_logout(token: str, db: Session = Depends(get_db)):
+async def admin_logout(token: str, db: AsyncSession = Depends(get_db)):
     try:
         # 清除token
-        admin = db.query(Admin).filter(Admin.login_token == token).first()
+        admin = await db.scalar(select(Admin).where(Admin.login_token == token))
         if admin:
             admin.login_token = None
-            db.commit()
+            await db.commit()
 
         return {"message": "登出成功"}
     except Exception as e:
@@ -117,9 +121,9 @@ async def admin_logout(token: str, db: Session = Depends(get_db)):
 
 # 验证token有效性
 @router.get("/admin/verify")
-async def verify_token(token: str, db: Session = Depends(get_db)):
+async def verify_token(token: str, db: AsyncSession = Depends(get_db)):
     try:
-        admin = db.query(Admin).filter(Admin.login_token == token).first()
+        admin = await db.scalar(select(Admin).where(Admin.login_token == token))
         if admin:
             return {"message": "token有效", "username": admin.username}
         else:
@@ -132,3 +136,9 @@ async def verify_token(token: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="验证token时发生错误"
         )
+
+
+# 数据库连接池指标: 当前借出/溢出连接数及获取连接的等待时间，用于调整连接池大小；需携带 METRICS_TOKEN
+@router.get("/admin/metrics/pool", dependencies=[Depends(metrics.verify_token)])
+async def get_pool_metrics():
+    return database.pool_status()
@@ -1,24 +1,55 @@
 import sys
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 sys.path.append("..")
+import bulk
+import cache
+import category_index
 import database
+import dist_manifest
+import facets
+import fieldsets
+import listing
 from database import Article, Tag, ArticleTag
+from tagging import count_tags, filter_by_tags
 import logging
+import query_budget
+import responses
 from pydantic import BaseModel
 from typing import Optional, List
 import os
 from datetime import datetime
 import re
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("articles_api")
 
 router = APIRouter()
 
+# 列表接口可返回的字段(fields= 参数)及取值方式
+ARTICLE_FIELDS = {
+    "id": lambda article: article.id,
+    "title": lambda article: article.title,
+    "slug": lambda article: article.slug,
+    "summary": lambda article: article.summary,
+    "category": lambda article: article.category,
+    "date": lambda article: article.date.strftime('%Y-%m-%d') if article.date else None,
+    "tags": lambda article: [tag.name for tag in article.tags]
+}
+
+# 状态映射
+STATUS_NAMES = {0: 'draft', 1: 'published', 2: 'recycled'}
+
+# 管理员列表额外返回状态
+ADMIN_ARTICLE_FIELDS = {
+    **ARTICLE_FIELDS,
+    "status": lambda article: STATUS_NAMES.get(article.status, 'draft')
+}
+
 
 # 数据库请求模型
 class CreateArticleRequest(BaseModel):
@@ -50,86 +81,82 @@ class UpdateArticleRequest(BaseModel):
 
 # 文件分类树管理api
 # 获取所有文章分类树结构(基于物理文件夹)
+# 文章信息每 bulk.BATCH_SIZE 个 slug 一条查询，预算按不超过一批计算
 @router.get("/articles/categories")
-def get_article_categories():
-    logger.info("收到获取文章分类树的请求")
+@query_budget.budget(1)
+@responses.cached("articles")
+async def get_article_categories(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取文章分类树的请求")
     try:
-        # 扫描物理文件夹获取所有分类
-        physical_categories = scan_physical_categories()
-        logger.info(f"扫描到物理分类: {[cat['path'] for cat in physical_categories]}")
+        # 从常驻内存的分类索引读取物理分类，无需每次遍历文件夹
+        index = category_index.snapshot()
+        physical_categories = [cat for cat in index["categories"] if cat["path"]]  # 确保路径不为空
+
+        # 收集所有 (分类, slug)，按批集合查询取回已发布文章的信息，再在内存中按 (分类, slug) 合并
+        # slug 列表按 bulk.BATCH_SIZE 分批，避免分类树很大时超出数据库单条语句的参数上限
+        slugs = sorted({md_file[:-3] for cat in physical_categories for md_file in cat.get("articles", [])
+                        if md_file.endswith('.md')})
+        article_map = {}
+        for batch in bulk.batches(slugs):
+            rows = (await db.execute(select(
+                Article.slug, Article.category, Article.title, Article.summary, Article.date
+            ).where(
+                Article.slug.in_(batch),
+                Article.status == 1
+            ))).all()
+            article_map.update(((row.category, row.slug), row) for row in rows)
 
         # 构建分类树数据
         categories_data = []
 
         for cat in physical_categories:
-            if cat["path"]:  # 确保路径不为空
-                # 获取该分类下的文章信息
-                articles_info = []
-                for md_file in cat.get("articles", []):
-                    if md_file.endswith('.md'):
-                        article_slug = md_file[:-3]  # 移除.md扩展名
-                        # 从数据库获取文章详细信息
-                        try:
-                            db_session = database.SessionLocal()
-                            article = db_session.query(Article).filter(
-                                Article.slug == article_slug,
-                                Article.category == cat["path"],
-                                Article.status == 1
-                            ).first()
-                            
-                            if article:
-                                articles_info.append({
-                                    "slug": article.slug,
-                                    "title": article.title,
-                                    "summary": article.summary,
-                                    "date": article.date.strftime('%Y-%m-%d') if article.date else None
-                                })
-                            else:
-                                # 如果数据库中没有对应记录，使用文件名作为标题
-                                articles_info.append({
-                                    "slug": article_slug,
-                                    "title": article_slug.replace('-', ' ').title(),
-                                    "summary": None,
-                                    "date": None
-                                })
-                        except Exception as e:
-                            logger.warning(f"获取文章信息失败 {article_slug}: {str(e)}")
-                            articles_info.append({
-                                "slug": article_slug,
-                                "title": article_slug.replace('-', ' ').title(),
-                                "summary": None,
-                                "date": None
-                            })
-                        finally:
-                            if 'db_session' in locals():
-                                db_session.close()
-
-                categories_data.append({
-                    "path": cat["path"],
-                    "count": cat["count"],
-                    "articles": articles_info  # 返回详细的文章信息而不是文件名
-                })
-
-        logger.info(f"成功构建分类树，包含 {len(categories_data)} 个分类")
+            # 获取该分类下的文章信息
+            articles_info = []
+            for md_file in cat.get("articles", []):
+                if md_file.endswith('.md'):
+                    article_slug = md_file[:-3]  # 移除.md扩展名
+                    article = article_map.get((cat["path"], article_slug))
+
+                    if article:
+                        articles_info.append({
+                            "slug": article.slug,
+                            "title": article.title,
+                            "summary": article.summary,
+                            "date": article.date.strftime('%Y-%m-%d') if article.date else None
+                        })
+                    else:
+                        # 如果数据库中没有对应记录，使用文件名作为标题
+                        articles_info.append({
+                            "slug": article_slug,
+                            "title": article_slug.replace('-', ' ').title(),
+                            "summary": None,
+                            "date": None
+                        })
+
+            categories_data.append({
+                "path": cat["path"],
+                "count": cat["count"],
+                "articles": articles_info  # 返回详细的文章信息而不是文件名
+            })
+
+        logger.debug("成功构建分类树，包含 %s 个分类", len(categories_data))
         return {
             "categories": categories_data,
+            "tree": index["tree"],
             "total": len(categories_data)
         }
     except Exception as e:
-        logger.error(f"获取文章分类树时发生错误: {str(e)}")
+        logger.error("获取文章分类树时发生错误: %s", e)
         import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
-        # 出错时返回空分类列表
-        return {
-            "categories": [],
-            "total": 0
-        }
+        logger.error("详细错误信息: %s", traceback.format_exc())
+        # 抛出异常而不是返回空列表，避免空结果被 @responses.cached 缓存
+        raise HTTPException(status_code=500, detail=f"获取文章分类树时发生错误: {str(e)}")
 
 
 # 创建新的文章分类文件夹
 @router.post("/articles/categories")
-def create_category(request: CreateCategoryRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建分类文件夹请求: {request.name}")
+async def create_category(request: CreateCategoryRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建分类文件夹请求: %s", request.name)
     try:
         # 生成分类路径
         if not request.path:
@@ -159,12 +186,13 @@ def create_category(request: CreateCategoryRequest, db: Session = Depends(databa
 
         # 创建物理文件夹
         try:
-            create_physical_category_folder(path)
+            await run_in_threadpool(create_physical_category_folder, path)
+            category_index.add_category(path)
         except Exception as e:
-            logger.error(f"创建物理文件夹失败: {str(e)}")
+            logger.error("创建物理文件夹失败: %s", e)
             raise HTTPException(status_code=500, detail=f"创建文件夹失败: {str(e)}")
 
-        logger.info(f"成功创建分类文件夹: {request.name} -> {path}")
+        logger.info("成功创建分类文件夹: %s -> %s", request.name, path)
         return {
             "message": "分类文件夹创建成功",
             "name": request.name,
@@ -174,97 +202,166 @@ def create_category(request: CreateCategoryRequest, db: Session = Depends(databa
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"创建分类文件夹时发生错误: {str(e)}")
+        logger.error("创建分类文件夹时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建分类文件夹时发生错误: {str(e)}")
 
 
 # 文章获取api
-# 获取所有已发布文章，按日期倒序排列
+# 获取已发布文章，默认按日期倒序排列
+# fields 为逗号分隔的字段列表(如 slug,title,date)，只查询并返回这些字段
+# 筛选: tags 逗号分隔的标签(match=all/any)，category 分类及其子分类，date_from/date_to 日期范围(含两端)
+# 排序: sort=date_desc/date_asc/title_asc/title_desc/id_desc/id_asc
+# 分页: 传入 page/limit 按页码分页，传入 cursor 按游标分页；都不传时返回完整列表(兼容旧调用方)
 @router.get("/articles")
-def get_articles(db: Session = Depends(database.get_db)):
-    logger.info("收到获取文章数据的请求")
+@query_budget.budget(4)
+@responses.cached("articles")
+async def get_articles(
+    fields: str = None,
+    tags: str = None,
+    match: str = "all",
+    category: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    sort: str = "date_desc",
+    page: int = None,
+    limit: int = None,
+    cursor: str = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到获取文章数据的请求，字段: %s, 标签: %s, 分类: %s, 日期: %s ~ %s, 排序: %s, 页码: %s, 每页数量: %s, 游标: %s",
+                 fields, tags, category, date_from, date_to, sort, page, limit, cursor)
     try:
-        articles = db.query(Article).filter(Article.status == 1).order_by(Article.date.desc()).all()
-        logger.info(f"成功获取到 {len(articles)} 篇已发布文章")
+        if match not in ("all", "any"):
+            raise HTTPException(status_code=400, detail="match 参数只能为 all 或 any")
+        try:
+            requested = fieldsets.parse(fields, ARTICLE_FIELDS)
+            order_columns, descending = listing.sort_columns(Article, sort)
+            start = listing.parse_date(date_from, "date_from")
+            end = listing.parse_date(date_to, "date_to")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # 总数缓存的键，只与筛选条件有关
+        count_key = ("count", tags, match, category, date_from, date_to)
+
+        # 筛选条件全部在 SQL 中执行
+        query = select(Article).where(Article.status == 1)
+        if category:
+            query = listing.filter_category(query, Article.category, category)
+        query = listing.filter_date_range(query, Article.date, start, end)
+        if tags:
+            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+            if tag_list:
+                query = await filter_by_tags(db, query, Article.id, ArticleTag.article_id, tag_list, match_all=(match == "all"))
+
+        options = fieldsets.load_options(Article, requested, order_columns)
+
+        if page is None and limit is None and cursor is None:
+            articles = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            logger.debug("成功获取到 %s 篇已发布文章", len(articles))
+            return [fieldsets.serialize(article, ARTICLE_FIELDS, requested) for article in articles]
+
+        try:
+            articles, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                            page, limit, cursor, with_total, "articles", count_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 篇已发布文章", len(articles))
 
         # 转换为前端需要的格式
-        articles_data = []
-        for article in articles:
-            # 获取文章的标签
-            article_tags = db.query(Tag).join(ArticleTag).filter(ArticleTag.article_id == article.id).all()
-            tags = [tag.name for tag in article_tags]
-
-            article_dict = {
-                "id": article.id,
-                "title": article.title,
-                "slug": article.slug,
-                "summary": article.summary,
-                "category": article.category,
-                "date": article.date.strftime('%Y-%m-%d') if article.date else None,
-                "tags": tags
-            }
-            articles_data.append(article_dict)
-
-        return articles_data
+        return {
+            "data": [fieldsets.serialize(article, ARTICLE_FIELDS, requested) for article in articles],
+            "pagination": pagination
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取文章数据时发生错误: {str(e)}")
+        logger.error("获取文章数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取文章数据时发生错误: {str(e)}")
 
 
-# 管理员获取所有文章(包含所有状态)，按日期倒序排列
+# 管理员获取文章(包含所有状态)，默认按日期倒序排列
+# fields 参数同 /articles，另可选 status
+# 筛选: status(draft/published/recycled)、tags(match=all/any)、category 分类及其子分类、search 标题或摘要关键词
+# 传入 page/limit 时分页返回，并附带各状态、标签、分类的分面计数；都不传时返回完整列表(兼容旧调用方)
 @router.get("/admin/articles")
-def get_all_articles_admin(db: Session = Depends(database.get_db)):
-    logger.info("收到管理员获取全部文章数据的请求")
+@query_budget.budget(5)
+@responses.cached("articles")
+async def get_all_articles_admin(
+    fields: str = None,
+    status: str = None,
+    tags: str = None,
+    match: str = "all",
+    category: str = None,
+    search: str = None,
+    sort: str = "date_desc",
+    page: int = None,
+    limit: int = None,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到管理员获取文章数据的请求，字段: %s, 状态: %s, 标签: %s, 分类: %s, 搜索: %s, 排序: %s, 页码: %s, 每页数量: %s",
+                 fields, status, tags, category, search, sort, page, limit)
     try:
-        articles = db.query(Article).order_by(Article.date.desc()).all()
-        logger.info(f"成功获取到 {len(articles)} 篇文章（所有状态）")
+        try:
+            requested = fieldsets.parse(fields, ADMIN_ARTICLE_FIELDS)
+            order_columns, descending = listing.sort_columns(Article, sort)
+            # 文章表没有全文索引，关键词使用 LIKE 匹配
+            conditions = await facets.build_conditions(db, Article, ArticleTag.article_id, [Article.title, Article.summary],
+                                                       status=status, tags=tags, match=match, category=category,
+                                                       keyword=search, fulltext=False)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        query = select(Article).where(*conditions.values())
+        options = fieldsets.load_options(Article, requested, order_columns)
+
+        if page is None and limit is None:
+            articles = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            logger.debug("成功获取到 %s 篇文章（所有状态）", len(articles))
+            return [fieldsets.serialize(article, ADMIN_ARTICLE_FIELDS, requested) for article in articles]
+
+        count_key = ("admin_count", status, tags, match, category, search)
+        try:
+            articles, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                            page, limit, None, False, "articles", count_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        facet_counts = await facets.count_facets(db, Article, ArticleTag.article_id, conditions, Article.category)
+        logger.debug("成功获取到 %s 篇文章（所有状态），共 %s 篇", len(articles), pagination["total"])
 
         # 转换为前端需要的格式
-        articles_data = []
-        for article in articles:
-            # 获取文章的标签
-            article_tags = db.query(Tag).join(ArticleTag).filter(ArticleTag.article_id == article.id).all()
-            tags = [tag.name for tag in article_tags]
-
-            # 状态映射
-            status_map = {0: 'draft', 1: 'published', 2: 'recycled'}
-
-            article_dict = {
-                "id": article.id,
-                "title": article.title,
-                "slug": article.slug,
-                "summary": article.summary,
-                "category": article.category,
-                "date": article.date.strftime('%Y-%m-%d') if article.date else None,
-                "tags": tags,
-                "status": status_map.get(article.status, 'draft')
-            }
-            articles_data.append(article_dict)
-
-        return articles_data
+        return {
+            "data": [fieldsets.serialize(article, ADMIN_ARTICLE_FIELDS, requested) for article in articles],
+            "pagination": pagination,
+            "facets": facet_counts
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取文章数据时发生错误: {str(e)}")
+        logger.error("获取文章数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取文章数据时发生错误: {str(e)}")
 
 
 # 根据分类和slug获取单篇文章详情
 @router.get("/articles/{category:path}/{article_slug}")
-def get_article_by_category_and_slug(category: str, article_slug: str, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取文章详情的请求，分类: {category}, slug: {article_slug}")
+@query_budget.budget(2)
+@responses.cached("articles")
+async def get_article_by_category_and_slug(category: str, article_slug: str, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取文章详情的请求，分类: %s, slug: %s", category, article_slug)
     try:
-        article = db.query(Article).filter(
+        article = await db.scalar(select(Article).options(selectinload(Article.tags)).where(
             Article.category == category,
             Article.slug == article_slug,
             Article.status == 1
-        ).first()
+        ))
 
         if not article:
-            logger.warning(f"未找到文章，分类: {category}, slug: {article_slug}")
+            logger.warning("未找到文章，分类: %s, slug: %s", category, article_slug)
             raise HTTPException(status_code=404, detail="文章未找到")
 
         # 获取文章的标签
-        article_tags = db.query(Tag).join(ArticleTag).filter(ArticleTag.article_id == article.id).all()
-        tags = [tag.name for tag in article_tags]
+        tags = [tag.name for tag in article.tags]
 
         article_dict = {
             "id": article.id,
@@ -276,28 +373,29 @@ def get_article_by_category_and_slug(category: str, article_slug: str, db: Sessi
             "tags": tags
         }
 
-        logger.info(f"成功获取文章详情: {article.title}")
+        logger.debug("成功获取文章详情: %s", article.title)
         return article_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取文章详情时发生错误: {str(e)}")
+        logger.error("获取文章详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取文章详情时发生错误: {str(e)}")
 
 
 # 根据slug获取单篇文章详情
 @router.get("/articles/{article_slug}")
-def get_article_by_slug(article_slug: str, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取文章详情的请求，slug: {article_slug}")
+@query_budget.budget(2)
+@responses.cached("articles")
+async def get_article_by_slug(article_slug: str, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取文章详情的请求，slug: %s", article_slug)
     try:
-        article = db.query(Article).filter(Article.slug == article_slug, Article.status == 1).first()
+        article = await db.scalar(select(Article).options(selectinload(Article.tags)).where(Article.slug == article_slug, Article.status == 1))
         if not article:
-            logger.warning(f"未找到文章，slug: {article_slug}")
+            logger.warning("未找到文章，slug: %s", article_slug)
             raise HTTPException(status_code=404, detail="文章未找到")
 
         # 获取文章的标签
-        article_tags = db.query(Tag).join(ArticleTag).filter(ArticleTag.article_id == article.id).all()
-        tags = [tag.name for tag in article_tags]
+        tags = [tag.name for tag in article.tags]
 
         article_dict = {
             "id": article.id,
@@ -309,20 +407,20 @@ def get_article_by_slug(article_slug: str, db: Session = Depends(database.get_db
             "tags": tags
         }
 
-        logger.info(f"成功获取文章详情: {article.title}")
+        logger.debug("成功获取文章详情: %s", article.title)
         return article_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取文章详情时发生错误: {str(e)}")
+        logger.error("获取文章详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取文章详情时发生错误: {str(e)}")
 
 
 # 文章管理api
 # 创建新文章
 @router.post("/articles")
-def create_article(article_data: CreateArticleRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建文章请求: {article_data.title}")
+async def create_article(article_data: CreateArticleRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建文章请求: %s", article_data.title)
     try:
         # 生成或验证slug，自动从标题生成
         if not article_data.slug:
@@ -333,7 +431,7 @@ def create_article(article_data: CreateArticleRequest, db: Session = Depends(dat
         # 确保slug唯一性
         base_slug = slug
         counter = 1
-        while db.query(Article).filter(Article.slug == slug).first():
+        while await db.scalar(select(Article).where(Article.slug == slug)):
             slug = f"{base_slug}-{counter}"
             counter += 1
 
@@ -343,7 +441,7 @@ def create_article(article_data: CreateArticleRequest, db: Session = Depends(dat
             try:
                 article_date = datetime.strptime(article_data.date, '%Y-%m-%d').date()
             except ValueError:
-                logger.warning(f"日期格式错误，使用当前日期: {article_data.date}")
+                logger.warning("日期格式错误，使用当前日期: %s", article_data.date)
 
         # 状态映射
         status_map = {'draft': 0, 'published': 1, 'recycled': 2}
@@ -360,33 +458,34 @@ def create_article(article_data: CreateArticleRequest, db: Session = Depends(dat
         )
 
         db.add(new_article)
-        db.commit()
-        db.refresh(new_article)
+        await db.commit()
+        await db.refresh(new_article)
 
         # 处理标签
         for tag_name in article_data.tags or []:
             if not tag_name.strip():
                 continue
 
-            tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
             if not tag:
                 tag = Tag(name=tag_name.strip())
                 db.add(tag)
-                db.flush()
+                await db.flush()
 
             # 创建文章-标签关联
             article_tag = ArticleTag(article_id=new_article.id, tag_id=tag.id)
             db.add(article_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("articles")
 
         # 创建markdown文件，确保分类文件夹存在
         try:
-            save_article_file(new_article, article_data.content, article_data.category)
+            await run_in_threadpool(save_article_file, new_article, article_data.content, article_data.category)
         except Exception as e:
-            logger.warning(f"保存文章文件失败: {str(e)}")
+            logger.warning("保存文章文件失败: %s", e)
 
-        logger.info(f"成功创建文章: {new_article.title}")
+        logger.info("成功创建文章: %s", new_article.title)
         return {
             "message": "文章上传成功",
             "id": new_article.id,
@@ -394,21 +493,21 @@ def create_article(article_data: CreateArticleRequest, db: Session = Depends(dat
         }
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"创建文章时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("创建文章时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建文章时发生错误: {str(e)}")
 
 
 # 编辑文章信息
 @router.put("/articles/{article_id}")
-def update_article(article_id: int, article_data: UpdateArticleRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到编辑文章信息请求: ID={article_id}")
+async def update_article(article_id: int, article_data: UpdateArticleRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到编辑文章信息请求: ID=%s", article_id)
     try:
         # 查找文章
-        article = db.query(Article).filter(Article.id == article_id).first()
+        article = await db.scalar(select(Article).where(Article.id == article_id))
         if not article:
             raise HTTPException(status_code=404, detail="文章未找到")
 
@@ -423,7 +522,7 @@ def update_article(article_id: int, article_data: UpdateArticleRequest, db: Sess
             try:
                 article.date = datetime.strptime(article_data.date, '%Y-%m-%d').date()
             except ValueError:
-                logger.warning(f"日期格式错误: {article_data.date}")
+                logger.warning("日期格式错误: %s", article_data.date)
         if article_data.status is not None:
             status_map = {'draft': 0, 'published': 1, 'recycled': 2}
             if article_data.status in status_map:
@@ -432,18 +531,18 @@ def update_article(article_id: int, article_data: UpdateArticleRequest, db: Sess
         # 处理标签更新
         if article_data.tags is not None:
             # 删除现有标签关联
-            db.query(ArticleTag).filter(ArticleTag.article_id == article_id).delete()
+            await db.execute(delete(ArticleTag).where(ArticleTag.article_id == article_id))
 
             # 添加新标签
             for tag_name in article_data.tags:
                 if not tag_name.strip():
                     continue
 
-                tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+                tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
                 if not tag:
                     tag = Tag(name=tag_name.strip())
                     db.add(tag)
-                    db.flush()
+                    await db.flush()
 
                 # 创建文章-标签关联
                 article_tag = ArticleTag(article_id=article.id, tag_id=tag.id)
@@ -452,13 +551,14 @@ def update_article(article_id: int, article_data: UpdateArticleRequest, db: Sess
         # 更新文件内容
         if article_data.content is not None:
             try:
-                save_article_file(article, article_data.content, article.category)
+                await run_in_threadpool(save_article_file, article, article_data.content, article.category)
             except Exception as e:
-                logger.warning(f"更新文章文件失败: {str(e)}")
+                logger.warning("更新文章文件失败: %s", e)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("articles")
 
-        logger.info(f"成功编辑文章信息: {article.title}")
+        logger.info("成功编辑文章信息: %s", article.title)
         return {
             "message": "文章信息编辑成功",
             "id": article.id,
@@ -468,24 +568,80 @@ def update_article(article_id: int, article_data: UpdateArticleRequest, db: Sess
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"编辑文章信息时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("编辑文章信息时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"编辑文章信息时发生错误: {str(e)}")
 
 
 # 编辑文章信息(POST方法，用于兼容性)
 @router.post("/articles/{article_id}/edit")
-def update_article_post(article_id: int, article_data: UpdateArticleRequest, db: Session = Depends(database.get_db)):
-    return update_article(article_id, article_data, db)
+async def update_article_post(article_id: int, article_data: UpdateArticleRequest, db: AsyncSession = Depends(database.get_db)):
+    return await update_article(article_id, article_data, db)
+
+
+# 批量修改文章状态，请求体 {"ids": [...], "status": "draft|published|recycled"}
+# 一条 UPDATE ... WHERE id IN (...) 在同一事务中完成，逐条返回结果(不存在的 id 标记为 not_found)
+@router.patch("/articles/bulk/status")
+async def bulk_update_article_status(request: bulk.BulkStatusRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量修改文章状态请求: %s 条, 状态=%s", len(request.ids), request.status)
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+            new_status = bulk.parse_status(request.status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.update_status(db, Article, ids, new_status)
+        await db.commit()
+        cache.invalidate("articles")
+
+        logger.info("成功批量修改文章状态: %s 条 -> %s", len(existing), request.status)
+        return bulk.report(ids, existing, "updated")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量修改文章状态时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量修改文章状态时发生错误: {str(e)}")
+
+
+# 批量删除文章，请求体 {"ids": [...]}
+# 标签关联和文章记录各一条 DELETE，提交后再统一删除markdown文件
+@router.post("/articles/bulk/delete")
+async def bulk_delete_articles(request: bulk.BulkDeleteRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量删除文章请求: %s 条", len(request.ids))
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.delete_items(db, Article, ArticleTag.article_id, ids, [Article.slug, Article.category])
+        await db.commit()
+        cache.invalidate("articles")
+
+        # 删除markdown文件(dist和public)，失败的记录在结果中附带 warning
+        warnings = await run_in_threadpool(delete_article_files, list(existing.values()))
+
+        logger.info("成功批量删除文章: %s 条", len(existing))
+        return bulk.report(ids, existing, "deleted", warnings)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量删除文章时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量删除文章时发生错误: {str(e)}")
 
 
 # 修改文章状态
 @router.patch("/articles/{article_id}/status")
-def update_article_status(article_id: int, status_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到修改文章状态请求: ID={article_id}, 状态={status_data.get('status')}")
+async def update_article_status(article_id: int, status_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到修改文章状态请求: ID=%s, 状态=%s", article_id, status_data.get('status'))
     try:
         # 查找文章
-        article = db.query(Article).filter(Article.id == article_id).first()
+        article = await db.scalar(select(Article).where(Article.id == article_id))
         if not article:
             raise HTTPException(status_code=404, detail="文章未找到")
 
@@ -499,155 +655,69 @@ def update_article_status(article_id: int, status_data: dict, db: Session = Depe
         # 更新状态
         old_status = article.status
         article.status = status_map[new_status]
-        db.commit()
+        await db.commit()
+        cache.invalidate("articles")
 
-        logger.info(f"成功修改文章状态: {article.title}, {old_status} -> {article.status}")
+        logger.info("成功修改文章状态: %s, %s -> %s", article.title, old_status, article.status)
         return {"message": "文章状态修改成功", "status": new_status}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"修改文章状态时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("修改文章状态时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"修改文章状态时发生错误: {str(e)}")
 
 
 # 删除文章，同时删除dist和public中的文件
 @router.delete("/articles/{article_id}")
-def delete_article(article_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到删除文章请求: ID={article_id}")
+async def delete_article(article_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到删除文章请求: ID=%s", article_id)
     try:
         # 查找文章
-        article = db.query(Article).filter(Article.id == article_id).first()
+        article = await db.scalar(select(Article).where(Article.id == article_id))
         if not article:
             raise HTTPException(status_code=404, detail="文章未找到")
 
         # 删除文章-标签关联
-        db.query(ArticleTag).filter(ArticleTag.article_id == article_id).delete()
-
-        # 删除markdown文件(dist和public)
-        for base_path in ["../frontend/dist/articles/knowledge", "../frontend/public/articles/knowledge"]:
-            try:
-                file_path = base_path
-                if article.category:
-                    file_path += f"/{article.category}"
-                file_path += f"/{article.slug}.md"
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.info(f"成功删除markdown文件: {file_path}")
-                else:
-                    logger.warning(f"markdown文件不存在: {file_path}")
-            except Exception as e:
-                logger.warning(f"删除markdown文件失败: {str(e)}")
+        await db.execute(delete(ArticleTag).where(ArticleTag.article_id == article_id))
 
         # 删除文章记录
-        db.delete(article)
-        db.commit()
+        await db.delete(article)
+        await db.commit()
+        cache.invalidate("articles")
 
-        logger.info(f"成功删除文章: {article.title}")
+        # 提交成功后再删除markdown文件(dist和public)，回滚时文件不受影响
+        await run_in_threadpool(delete_article_file, article.category, article.slug)
+
+        logger.info("成功删除文章: %s", article.title)
         return {"message": "文章删除成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"删除文章时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("删除文章时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"删除文章时发生错误: {str(e)}")
 
 
 # 获取所有标签及其文章数量
 @router.get("/tags")
-def get_all_tags(db: Session = Depends(database.get_db)):
-    logger.info("收到获取所有标签的请求")
+@query_budget.budget(1)
+@responses.cached("articles")
+async def get_all_tags(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取所有标签的请求")
     try:
-        all_tags = []
-        tag_counts = {}
-
-        # 获取所有文章的标签统计(不限制状态)
-        articles = db.query(Article).all()
-        for article in articles:
-            article_tags = db.query(Tag).join(ArticleTag).filter(ArticleTag.article_id == article.id).all()
-            for tag in article_tags:
-                if tag.name not in all_tags:
-                    all_tags.append(tag.name)
-                tag_counts[tag.name] = tag_counts.get(tag.name, 0) + 1
-
-        logger.info(f"成功获取 {len(all_tags)} 个标签")
-        return {
-            "tags": all_tags,
-            "counts": tag_counts
-        }
-    except Exception as e:
-        logger.error(f"获取标签时发生错误: {str(e)}")
-        # 即使出错，也返回空数据，避免前端报错
-        return {
-            "tags": [],
-            "counts": {}
-        }
-
-
-# 扫描物理文件夹获取分类(完全基于文件系统)
-# 辅助函数
-def scan_physical_categories():
-    categories = []
-    base_path = "../frontend/dist/articles/knowledge"
-
-    try:
-        # 获取绝对路径
-        abs_base_path = os.path.abspath(base_path)
-        logger.info(f"扫描物理文件夹路径: {abs_base_path}")
-
-        # 确保基础路径存在
-        os.makedirs(abs_base_path, exist_ok=True)
-
-        if os.path.exists(abs_base_path):
-            # 递归遍历所有子目录
-            for root, dirs, files in os.walk(abs_base_path):
-                # 过滤掉隐藏文件夹、系统文件夹和assets文件夹
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__' and d != 'assets']
-
-                # 计算相对路径
-                rel_path = os.path.relpath(root, abs_base_path)
-
-                # 跳过根目录本身
-                if rel_path == '.':
-                    continue
-
-                # 转换路径分隔符为统一的斜杠
-                category_path = rel_path.replace(os.sep, '/')
-
-                # 过滤掉以.开头的隐藏文件夹路径和assets路径
-                path_parts = category_path.split('/')
-                if any(part.startswith('.') or part == 'assets' for part in path_parts):
-                    continue
-
-                # 统计markdown文件数量(排除README.md和其他特殊文件)
-                md_files = [f for f in files
-                            if f.endswith('.md')
-                            and f not in ['README.md', '.gitkeep', 'index.md']
-                            and not f.startswith('.')]
-                md_count = len(md_files)
-
-                logger.info(f"发现分类文件夹: {category_path}, markdown文件: {md_files}")
-
-                categories.append({
-                    "path": category_path,
-                    "count": md_count,
-                    "articles": md_files
-                })
-
-        logger.info(f"扫描物理文件夹完成，找到 {len(categories)} 个分类")
-
-        # 打印所有发现的分类路径用于调试
-        for cat in categories:
-            logger.info(f"  - {cat['path']} ({cat['count']} 文件)")
+        # 标签统计(不限制状态)按 GROUP BY 聚合，结果缓存到文章写操作发生为止
+        result = await cache.get_or_set("articles", "tag_counts",
+                                        lambda: count_tags(db, ArticleTag, ArticleTag.article_id))
 
+        logger.debug("成功获取 %s 个标签", len(result['tags']))
+        return result
     except Exception as e:
-        logger.error(f"扫描物理分类文件夹失败: {str(e)}")
-        import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
-
-    return categories
+        logger.error("获取标签时发生错误: %s", e)
+        # 抛出异常而不是返回空数据，避免空结果被 @responses.cached 缓存
+        raise HTTPException(status_code=500, detail=f"获取标签时发生错误: {str(e)}")
 
 
 # 创建物理分类文件夹，同时在dist和public目录创建
@@ -665,10 +735,10 @@ def create_physical_category_folder(category_path: str):
             # 创建目录
             os.makedirs(full_path, exist_ok=True)
 
-            logger.info(f"成功创建物理文件夹: {full_path}")
+            logger.info("成功创建物理文件夹: %s", full_path)
 
     except Exception as e:
-        logger.error(f"创建物理文件夹失败: {str(e)}")
+        logger.error("创建物理文件夹失败: %s", e)
         raise
 
 
@@ -715,13 +785,51 @@ def save_article_file(article: Article, content: str, category: str = None):
         for file_full_path in paths:
             with open(file_full_path, 'w', encoding='utf-8') as f:
                 f.write(file_content)
-            logger.info(f"成功保存文章文件: {file_full_path}")
+            logger.info("成功保存文章文件: %s", file_full_path)
+            dist_manifest.refresh_file(file_full_path)
+
+        # 同步更新分类索引
+        category_index.add_article(category, f"{article.slug}.md")
 
     except Exception as e:
-        logger.error(f"保存文章文件失败: {str(e)}")
+        logger.error("保存文章文件失败: %s", e)
         raise
 
 
+# 删除文章markdown文件(dist和public)，同步更新分类索引
+# 单个文件删除失败只记录日志，返回失败信息列表
+def delete_article_file(category: str, slug: str) -> list:
+    errors = []
+    for base_path in ["../frontend/dist/articles/knowledge", "../frontend/public/articles/knowledge"]:
+        try:
+            file_path = base_path
+            if category:
+                file_path += f"/{category}"
+            file_path += f"/{slug}.md"
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                logger.info("成功删除markdown文件: %s", file_path)
+                dist_manifest.refresh_file(file_path)
+                if base_path == category_index.KNOWLEDGE_BASE_PATH:
+                    category_index.remove_article(category, f"{slug}.md")
+            else:
+                logger.warning("markdown文件不存在: %s", file_path)
+        except Exception as e:
+            logger.warning("删除markdown文件失败: %s", e)
+            errors.append(f"删除markdown文件失败: {e}")
+    return errors
+
+
+# 批量删除文章markdown文件，返回 {文章ID: 失败信息}
+def delete_article_files(rows) -> dict:
+    warnings = {}
+    for row in rows:
+        errors = delete_article_file(row.category, row.slug)
+        if errors:
+            warnings[row.id] = "; ".join(errors)
+    return warnings
+
+
 # 简单的摘要提取降级方案
 def extract_simple_summary(content: str) -> str:
     if not content:
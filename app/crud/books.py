@@ -3,19 +3,45 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 sys.path.append("..")
+import bulk
+import cache
 import database
+import facets
+import fieldsets
+import listing
 from database import Book, Tag, BookTag
+from pagination import count_rows, fetch_keyset_page
+from search import apply_search
+from tagging import count_tags, filter_by_tags
 import logging
+import logging_config
+import query_budget
+import responses
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("books_api")
 
 router = APIRouter()
 
+# 状态映射
+STATUS_NAMES = {0: 'draft', 1: 'published', 2: 'recycled'}
+
+# 管理员列表可返回的字段(fields= 参数)及取值方式
+ADMIN_BOOK_FIELDS = {
+    "id": lambda book: book.id,
+    "title": lambda book: book.title,
+    "description": lambda book: book.description,
+    "cover": lambda book: book.cover if book.cover and book.cover.startswith(
+        'http') else "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg",  # 使用图床URL
+    "filename": lambda book: book.filename,
+    "tags": lambda book: [tag.name for tag in book.tags],
+    "status": lambda book: STATUS_NAMES.get(book.status, 'draft')
+}
+
 
 # 添加请求模型
 class CreateBookRequest(BaseModel):
@@ -38,51 +64,69 @@ class UpdateBookRequest(BaseModel):
 
 # 获取所有书籍（支持分页和筛选）
 @router.get("/books")
-def get_books(
+@query_budget.budget(4)
+@responses.cached("books")
+async def get_books(
     page: int = 1,
     limit: int = 6,
     search: str = None,
     tags: str = None,
-    db: Session = Depends(database.get_db)
+    match: str = "all",
+    cursor: str = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(database.get_db)
 ):
-    logger.info(f"收到获取书籍数据的请求，页码: {page}, 每页数量: {limit}, 搜索: {search}, 标签: {tags}")
+    logger.debug("收到获取书籍数据的请求，页码: %s, 每页数量: %s, 搜索: %s, 标签: %s, 游标: %s", page, limit, search, tags, cursor)
     try:
+        if match not in ("all", "any"):
+            raise HTTPException(status_code=400, detail="match 参数只能为 all 或 any")
+
+        # 每页数量上限与文章、项目列表一致，避免一次请求取出整张表
+        limit = min(limit, listing.MAX_LIMIT)
+
+        # 总数缓存的键，需在筛选参数被改写前确定
+        count_key = ("count", search, tags, match)
+
         # 构建基础查询
-        query = db.query(Book).filter(Book.status == 1)
+        query = select(Book).where(Book.status == 1)
         
-        # 应用搜索筛选
+        # 应用搜索筛选(MySQL 下走全文索引，relevance 为相关度表达式)
+        relevance = None
         if search:
-            search = f"%{search}%"
-            query = query.filter(
-                (Book.title.ilike(search)) |
-                (Book.description.ilike(search))
-            )
+            query, relevance = await apply_search(db, query, [Book.title, Book.description], search)
         
-        # 应用标签筛选 (AND 逻辑 - 必须包含所有选中的标签)
+        # 应用标签筛选: match=all 须包含所有选中的标签(默认)，match=any 包含任一标签即可
         if tags:
             tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
             if tag_list:
-                # 对每个标签进行单独的join和filter，实现AND筛选
-                for tag_name in tag_list:
-                    # 为每个标签创建一个子查询，确保书籍包含所有选中的标签
-                    subquery = db.query(BookTag.book_id).join(Tag).filter(Tag.name == tag_name).subquery()
-                    query = query.filter(Book.id.in_(subquery))
-        
-        # 获取总数量
-        total_count = query.count()
+                query = await filter_by_tags(db, query, Book.id, BookTag.book_id, tag_list, match_all=(match == "all"))
         
-        # 计算偏移量并获取分页数据
-        offset = (page - 1) * limit
-        books = query.offset(offset).limit(limit).all()
+        if cursor is not None:
+            # 游标分页: 传入 cursor 参数时启用(第一页传空字符串)，按 id 倒序直接定位到下一页
+            if limit < 1:
+                raise HTTPException(status_code=400, detail="每页数量必须大于0")
+            try:
+                books, next_cursor = await fetch_keyset_page(db, query.options(selectinload(Book.tags)), [Book.id], cursor, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            # 获取总数量
+            total_count = await count_rows(db, query)
+
+            # 全文搜索时按相关度排序
+            page_query = query.order_by(relevance.desc()) if relevance is not None else query
+
+            # 计算偏移量并获取分页数据
+            offset = (page - 1) * limit
+            books = (await db.scalars(page_query.options(selectinload(Book.tags)).offset(offset).limit(limit))).all()
         
-        logger.info(f"成功获取到 {len(books)} 本已发布书籍")
+        logger.debug("成功获取到 %s 本已发布书籍", len(books))
 
         # 转换为前端需要的格式
         books_data = []
         for book in books:
             # 获取书籍的标签
-            book_tags = db.query(Tag).join(BookTag).filter(BookTag.book_id == book.id).all()
-            tags = [tag.name for tag in book_tags]
+            tags = [tag.name for tag in book.tags]
 
             book_dict = {
                 "id": book.id,
@@ -95,6 +139,20 @@ def get_books(
             }
             books_data.append(book_dict)
 
+        if cursor is not None:
+            pagination = {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+            # 总数为可选项，缓存到书籍写操作发生为止
+            if with_total:
+                pagination["total"] = await cache.get_or_set("books", count_key, lambda: count_rows(db, query))
+            return {
+                "data": books_data,
+                "pagination": pagination
+            }
+
         # 返回分页数据
         return {
             "data": books_data,
@@ -105,24 +163,27 @@ def get_books(
                 "pages": (total_count + limit - 1) // limit if limit > 0 else 0  # 计算总页数
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取书籍数据时发生错误: {str(e)}")
+        logger.error("获取书籍数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取书籍数据时发生错误: {str(e)}")
 
 
 # 根据ID获取单本书籍详情
 @router.get("/books/{book_id}")
-def get_book_by_id(book_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取书籍详情的请求，ID: {book_id}")
+@query_budget.budget(2)
+@responses.cached("books")
+async def get_book_by_id(book_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取书籍详情的请求，ID: %s", book_id)
     try:
-        book = db.query(Book).filter(Book.id == book_id, Book.status == 1).first()
+        book = await db.scalar(select(Book).options(selectinload(Book.tags)).where(Book.id == book_id, Book.status == 1))
         if not book:
-            logger.warning(f"未找到书籍，ID: {book_id}")
+            logger.warning("未找到书籍，ID: %s", book_id)
             raise HTTPException(status_code=404, detail="书籍未找到")
 
         # 获取书籍的标签
-        book_tags = db.query(Tag).join(BookTag).filter(BookTag.book_id == book.id).all()
-        tags = [tag.name for tag in book_tags]
+        tags = [tag.name for tag in book.tags]
 
         book_dict = {
             "id": book.id,
@@ -134,86 +195,157 @@ def get_book_by_id(book_id: int, db: Session = Depends(database.get_db)):
             "tags": tags
         }
 
-        logger.info(f"成功获取书籍详情: {book.title}")
+        logger.debug("成功获取书籍详情: %s", book.title)
         return book_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取书籍详情时发生错误: {str(e)}")
+        logger.error("获取书籍详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取书籍详情时发生错误: {str(e)}")
 
 
 # 获取所有书籍标签及其书籍数量
 @router.get("/book-tags")
-def get_all_book_tags(db: Session = Depends(database.get_db)):
-    logger.info("收到获取所有书籍标签的请求")
+@query_budget.budget(1)
+@responses.cached("books")
+async def get_all_book_tags(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取所有书籍标签的请求")
     try:
-        all_tags = []
-        tag_counts = {}
-
-        # 获取所有已发布书籍的标签统计
-        books = db.query(Book).filter(Book.status == 1).all()
-        for book in books:
-            book_tags = db.query(Tag).join(BookTag).filter(BookTag.book_id == book.id).all()
-            for tag in book_tags:
-                if tag.name not in all_tags:
-                    all_tags.append(tag.name)
-                tag_counts[tag.name] = tag_counts.get(tag.name, 0) + 1
+        # 已发布书籍的标签统计按 GROUP BY 聚合，结果缓存到书籍写操作发生为止
+        result = await cache.get_or_set("books", "tag_counts",
+                                        lambda: count_tags(db, BookTag, BookTag.book_id, Book.status))
 
-        logger.info(f"成功获取 {len(all_tags)} 个书籍标签")
-        return {
-            "tags": all_tags,
-            "counts": tag_counts
-        }
+        logger.debug("成功获取 %s 个书籍标签", len(result['tags']))
+        return result
     except Exception as e:
-        logger.error(f"获取书籍标签时发生错误: {str(e)}")
+        logger.error("获取书籍标签时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取书籍标签时发生错误: {str(e)}")
 
 
-# 管理员获取所有书籍(包含所有状态)
+# 管理员获取书籍(包含所有状态)，默认按 id 顺序排列
+# fields 为逗号分隔的字段列表(如 id,title,status)，只查询并返回这些字段
+# 筛选: status(draft/published/recycled)、tags(match=all/any)、search 标题或描述关键词(MySQL 下走全文索引)
+# 传入 page/limit 时分页返回，并附带各状态、标签的分面计数；都不传时返回完整列表(兼容旧调用方)
 @router.get("/admin/books")
-def get_all_books_admin(db: Session = Depends(database.get_db)):
-    logger.info("收到管理员获取全部书籍数据的请求")
+@query_budget.budget(5)
+@responses.cached("books")
+async def get_all_books_admin(
+    fields: str = None,
+    status: str = None,
+    tags: str = None,
+    match: str = "all",
+    search: str = None,
+    sort: str = "id_asc",
+    page: int = None,
+    limit: int = None,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到管理员获取书籍数据的请求，字段: %s, 状态: %s, 标签: %s, 搜索: %s, 排序: %s, 页码: %s, 每页数量: %s",
+                 fields, status, tags, search, sort, page, limit)
     try:
-        books = db.query(Book).all()
-        logger.info(f"成功获取到 {len(books)} 本书籍（所有状态）")
+        try:
+            requested = fieldsets.parse(fields, ADMIN_BOOK_FIELDS)
+            order_columns, descending = listing.sort_columns(Book, sort)
+            conditions = await facets.build_conditions(db, Book, BookTag.book_id, [Book.title, Book.description],
+                                                       status=status, tags=tags, match=match, keyword=search)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        query = select(Book).where(*conditions.values())
+        options = fieldsets.load_options(Book, requested, order_columns)
+
+        if page is None and limit is None:
+            books = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            pagination = None
+        else:
+            count_key = ("admin_count", status, tags, match, search)
+            try:
+                books, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                             page, limit, None, False, "books", count_key)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 本书籍（所有状态）", len(books))
 
         # 转换为前端需要的格式
         books_data = []
         for book in books:
-            # 获取书籍的标签
-            book_tags = db.query(Tag).join(BookTag).filter(BookTag.book_id == book.id).all()
-            tags = [tag.name for tag in book_tags]
+            books_data.append(fieldsets.serialize(book, ADMIN_BOOK_FIELDS, requested))
+            logger.debug("书籍数据: ID=%s", book.id, extra=logging_config.SAMPLED)
+
+        if pagination is None:
+            return books_data
+        return {
+            "data": books_data,
+            "pagination": pagination,
+            "facets": await facets.count_facets(db, Book, BookTag.book_id, conditions)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("获取书籍数据时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"获取书籍数据时发生错误: {str(e)}")
 
-            # 状态映射
-            status_map = {0: 'draft', 1: 'published', 2: 'recycled'}
 
-            book_dict = {
-                "id": book.id,
-                "title": book.title,
-                "description": book.description,
-                "cover": book.cover if book.cover and book.cover.startswith(
-                    'http') else "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg",  # 使用图床URL
-                "filename": book.filename,
-                "tags": tags,
-                "status": status_map.get(book.status, 'draft')
-            }
-            books_data.append(book_dict)
-            logger.info(f"书籍数据: ID={book.id}, 标题={book.title}, 状态={book.status}")
+# 批量修改书籍状态，请求体 {"ids": [...], "status": "draft|published|recycled"}
+# 一条 UPDATE ... WHERE id IN (...) 在同一事务中完成，逐条返回结果(不存在的 id 标记为 not_found)
+@router.patch("/books/bulk/status")
+async def bulk_update_book_status(request: bulk.BulkStatusRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量修改书籍状态请求: %s 条, 状态=%s", len(request.ids), request.status)
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+            new_status = bulk.parse_status(request.status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.update_status(db, Book, ids, new_status)
+        await db.commit()
+        cache.invalidate("books")
 
-        return books_data
+        logger.info("成功批量修改书籍状态: %s 条 -> %s", len(existing), request.status)
+        return bulk.report(ids, existing, "updated")
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取书籍数据时发生错误: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"获取书籍数据时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("批量修改书籍状态时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量修改书籍状态时发生错误: {str(e)}")
+
+
+# 批量删除书籍，请求体 {"ids": [...]}
+# 标签关联和书籍记录各一条 DELETE，在同一事务中提交
+@router.post("/books/bulk/delete")
+async def bulk_delete_books(request: bulk.BulkDeleteRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量删除书籍请求: %s 条", len(request.ids))
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.delete_items(db, Book, BookTag.book_id, ids)
+        await db.commit()
+        cache.invalidate("books")
+
+        logger.info("成功批量删除书籍: %s 条", len(existing))
+        return bulk.report(ids, existing, "deleted")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量删除书籍时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量删除书籍时发生错误: {str(e)}")
 
 
 # 修改书籍状态
 @router.patch("/books/{book_id}/status")
-def update_book_status(book_id: int, status_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到修改书籍状态请求: ID={book_id}, 状态={status_data.get('status')}")
+async def update_book_status(book_id: int, status_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到修改书籍状态请求: ID=%s, 状态=%s", book_id, status_data.get('status'))
     try:
         # 查找书籍
-        book = db.query(Book).filter(Book.id == book_id).first()
+        book = await db.scalar(select(Book).where(Book.id == book_id))
         if not book:
             raise HTTPException(status_code=404, detail="书籍未找到")
 
@@ -227,51 +359,53 @@ def update_book_status(book_id: int, status_data: dict, db: Session = Depends(da
         # 更新状态
         old_status = book.status
         book.status = status_map[new_status]
-        db.commit()
+        await db.commit()
+        cache.invalidate("books")
 
-        logger.info(f"成功修改书籍状态: {book.title}, {old_status} -> {book.status}")
+        logger.info("成功修改书籍状态: %s, %s -> %s", book.title, old_status, book.status)
         return {"message": "书籍状态修改成功", "status": new_status}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"修改书籍状态时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("修改书籍状态时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"修改书籍状态时发生错误: {str(e)}")
 
 
 # 删除书籍
 @router.delete("/books/{book_id}")
-def delete_book(book_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到删除书籍请求: ID={book_id}")
+async def delete_book(book_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到删除书籍请求: ID=%s", book_id)
     try:
         # 查找书籍
-        book = db.query(Book).filter(Book.id == book_id).first()
+        book = await db.scalar(select(Book).where(Book.id == book_id))
         if not book:
             raise HTTPException(status_code=404, detail="书籍未找到")
 
         # 删除书籍-标签关联
-        db.query(BookTag).filter(BookTag.book_id == book_id).delete()
+        await db.execute(delete(BookTag).where(BookTag.book_id == book_id))
 
         # 删除书籍记录
-        db.delete(book)
-        db.commit()
+        await db.delete(book)
+        await db.commit()
+        cache.invalidate("books")
 
-        logger.info(f"成功删除书籍: {book.title}")
+        logger.info("成功删除书籍: %s", book.title)
         return {"message": "书籍删除成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"删除书籍时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("删除书籍时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"删除书籍时发生错误: {str(e)}")
 
 
 # 创建新图书
 @router.post("/admin/books")
-def create_book(book_data: CreateBookRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建图书请求: {book_data.title}")
+async def create_book(book_data: CreateBookRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建图书请求: %s", book_data.title)
     try:
         # 状态映射
         status_map = {'draft': 0, 'published': 1, 'recycled': 2}
@@ -286,7 +420,7 @@ def create_book(book_data: CreateBookRequest, db: Session = Depends(database.get
         import re
         url_pattern = r'^https?://.+\.(jpg|jpeg|png|gif|webp)(\?.*)?$'
         if not re.match(url_pattern, cover_url, re.IGNORECASE):
-            logger.warning(f"封面URL格式不正确，使用默认封面: {cover_url}")
+            logger.warning("封面URL格式不正确，使用默认封面: %s", cover_url)
             cover_url = "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg"
 
         # 验证网盘URL格式
@@ -303,27 +437,28 @@ def create_book(book_data: CreateBookRequest, db: Session = Depends(database.get
         )
 
         db.add(new_book)
-        db.commit()
-        db.refresh(new_book)
+        await db.commit()
+        await db.refresh(new_book)
 
         # 处理标签
         for tag_name in book_data.tags or []:
             if not tag_name.strip():
                 continue
 
-            tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
             if not tag:
                 tag = Tag(name=tag_name.strip())
                 db.add(tag)
-                db.flush()
+                await db.flush()
 
             # 创建图书-标签关联
             book_tag = BookTag(book_id=new_book.id, tag_id=tag.id)
             db.add(book_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("books")
 
-        logger.info(f"成功创建图书: {new_book.title}, 网盘链接: {book_data.filename}")
+        logger.info("成功创建图书: %s, 网盘链接: %s", new_book.title, book_data.filename)
         return {
             "message": "图书创建成功",
             "id": new_book.id,
@@ -331,21 +466,21 @@ def create_book(book_data: CreateBookRequest, db: Session = Depends(database.get
         }
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"创建图书时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("创建图书时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建图书时发生错误: {str(e)}")
 
 
 # 编辑图书信息
 @router.put("/admin/books/{book_id}")
-def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到编辑图书信息请求: ID={book_id}")
+async def update_book(book_id: int, book_data: UpdateBookRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到编辑图书信息请求: ID=%s", book_id)
     try:
         # 查找书籍
-        book = db.query(Book).filter(Book.id == book_id).first()
+        book = await db.scalar(select(Book).where(Book.id == book_id))
         if not book:
             raise HTTPException(status_code=404, detail="书籍未找到")
 
@@ -364,7 +499,7 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
                 import re
                 url_pattern = r'^https?://.+\.(jpg|jpeg|png|gif|webp)(\?.*)?$'
                 if not re.match(url_pattern, cover_url, re.IGNORECASE):
-                    logger.warning(f"封面URL格式不正确，使用默认封面: {cover_url}")
+                    logger.warning("封面URL格式不正确，使用默认封面: %s", cover_url)
                     cover_url = "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg"
 
             book.cover = cover_url
@@ -376,26 +511,27 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
         # 处理标签更新
         if book_data.tags is not None:
             # 删除现有标签关联
-            db.query(BookTag).filter(BookTag.book_id == book_id).delete()
+            await db.execute(delete(BookTag).where(BookTag.book_id == book_id))
 
             # 添加新标签
             for tag_name in book_data.tags:
                 if not tag_name.strip():
                     continue
 
-                tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+                tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
                 if not tag:
                     tag = Tag(name=tag_name.strip())
                     db.add(tag)
-                    db.flush()
+                    await db.flush()
 
                 # 创建图书-标签关联
                 book_tag = BookTag(book_id=book.id, tag_id=tag.id)
                 db.add(book_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("books")
 
-        logger.info(f"成功编辑图书信息: {book.title}")
+        logger.info("成功编辑图书信息: %s", book.title)
         return {
             "message": "图书信息编辑成功",
             "id": book.id,
@@ -405,8 +541,8 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"编辑图书信息时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("编辑图书信息时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"编辑图书信息时发生错误: {str(e)}")
         if book_data.description is not None:
             book.description = book_data.description
@@ -420,7 +556,7 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
                 import re
                 url_pattern = r'^https?://.+\.(jpg|jpeg|png|gif|webp)(\?.*)?$'
                 if not re.match(url_pattern, cover_url, re.IGNORECASE):
-                    logger.warning(f"封面URL格式不正确，使用默认封面: {cover_url}")
+                    logger.warning("封面URL格式不正确，使用默认封面: %s", cover_url)
                     cover_url = "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg"
 
             book.cover = cover_url
@@ -432,26 +568,26 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
         # 处理标签更新
         if book_data.tags is not None:
             # 删除现有标签关联
-            db.query(BookTag).filter(BookTag.book_id == book_id).delete()
+            await db.execute(delete(BookTag).where(BookTag.book_id == book_id))
 
             # 添加新标签
             for tag_name in book_data.tags:
                 if not tag_name.strip():
                     continue
 
-                tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+                tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
                 if not tag:
                     tag = Tag(name=tag_name.strip())
                     db.add(tag)
-                    db.flush()
+                    await db.flush()
 
                 # 创建图书-标签关联
                 book_tag = BookTag(book_id=book.id, tag_id=tag.id)
                 db.add(book_tag)
 
-        db.commit()
+        await db.commit()
 
-        logger.info(f"成功编辑图书信息: {book.title}")
+        logger.info("成功编辑图书信息: %s", book.title)
         return {
             "message": "图书信息编辑成功",
             "id": book.id,
@@ -461,6 +597,6 @@ def update_book(book_id: int, book_data: UpdateBookRequest, db: Session = Depend
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"编辑图书信息时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("编辑图书信息时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"编辑图书信息时发生错误: {str(e)}")
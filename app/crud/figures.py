@@ -3,19 +3,43 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 sys.path.append("..")
+import bulk
+import cache
 import database
+import facets
+import fieldsets
+import listing
 from database import Figure, Tag, FigureTag
+from pagination import count_rows, fetch_keyset_page
+from search import apply_search
+from tagging import count_tags, filter_by_tags
 import logging
+import logging_config
+import query_budget
+import responses
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("figures_api")
 
 router = APIRouter()
 
+# 状态映射
+STATUS_NAMES = {0: 'draft', 1: 'published', 2: 'recycled'}
+
+# 管理员列表可返回的字段(fields= 参数)及取值方式
+ADMIN_FIGURE_FIELDS = {
+    "id": lambda figure: figure.id,
+    "title": lambda figure: figure.title or "",
+    "description": lambda figure: figure.description or "",
+    "url": lambda figure: figure.url or "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg",
+    "tags": lambda figure: [tag.name for tag in figure.tags],
+    "status": lambda figure: STATUS_NAMES.get(figure.status, 'draft')
+}
+
 
 # 添加请求模型
 class CreateFigureRequest(BaseModel):
@@ -36,52 +60,70 @@ class UpdateFigureRequest(BaseModel):
 
 # 获取所有图表（支持分页和筛选）
 @router.get("/figures")
-def get_figures(
+@query_budget.budget(4)
+@responses.cached("figures")
+async def get_figures(
     page: int = 1,
     limit: int = 6,
     search: str = None,
     tags: str = None,
-    db: Session = Depends(database.get_db)
+    match: str = "all",
+    cursor: str = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(database.get_db)
 ):
-    logger.info(f"收到获取图表数据的请求，页码: {page}, 每页数量: {limit}, 搜索: {search}, 标签: {tags}")
+    logger.debug("收到获取图表数据的请求，页码: %s, 每页数量: %s, 搜索: %s, 标签: %s, 游标: %s", page, limit, search, tags, cursor)
     try:
+        if match not in ("all", "any"):
+            raise HTTPException(status_code=400, detail="match 参数只能为 all 或 any")
+
+        # 每页数量上限与文章、项目列表一致，避免一次请求取出整张表
+        limit = min(limit, listing.MAX_LIMIT)
+
+        # 总数缓存的键，需在筛选参数被改写前确定
+        count_key = ("count", search, tags, match)
+
         # 构建基础查询
-        query = db.query(Figure).filter(Figure.status == 1)
+        query = select(Figure).where(Figure.status == 1)
         
-        # 应用搜索筛选
+        # 应用搜索筛选(MySQL 下走全文索引，relevance 为相关度表达式)
+        relevance = None
         if search:
-            search = f"%{search}%"
-            query = query.filter(
-                (Figure.title.ilike(search)) |
-                (Figure.description.ilike(search))
-            )
+            query, relevance = await apply_search(db, query, [Figure.title, Figure.description], search)
         
-        # 应用标签筛选 (AND 逻辑 - 必须包含所有选中的标签)
+        # 应用标签筛选: match=all 须包含所有选中的标签(默认)，match=any 包含任一标签即可
         if tags:
             tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
             if tag_list:
-                # 对每个标签进行单独的join和filter，实现AND筛选
-                for tag_name in tag_list:
-                    # 为每个标签创建一个子查询，确保图表包含所有选中的标签
-                    subquery = db.query(FigureTag.figure_id).join(Tag).filter(Tag.name == tag_name).subquery()
-                    query = query.filter(Figure.id.in_(subquery))
-        
-        # 获取总数量
-        total_count = query.count()
+                query = await filter_by_tags(db, query, Figure.id, FigureTag.figure_id, tag_list, match_all=(match == "all"))
         
-        # 计算偏移量并获取分页数据
-        offset = (page - 1) * limit
-        figures = query.offset(offset).limit(limit).all()
+        if cursor is not None:
+            # 游标分页: 传入 cursor 参数时启用(第一页传空字符串)，按 id 倒序直接定位到下一页
+            if limit < 1:
+                raise HTTPException(status_code=400, detail="每页数量必须大于0")
+            try:
+                figures, next_cursor = await fetch_keyset_page(db, query.options(selectinload(Figure.tags)), [Figure.id], cursor, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            # 获取总数量
+            total_count = await count_rows(db, query)
+
+            # 全文搜索时按相关度排序
+            page_query = query.order_by(relevance.desc()) if relevance is not None else query
+
+            # 计算偏移量并获取分页数据
+            offset = (page - 1) * limit
+            figures = (await db.scalars(page_query.options(selectinload(Figure.tags)).offset(offset).limit(limit))).all()
         
-        logger.info(f"成功获取到 {len(figures)} 个已发布图表")
+        logger.debug("成功获取到 %s 个已发布图表", len(figures))
 
         # 转换为前端需要的格式
         figures_data = []
         for figure in figures:
             try:
                 # 获取图表的标签
-                figure_tags = db.query(Tag).join(FigureTag).filter(FigureTag.figure_id == figure.id).all()
-                tags = [tag.name for tag in figure_tags]
+                tags = [tag.name for tag in figure.tags]
 
                 figure_dict = {
                     "id": figure.id,
@@ -91,12 +133,26 @@ def get_figures(
                     "tags": tags
                 }
                 figures_data.append(figure_dict)
-                logger.info(f"图表数据: ID={figure.id}, 标题={figure.title}")
+                logger.debug("图表数据: ID=%s, 标题=%s", figure.id, figure.title, extra=logging_config.SAMPLED)
             except Exception as e:
-                logger.error(f"处理图表数据时发生错误 ID={figure.id}: {str(e)}")
+                logger.error("处理图表数据时发生错误 ID=%s: %s", figure.id, e)
                 # 跳过有问题的数据，继续处理其他数据
                 continue
 
+        if cursor is not None:
+            pagination = {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+            # 总数为可选项，缓存到图表写操作发生为止
+            if with_total:
+                pagination["total"] = await cache.get_or_set("figures", count_key, lambda: count_rows(db, query))
+            return {
+                "data": figures_data,
+                "pagination": pagination
+            }
+
         # 返回分页数据
         return {
             "data": figures_data,
@@ -107,27 +163,30 @@ def get_figures(
                 "pages": (total_count + limit - 1) // limit if limit > 0 else 0  # 计算总页数
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取图表数据时发生错误: {str(e)}")
+        logger.error("获取图表数据时发生错误: %s", e)
         import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
-        # 返回空数据而不是抛出异常，避免前端报错
-        return []
+        logger.error("详细错误信息: %s", traceback.format_exc())
+        # 抛出异常而不是返回空数据，避免空结果被 @responses.cached 缓存
+        raise HTTPException(status_code=500, detail=f"获取图表数据时发生错误: {str(e)}")
 
 
 # 根据ID获取单个图表详情
 @router.get("/figures/{figure_id}")
-def get_figure_by_id(figure_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取图表详情的请求，ID: {figure_id}")
+@query_budget.budget(2)
+@responses.cached("figures")
+async def get_figure_by_id(figure_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取图表详情的请求，ID: %s", figure_id)
     try:
-        figure = db.query(Figure).filter(Figure.id == figure_id, Figure.status == 1).first()
+        figure = await db.scalar(select(Figure).options(selectinload(Figure.tags)).where(Figure.id == figure_id, Figure.status == 1))
         if not figure:
-            logger.warning(f"未找到图表，ID: {figure_id}")
+            logger.warning("未找到图表，ID: %s", figure_id)
             raise HTTPException(status_code=404, detail="图表未找到")
 
         # 获取图表的标签
-        figure_tags = db.query(Tag).join(FigureTag).filter(FigureTag.figure_id == figure.id).all()
-        tags = [tag.name for tag in figure_tags]
+        tags = [tag.name for tag in figure.tags]
 
         figure_dict = {
             "id": figure.id,
@@ -137,91 +196,164 @@ def get_figure_by_id(figure_id: int, db: Session = Depends(database.get_db)):
             "tags": tags
         }
 
-        logger.info(f"成功获取图表详情: {figure.title}")
+        logger.debug("成功获取图表详情: %s", figure.title)
         return figure_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取图表详情时发生错误: {str(e)}")
+        logger.error("获取图表详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取图表详情时发生错误: {str(e)}")
 
 
 # 获取所有图表标签及其图表数量
 @router.get("/figure-tags")
-def get_all_figure_tags(db: Session = Depends(database.get_db)):
-    logger.info("收到获取所有图表标签的请求")
+@query_budget.budget(1)
+@responses.cached("figures")
+async def get_all_figure_tags(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取所有图表标签的请求")
     try:
-        all_tags = []
-        tag_counts = {}
+        # 已发布图表的标签统计按 GROUP BY 聚合，结果缓存到图表写操作发生为止
+        result = await cache.get_or_set("figures", "tag_counts",
+                                        lambda: count_tags(db, FigureTag, FigureTag.figure_id, Figure.status))
 
-        # 获取所有已发布图表的标签统计
-        figures = db.query(Figure).filter(Figure.status == 1).all()
-        for figure in figures:
-            figure_tags = db.query(Tag).join(FigureTag).filter(FigureTag.figure_id == figure.id).all()
-            for tag in figure_tags:
-                if tag.name not in all_tags:
-                    all_tags.append(tag.name)
-                tag_counts[tag.name] = tag_counts.get(tag.name, 0) + 1
-
-        logger.info(f"成功获取 {len(all_tags)} 个图表标签")
-        return {
-            "tags": all_tags,
-            "counts": tag_counts
-        }
+        logger.debug("成功获取 %s 个图表标签", len(result['tags']))
+        return result
     except Exception as e:
-        logger.error(f"获取图表标签时发生错误: {str(e)}")
+        logger.error("获取图表标签时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取图表标签时发生错误: {str(e)}")
 
 
-# 管理员获取所有图片(包含所有状态)
+# 管理员获取图片(包含所有状态)，默认按 id 顺序排列
+# fields 为逗号分隔的字段列表(如 id,title,status)，只查询并返回这些字段
+# 筛选: status(draft/published/recycled)、tags(match=all/any)、search 标题或描述关键词(MySQL 下走全文索引)
+# 传入 page/limit 时分页返回，并附带各状态、标签的分面计数；都不传时返回完整列表(兼容旧调用方)
 @router.get("/admin/figures")
-def get_all_figures_admin(db: Session = Depends(database.get_db)):
-    logger.info("收到管理员获取全部图片数据的请求")
+@query_budget.budget(5)
+@responses.cached("figures")
+async def get_all_figures_admin(
+    fields: str = None,
+    status: str = None,
+    tags: str = None,
+    match: str = "all",
+    search: str = None,
+    sort: str = "id_asc",
+    page: int = None,
+    limit: int = None,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到管理员获取图片数据的请求，字段: %s, 状态: %s, 标签: %s, 搜索: %s, 排序: %s, 页码: %s, 每页数量: %s",
+                 fields, status, tags, search, sort, page, limit)
     try:
-        figures = db.query(Figure).all()
-        logger.info(f"成功获取到 {len(figures)} 张图片（所有状态）")
+        requested = fieldsets.parse(fields, ADMIN_FIGURE_FIELDS)
+        order_columns, descending = listing.sort_columns(Figure, sort)
+        conditions = await facets.build_conditions(db, Figure, FigureTag.figure_id, [Figure.title, Figure.description],
+                                                   status=status, tags=tags, match=match, keyword=search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        query = select(Figure).where(*conditions.values())
+        options = fieldsets.load_options(Figure, requested, order_columns)
+
+        if page is None and limit is None:
+            figures = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            pagination = None
+        else:
+            count_key = ("admin_count", status, tags, match, search)
+            try:
+                figures, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                               page, limit, None, False, "figures", count_key)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 张图片（所有状态）", len(figures))
 
         # 转换为前端需要的格式
         figures_data = []
         for figure in figures:
             try:
-                # 获取图片的标签
-                figure_tags = db.query(Tag).join(FigureTag).filter(FigureTag.figure_id == figure.id).all()
-                tags = [tag.name for tag in figure_tags]
-
-                # 状态映射
-                status_map = {0: 'draft', 1: 'published', 2: 'recycled'}
-
-                figure_dict = {
-                    "id": figure.id,
-                    "title": figure.title or "",
-                    "description": figure.description or "",
-                    "url": figure.url or "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg",
-                    "tags": tags,
-                    "status": status_map.get(figure.status, 'draft')
-                }
-                figures_data.append(figure_dict)
-                logger.info(f"图片数据: ID={figure.id}, 标题={figure.title}, 状态={figure.status}")
+                figures_data.append(fieldsets.serialize(figure, ADMIN_FIGURE_FIELDS, requested))
+                logger.debug("图片数据: ID=%s", figure.id, extra=logging_config.SAMPLED)
             except Exception as e:
-                logger.error(f"处理图片数据时发生错误 ID={figure.id}: {str(e)}")
+                logger.error("处理图片数据时发生错误 ID=%s: %s", figure.id, e)
                 continue
 
-        return figures_data
+        if pagination is None:
+            return figures_data
+        return {
+            "data": figures_data,
+            "pagination": pagination,
+            "facets": await facets.count_facets(db, Figure, FigureTag.figure_id, conditions)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取图片数据时发生错误: {str(e)}")
+        logger.error("获取图片数据时发生错误: %s", e)
         import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
-        # 返回空数据而不是抛出异常
-        return []
+        logger.error("详细错误信息: %s", traceback.format_exc())
+        # 抛出异常而不是返回空数据，避免空结果被 @responses.cached 缓存
+        raise HTTPException(status_code=500, detail=f"获取图片数据时发生错误: {str(e)}")
+
+
+# 批量修改图片状态，请求体 {"ids": [...], "status": "draft|published|recycled"}
+# 一条 UPDATE ... WHERE id IN (...) 在同一事务中完成，逐条返回结果(不存在的 id 标记为 not_found)
+@router.patch("/figures/bulk/status")
+async def bulk_update_figure_status(request: bulk.BulkStatusRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量修改图片状态请求: %s 条, 状态=%s", len(request.ids), request.status)
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+            new_status = bulk.parse_status(request.status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.update_status(db, Figure, ids, new_status)
+        await db.commit()
+        cache.invalidate("figures")
+
+        logger.info("成功批量修改图片状态: %s 条 -> %s", len(existing), request.status)
+        return bulk.report(ids, existing, "updated")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量修改图片状态时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量修改图片状态时发生错误: {str(e)}")
+
+
+# 批量删除图片，请求体 {"ids": [...]}
+# 标签关联和图片记录各一条 DELETE，在同一事务中提交
+@router.post("/figures/bulk/delete")
+async def bulk_delete_figures(request: bulk.BulkDeleteRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量删除图片请求: %s 条", len(request.ids))
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.delete_items(db, Figure, FigureTag.figure_id, ids)
+        await db.commit()
+        cache.invalidate("figures")
+
+        logger.info("成功批量删除图片: %s 条", len(existing))
+        return bulk.report(ids, existing, "deleted")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量删除图片时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量删除图片时发生错误: {str(e)}")
 
 
 # 修改图片状态
 @router.patch("/figures/{figure_id}/status")
-def update_figure_status(figure_id: int, status_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到修改图片状态请求: ID={figure_id}, 状态={status_data.get('status')}")
+async def update_figure_status(figure_id: int, status_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到修改图片状态请求: ID=%s, 状态=%s", figure_id, status_data.get('status'))
     try:
         # 查找图片
-        figure = db.query(Figure).filter(Figure.id == figure_id).first()
+        figure = await db.scalar(select(Figure).where(Figure.id == figure_id))
         if not figure:
             raise HTTPException(status_code=404, detail="图片未找到")
 
@@ -235,51 +367,53 @@ def update_figure_status(figure_id: int, status_data: dict, db: Session = Depend
         # 更新状态
         old_status = figure.status
         figure.status = status_map[new_status]
-        db.commit()
+        await db.commit()
+        cache.invalidate("figures")
 
-        logger.info(f"成功修改图片状态: {figure.title}, {old_status} -> {figure.status}")
+        logger.info("成功修改图片状态: %s, %s -> %s", figure.title, old_status, figure.status)
         return {"message": "图片状态修改成功", "status": new_status}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"修改图片状态时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("修改图片状态时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"修改图片状态时发生错误: {str(e)}")
 
 
 # 删除图片
 @router.delete("/figures/{figure_id}")
-def delete_figure(figure_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到删除图片请求: ID={figure_id}")
+async def delete_figure(figure_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到删除图片请求: ID=%s", figure_id)
     try:
         # 查找图片
-        figure = db.query(Figure).filter(Figure.id == figure_id).first()
+        figure = await db.scalar(select(Figure).where(Figure.id == figure_id))
         if not figure:
             raise HTTPException(status_code=404, detail="图片未找到")
 
         # 删除图片-标签关联
-        db.query(FigureTag).filter(FigureTag.figure_id == figure_id).delete()
+        await db.execute(delete(FigureTag).where(FigureTag.figure_id == figure_id))
 
         # 删除图片记录
-        db.delete(figure)
-        db.commit()
+        await db.delete(figure)
+        await db.commit()
+        cache.invalidate("figures")
 
-        logger.info(f"成功删除图片: {figure.title}")
+        logger.info("成功删除图片: %s", figure.title)
         return {"message": "图片删除成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"删除图片时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("删除图片时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"删除图片时发生错误: {str(e)}")
 
 
 # 创建新图片
 @router.post("/admin/figures")
-def create_figure(figure_data: CreateFigureRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建图片请求: {figure_data.title}")
+async def create_figure(figure_data: CreateFigureRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建图片请求: %s", figure_data.title)
     try:
         # 状态映射
         status_map = {'draft': 0, 'published': 1, 'recycled': 2}
@@ -289,7 +423,7 @@ def create_figure(figure_data: CreateFigureRequest, db: Session = Depends(databa
         import re
         url_pattern = r'^https?://.+\.(jpg|jpeg|png|gif|webp)(\?.*)?$'
         if not re.match(url_pattern, figure_data.url, re.IGNORECASE):
-            logger.warning(f"图片URL格式不正确: {figure_data.url}")
+            logger.warning("图片URL格式不正确: %s", figure_data.url)
             raise HTTPException(status_code=400, detail="请输入有效的图片URL（支持jpg、png、gif、webp格式）")
 
         # 创建图片记录
@@ -301,27 +435,28 @@ def create_figure(figure_data: CreateFigureRequest, db: Session = Depends(databa
         )
 
         db.add(new_figure)
-        db.commit()
-        db.refresh(new_figure)
+        await db.commit()
+        await db.refresh(new_figure)
 
         # 处理标签
         for tag_name in figure_data.tags or []:
             if not tag_name.strip():
                 continue
 
-            tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
             if not tag:
                 tag = Tag(name=tag_name.strip())
                 db.add(tag)
-                db.flush()
+                await db.flush()
 
             # 创建图片-标签关联
             figure_tag = FigureTag(figure_id=new_figure.id, tag_id=tag.id)
             db.add(figure_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("figures")
 
-        logger.info(f"成功创建图片: {new_figure.title}")
+        logger.info("成功创建图片: %s", new_figure.title)
         return {
             "message": "图片上传成功",
             "id": new_figure.id,
@@ -329,21 +464,21 @@ def create_figure(figure_data: CreateFigureRequest, db: Session = Depends(databa
         }
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"创建图片时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("创建图片时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建图片时发生错误: {str(e)}")
 
 
 # 编辑图片信息
 @router.put("/admin/figures/{figure_id}")
-def update_figure(figure_id: int, figure_data: UpdateFigureRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到编辑图片信息请求: ID={figure_id}")
+async def update_figure(figure_id: int, figure_data: UpdateFigureRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到编辑图片信息请求: ID=%s", figure_id)
     try:
         # 查找图片
-        figure = db.query(Figure).filter(Figure.id == figure_id).first()
+        figure = await db.scalar(select(Figure).where(Figure.id == figure_id))
         if not figure:
             raise HTTPException(status_code=404, detail="图片未找到")
 
@@ -357,7 +492,7 @@ def update_figure(figure_id: int, figure_data: UpdateFigureRequest, db: Session
             import re
             url_pattern = r'^https?://.+\.(jpg|jpeg|png|gif|webp)(\?.*)?$'
             if not re.match(url_pattern, figure_data.url, re.IGNORECASE):
-                logger.warning(f"图片URL格式不正确: {figure_data.url}")
+                logger.warning("图片URL格式不正确: %s", figure_data.url)
                 raise HTTPException(status_code=400, detail="请输入有效的图片URL（支持jpg、png、gif、webp格式）")
 
             figure.url = figure_data.url
@@ -369,26 +504,27 @@ def update_figure(figure_id: int, figure_data: UpdateFigureRequest, db: Session
         # 处理标签更新
         if figure_data.tags is not None:
             # 删除现有标签关联
-            db.query(FigureTag).filter(FigureTag.figure_id == figure_id).delete()
+            await db.execute(delete(FigureTag).where(FigureTag.figure_id == figure_id))
 
             # 添加新标签
             for tag_name in figure_data.tags:
                 if not tag_name.strip():
                     continue
 
-                tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+                tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
                 if not tag:
                     tag = Tag(name=tag_name.strip())
                     db.add(tag)
-                    db.flush()
+                    await db.flush()
 
                 # 创建图片-标签关联
                 figure_tag = FigureTag(figure_id=figure.id, tag_id=tag.id)
                 db.add(figure_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("figures")
 
-        logger.info(f"成功编辑图片信息: {figure.title}")
+        logger.info("成功编辑图片信息: %s", figure.title)
         return {
             "message": "图片信息编辑成功",
             "id": figure.id,
@@ -398,6 +534,6 @@ def update_figure(figure_id: int, figure_data: UpdateFigureRequest, db: Session
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"编辑图片信息时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("编辑图片信息时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"编辑图片信息时发生错误: {str(e)}")
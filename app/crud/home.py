@@ -0,0 +1,106 @@
+import sys
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+sys.path.append("..")
+import cache
+import database
+from database import Article, FavoriteImage, Project, Timeline
+import logging
+import query_budget
+import responses
+
+logger = logging.getLogger("home_api")
+
+router = APIRouter()
+
+# 首页文档依赖的实体命名空间，任一命名空间失效(写接口调用 cache.invalidate)后重新生成
+HOME_NAMESPACES = ("articles", "projects", "timeline", "favorite_images")
+
+# 每部分条目数上限
+MAX_LIMIT = 50
+
+DEFAULT_IMAGE_URL = "https://ooo.0x0.ooo/2025/09/18/OlGAw6.jpg"
+
+
+def _format_date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+# 生成首页文档: 最新文章、最新项目、最近时间线和轮播图片，各一条查询
+async def _build_home(db: AsyncSession, articles: int, projects: int, timeline: int, images: int) -> bytes:
+    article_rows = (await db.scalars(
+        select(Article).options(selectinload(Article.tags)).where(Article.status == 1)
+        .order_by(Article.date.desc(), Article.id.desc()).limit(articles)
+    )).all()
+    project_rows = (await db.scalars(
+        select(Project).options(selectinload(Project.tags)).where(Project.status == 1)
+        .order_by(Project.date.desc(), Project.id.desc()).limit(projects)
+    )).all()
+    timeline_rows = (await db.scalars(
+        select(Timeline).order_by(Timeline.timestamp.desc()).limit(timeline)
+    )).all()
+    image_rows = (await db.scalars(select(FavoriteImage).order_by(FavoriteImage.id).limit(images))).all()
+
+    # 各部分字段与 /api/articles、/api/projects、/api/timeline、/api/favorite-images 一致
+    return responses.dumps({
+        "articles": [{
+            "id": article.id,
+            "title": article.title,
+            "slug": article.slug,
+            "summary": article.summary,
+            "category": article.category,
+            "date": _format_date(article.date),
+            "tags": [tag.name for tag in article.tags]
+        } for article in article_rows],
+        "projects": [{
+            "id": project.id,
+            "title": project.title,
+            "slug": project.slug,
+            "summary": project.summary,
+            "date": _format_date(project.date),
+            "tags": [tag.name for tag in project.tags]
+        } for project in project_rows],
+        "timeline": [{
+            "id": item.id,
+            "timestamp": item.timestamp.isoformat() if item.timestamp else None,
+            "content": item.content
+        } for item in timeline_rows],
+        "images": [{
+            "id": image.id,
+            "url": image.url or DEFAULT_IMAGE_URL
+        } for image in image_rows],
+    })
+
+
+"""
+首页聚合数据
+一次请求返回首页需要的最新文章、最新项目、最近时间线和轮播图片，
+代替分别请求 /articles、/projects、/timeline、/favorite-images(文章和项目不再下载全量列表)。
+生成的 JSON 字节按各命名空间的版本号缓存，相关内容的写接口调用后自动失效。
+"""
+@router.get("/home")
+@query_budget.budget(6)
+async def get_home(
+    articles: int = 3,
+    projects: int = 3,
+    timeline: int = 20,
+    images: int = 20,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到获取首页数据的请求")
+    for name, value in (("articles", articles), ("projects", projects), ("timeline", timeline), ("images", images)):
+        if not 0 <= value <= MAX_LIMIT:
+            raise HTTPException(status_code=400, detail=f"{name} 必须在 0 到 {MAX_LIMIT} 之间")
+
+    # 键中包含依赖命名空间的版本号，任一实体变化后旧文档不再命中(由 cache 的条目上限淘汰)
+    key = (articles, projects, timeline, images) + tuple(cache.version(ns) for ns in HOME_NAMESPACES)
+    try:
+        body = await cache.get_or_set("home", key, lambda: _build_home(db, articles, projects, timeline, images))
+    except Exception as e:
+        logger.error("获取首页数据时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"获取首页数据时发生错误: {str(e)}")
+    return responses.json_bytes_response(body)
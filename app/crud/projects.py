@@ -5,20 +5,50 @@ from datetime import datetime
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 sys.path.append("..")
+import bulk
+import cache
 import database
+import dist_manifest
+import facets
+import fieldsets
+import listing
 from database import Project, Tag, ProjectTag
+from tagging import count_tags, filter_by_tags
 import logging
+import logging_config
+import query_budget
+import responses
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("projects_api")
 
 router = APIRouter()
 
+# 列表接口可返回的字段(fields= 参数)及取值方式
+PROJECT_FIELDS = {
+    "id": lambda project: project.id,
+    "title": lambda project: project.title,
+    "slug": lambda project: project.slug,
+    "summary": lambda project: project.summary,
+    "date": lambda project: project.date.strftime('%Y-%m-%d') if project.date else None,
+    "tags": lambda project: [tag.name for tag in project.tags]
+}
+
+# 状态映射
+STATUS_NAMES = {0: 'draft', 1: 'published', 2: 'recycled'}
+
+# 管理员列表额外返回状态
+ADMIN_PROJECT_FIELDS = {
+    **PROJECT_FIELDS,
+    "status": lambda project: STATUS_NAMES.get(project.status, 'draft')
+}
+
 
 # ===== REQUEST MODELS =====
 class CreateProjectRequest(BaseModel):
@@ -40,51 +70,96 @@ class UpdateProjectRequest(BaseModel):
     date: Optional[str] = None
 
 
-# 获取所有项目，按日期倒序排列
+# 获取已发布项目，默认按日期倒序排列
+# fields 为逗号分隔的字段列表(如 slug,title)，只查询并返回这些字段
+# 筛选: tags 逗号分隔的标签(match=all/any)，date_from/date_to 日期范围(含两端)
+# 排序: sort=date_desc/date_asc/title_asc/title_desc/id_desc/id_asc
+# 分页: 传入 page/limit 按页码分页，传入 cursor 按游标分页；都不传时返回完整列表(兼容旧调用方)
 @router.get("/projects")
-def get_projects(db: Session = Depends(database.get_db)):
-    logger.info("收到获取项目数据的请求")
+@query_budget.budget(4)
+@responses.cached("projects")
+async def get_projects(
+    fields: str = None,
+    tags: str = None,
+    match: str = "all",
+    date_from: str = None,
+    date_to: str = None,
+    sort: str = "date_desc",
+    page: int = None,
+    limit: int = None,
+    cursor: str = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到获取项目数据的请求，字段: %s, 标签: %s, 日期: %s ~ %s, 排序: %s, 页码: %s, 每页数量: %s, 游标: %s",
+                 fields, tags, date_from, date_to, sort, page, limit, cursor)
     try:
-        projects = db.query(Project).filter(Project.status == 1).order_by(Project.date.desc()).all()
-        logger.info(f"成功获取到 {len(projects)} 个已发布项目")
+        if match not in ("all", "any"):
+            raise HTTPException(status_code=400, detail="match 参数只能为 all 或 any")
+        try:
+            requested = fieldsets.parse(fields, PROJECT_FIELDS)
+            order_columns, descending = listing.sort_columns(Project, sort)
+            start = listing.parse_date(date_from, "date_from")
+            end = listing.parse_date(date_to, "date_to")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # 总数缓存的键，只与筛选条件有关
+        count_key = ("count", tags, match, date_from, date_to)
+
+        # 筛选条件全部在 SQL 中执行
+        query = listing.filter_date_range(select(Project).where(Project.status == 1), Project.date, start, end)
+        if tags:
+            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+            if tag_list:
+                query = await filter_by_tags(db, query, Project.id, ProjectTag.project_id, tag_list, match_all=(match == "all"))
+
+        options = fieldsets.load_options(Project, requested, order_columns)
+
+        if page is None and limit is None and cursor is None:
+            projects = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            pagination = None
+        else:
+            try:
+                projects, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                                page, limit, cursor, with_total, "projects", count_key)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 个已发布项目", len(projects))
 
         # 转换为前端需要的格式
         projects_data = []
         for project in projects:
-            # 获取项目的标签
-            project_tags = db.query(Tag).join(ProjectTag).filter(ProjectTag.project_id == project.id).all()
-            tags = [tag.name for tag in project_tags]
-
-            project_dict = {
-                "id": project.id,
-                "title": project.title,
-                "slug": project.slug,
-                "summary": project.summary,
-                "date": project.date.strftime('%Y-%m-%d') if project.date else None,
-                "tags": tags
-            }
-            projects_data.append(project_dict)
-            logger.info(f"项目数据: ID={project.id}, 标题={project.title}")
-
-        return projects_data
+            projects_data.append(fieldsets.serialize(project, PROJECT_FIELDS, requested))
+            logger.debug("项目数据: ID=%s", project.id, extra=logging_config.SAMPLED)
+
+        if pagination is None:
+            return projects_data
+        return {
+            "data": projects_data,
+            "pagination": pagination
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取项目数据时发生错误: {str(e)}")
+        logger.error("获取项目数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取项目数据时发生错误: {str(e)}")
 
 
 # 根据slug获取单个项目详情
 @router.get("/projects/{project_slug}")
-def get_project_by_slug(project_slug: str, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取项目详情的请求，slug: {project_slug}")
+@query_budget.budget(2)
+@responses.cached("projects")
+async def get_project_by_slug(project_slug: str, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取项目详情的请求，slug: %s", project_slug)
     try:
-        project = db.query(Project).filter(Project.slug == project_slug, Project.status == 1).first()
+        project = await db.scalar(select(Project).options(selectinload(Project.tags)).where(Project.slug == project_slug, Project.status == 1))
         if not project:
-            logger.warning(f"未找到项目，slug: {project_slug}")
+            logger.warning("未找到项目，slug: %s", project_slug)
             raise HTTPException(status_code=404, detail="项目未找到")
 
         # 获取项目的title
-        project_tags = db.query(Tag).join(ProjectTag).filter(ProjectTag.project_id == project.id).all()
-        tags = [tag.name for tag in project_tags]
+        tags = [tag.name for tag in project.tags]
 
         project_dict = {
             "id": project.id,
@@ -95,85 +170,162 @@ def get_project_by_slug(project_slug: str, db: Session = Depends(database.get_db
             "tags": tags
         }
 
-        logger.info(f"成功获取项目详情: {project.title}")
+        logger.debug("成功获取项目详情: %s", project.title)
         return project_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取项目详情时发生错误: {str(e)}")
+        logger.error("获取项目详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取项目详情时发生错误: {str(e)}")
 
 
 # 获取所有项目标签及其项目数量
 @router.get("/project-tags")
-def get_all_project_tags(db: Session = Depends(database.get_db)):
-    logger.info("收到获取所有项目标签的请求")
+@query_budget.budget(1)
+@responses.cached("projects")
+async def get_all_project_tags(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取所有项目标签的请求")
     try:
-        all_tags = []
-        tag_counts = {}
+        # 已发布项目的标签统计按 GROUP BY 聚合，结果缓存到项目写操作发生为止
+        result = await cache.get_or_set("projects", "tag_counts",
+                                        lambda: count_tags(db, ProjectTag, ProjectTag.project_id, Project.status))
 
-        # 获取所有已发布项目的标签统计
-        projects = db.query(Project).filter(Project.status == 1).all()
-        for project in projects:
-            project_tags = db.query(Tag).join(ProjectTag).filter(ProjectTag.project_id == project.id).all()
-            for tag in project_tags:
-                if tag.name not in all_tags:
-                    all_tags.append(tag.name)
-                tag_counts[tag.name] = tag_counts.get(tag.name, 0) + 1
-
-        logger.info(f"成功获取 {len(all_tags)} 个项目标签")
-        return {
-            "tags": all_tags,
-            "counts": tag_counts
-        }
+        logger.debug("成功获取 %s 个项目标签", len(result['tags']))
+        return result
     except Exception as e:
-        logger.error(f"获取项目标签时发生错误: {str(e)}")
+        logger.error("获取项目标签时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取项目标签时发生错误: {str(e)}")
 
 
-# 管理员获取所有项目(包含所有状态)，按日期倒序排列
+# 管理员获取项目(包含所有状态)，默认按日期倒序排列
+# fields 参数同 /projects，另可选 status
+# 筛选: status(draft/published/recycled)、tags(match=all/any)、search 标题或摘要关键词
+# 传入 page/limit 时分页返回，并附带各状态、标签的分面计数；都不传时返回完整列表(兼容旧调用方)
 @router.get("/admin/projects")
-def get_all_projects_admin(db: Session = Depends(database.get_db)):
-    logger.info("收到管理员获取全部项目数据的请求")
+@query_budget.budget(5)
+@responses.cached("projects")
+async def get_all_projects_admin(
+    fields: str = None,
+    status: str = None,
+    tags: str = None,
+    match: str = "all",
+    search: str = None,
+    sort: str = "date_desc",
+    page: int = None,
+    limit: int = None,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到管理员获取项目数据的请求，字段: %s, 状态: %s, 标签: %s, 搜索: %s, 排序: %s, 页码: %s, 每页数量: %s",
+                 fields, status, tags, search, sort, page, limit)
     try:
-        projects = db.query(Project).order_by(Project.date.desc()).all()
-        logger.info(f"成功获取到 {len(projects)} 个项目（所有状态）")
+        try:
+            requested = fieldsets.parse(fields, ADMIN_PROJECT_FIELDS)
+            order_columns, descending = listing.sort_columns(Project, sort)
+            # 项目表没有全文索引，关键词使用 LIKE 匹配
+            conditions = await facets.build_conditions(db, Project, ProjectTag.project_id, [Project.title, Project.summary],
+                                                       status=status, tags=tags, match=match,
+                                                       keyword=search, fulltext=False)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        query = select(Project).where(*conditions.values())
+        options = fieldsets.load_options(Project, requested, order_columns)
+
+        if page is None and limit is None:
+            projects = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            pagination = None
+        else:
+            count_key = ("admin_count", status, tags, match, search)
+            try:
+                projects, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                                page, limit, None, False, "projects", count_key)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 个项目（所有状态）", len(projects))
 
         # 转换为前端需要的格式
         projects_data = []
         for project in projects:
-            # 获取项目的标签
-            project_tags = db.query(Tag).join(ProjectTag).filter(ProjectTag.project_id == project.id).all()
-            tags = [tag.name for tag in project_tags]
-
-            # 状态映射
-            status_map = {0: 'draft', 1: 'published', 2: 'recycled'}
-
-            project_dict = {
-                "id": project.id,
-                "title": project.title,
-                "slug": project.slug,
-                "summary": project.summary,
-                "date": project.date.strftime('%Y-%m-%d') if project.date else None,
-                "tags": tags,
-                "status": status_map.get(project.status, 'draft')
-            }
-            projects_data.append(project_dict)
-            logger.info(f"项目数据: ID={project.id}, 标题={project.title}, 状态={project.status}")
-
-        return projects_data
+            projects_data.append(fieldsets.serialize(project, ADMIN_PROJECT_FIELDS, requested))
+            logger.debug("项目数据: ID=%s", project.id, extra=logging_config.SAMPLED)
+
+        if pagination is None:
+            return projects_data
+        return {
+            "data": projects_data,
+            "pagination": pagination,
+            "facets": await facets.count_facets(db, Project, ProjectTag.project_id, conditions)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取项目数据时发生错误: {str(e)}")
+        logger.error("获取项目数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取项目数据时发生错误: {str(e)}")
 
 
+# 批量修改项目状态，请求体 {"ids": [...], "status": "draft|published|recycled"}
+# 一条 UPDATE ... WHERE id IN (...) 在同一事务中完成，逐条返回结果(不存在的 id 标记为 not_found)
+@router.patch("/projects/bulk/status")
+async def bulk_update_project_status(request: bulk.BulkStatusRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量修改项目状态请求: %s 条, 状态=%s", len(request.ids), request.status)
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+            new_status = bulk.parse_status(request.status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.update_status(db, Project, ids, new_status)
+        await db.commit()
+        cache.invalidate("projects")
+
+        logger.info("成功批量修改项目状态: %s 条 -> %s", len(existing), request.status)
+        return bulk.report(ids, existing, "updated")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量修改项目状态时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量修改项目状态时发生错误: {str(e)}")
+
+
+# 批量删除项目，请求体 {"ids": [...]}
+# 标签关联和项目记录各一条 DELETE，提交后再统一删除markdown文件
+@router.post("/projects/bulk/delete")
+async def bulk_delete_projects(request: bulk.BulkDeleteRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量删除项目请求: %s 条", len(request.ids))
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.delete_items(db, Project, ProjectTag.project_id, ids, [Project.slug])
+        await db.commit()
+        cache.invalidate("projects")
+
+        # 删除markdown文件，失败的记录在结果中附带 warning
+        warnings = await run_in_threadpool(delete_project_files, list(existing.values()))
+
+        logger.info("成功批量删除项目: %s 条", len(existing))
+        return bulk.report(ids, existing, "deleted", warnings)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量删除项目时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量删除项目时发生错误: {str(e)}")
+
+
 # 修改项目状态
 @router.patch("/projects/{project_id}/status")
-def update_project_status(project_id: int, status_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到修改项目状态请求: ID={project_id}, 状态={status_data.get('status')}")
+async def update_project_status(project_id: int, status_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到修改项目状态请求: ID=%s, 状态=%s", project_id, status_data.get('status'))
     try:
         # 查找项目
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await db.scalar(select(Project).where(Project.id == project_id))
         if not project:
             raise HTTPException(status_code=404, detail="项目未找到")
 
@@ -187,24 +339,25 @@ def update_project_status(project_id: int, status_data: dict, db: Session = Depe
         # 更新状态
         old_status = project.status
         project.status = status_map[new_status]
-        db.commit()
+        await db.commit()
+        cache.invalidate("projects")
 
-        logger.info(f"成功修改项目状态: {project.title}, {old_status} -> {project.status}")
+        logger.info("成功修改项目状态: %s, %s -> %s", project.title, old_status, project.status)
         return {"message": "项目状态修改成功", "status": new_status}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"修改项目状态时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("修改项目状态时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"修改项目状态时发生错误: {str(e)}")
 
 
 # 项目管理api
 # 创建新项目
 @router.post("/projects")
-def create_project(project_data: CreateProjectRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建项目请求: {project_data.title}")
+async def create_project(project_data: CreateProjectRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建项目请求: %s", project_data.title)
     try:
         # 生成或验证slug，自动从标题生成
         if not project_data.slug:
@@ -215,7 +368,7 @@ def create_project(project_data: CreateProjectRequest, db: Session = Depends(dat
         # 确保slug唯一性
         base_slug = slug
         counter = 1
-        while db.query(Project).filter(Project.slug == slug).first():
+        while await db.scalar(select(Project).where(Project.slug == slug)):
             slug = f"{base_slug}-{counter}"
             counter += 1
 
@@ -225,7 +378,7 @@ def create_project(project_data: CreateProjectRequest, db: Session = Depends(dat
             try:
                 project_date = datetime.strptime(project_data.date, '%Y-%m-%d').date()
             except ValueError:
-                logger.warning(f"日期格式错误，使用当前日期: {project_data.date}")
+                logger.warning("日期格式错误，使用当前日期: %s", project_data.date)
 
         # 状态映射
         status_map = {'draft': 0, 'published': 1, 'recycled': 2}
@@ -241,33 +394,34 @@ def create_project(project_data: CreateProjectRequest, db: Session = Depends(dat
         )
 
         db.add(new_project)
-        db.commit()
-        db.refresh(new_project)
+        await db.commit()
+        await db.refresh(new_project)
 
         # 处理标签
         for tag_name in project_data.tags or []:
             if not tag_name.strip():
                 continue
 
-            tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
             if not tag:
                 tag = Tag(name=tag_name.strip())
                 db.add(tag)
-                db.flush()
+                await db.flush()
 
             # 创建项目-标签关联
             project_tag = ProjectTag(project_id=new_project.id, tag_id=tag.id)
             db.add(project_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("projects")
 
         # 保存项目markdown文件
         try:
-            save_project_file(new_project, project_data.content)
+            await run_in_threadpool(save_project_file, new_project, project_data.content)
         except Exception as e:
-            logger.warning(f"保存项目文件失败: {str(e)}")
+            logger.warning("保存项目文件失败: %s", e)
 
-        logger.info(f"成功创建项目: {new_project.title}")
+        logger.info("成功创建项目: %s", new_project.title)
         return {
             "message": "项目上传成功",
             "id": new_project.id,
@@ -275,21 +429,21 @@ def create_project(project_data: CreateProjectRequest, db: Session = Depends(dat
         }
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"创建项目时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("创建项目时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建项目时发生错误: {str(e)}")
 
 
 # 编辑项目信息
 @router.put("/projects/{project_id}")
-def update_project(project_id: int, project_data: UpdateProjectRequest, db: Session = Depends(database.get_db)):
-    logger.info(f"收到编辑项目信息请求: ID={project_id}")
+async def update_project(project_id: int, project_data: UpdateProjectRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到编辑项目信息请求: ID=%s", project_id)
     try:
         # 查找项目
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await db.scalar(select(Project).where(Project.id == project_id))
         if not project:
             raise HTTPException(status_code=404, detail="项目未找到")
 
@@ -302,7 +456,7 @@ def update_project(project_id: int, project_data: UpdateProjectRequest, db: Sess
             try:
                 project.date = datetime.strptime(project_data.date, '%Y-%m-%d').date()
             except ValueError:
-                logger.warning(f"日期格式错误: {project_data.date}")
+                logger.warning("日期格式错误: %s", project_data.date)
         if project_data.status is not None:
             status_map = {'draft': 0, 'published': 1, 'recycled': 2}
             if project_data.status in status_map:
@@ -311,18 +465,18 @@ def update_project(project_id: int, project_data: UpdateProjectRequest, db: Sess
         # 处理标签更新
         if project_data.tags is not None:
             # 删除现有标签关联
-            db.query(ProjectTag).filter(ProjectTag.project_id == project_id).delete()
+            await db.execute(delete(ProjectTag).where(ProjectTag.project_id == project_id))
 
             # 添加新标签
             for tag_name in project_data.tags:
                 if not tag_name.strip():
                     continue
 
-                tag = db.query(Tag).filter(Tag.name == tag_name.strip()).first()
+                tag = await db.scalar(select(Tag).where(Tag.name == tag_name.strip()))
                 if not tag:
                     tag = Tag(name=tag_name.strip())
                     db.add(tag)
-                    db.flush()
+                    await db.flush()
 
                 # 创建项目-标签关联
                 project_tag = ProjectTag(project_id=project.id, tag_id=tag.id)
@@ -331,13 +485,14 @@ def update_project(project_id: int, project_data: UpdateProjectRequest, db: Sess
         # 更新文件内容
         if project_data.content is not None:
             try:
-                save_project_file(project, project_data.content)
+                await run_in_threadpool(save_project_file, project, project_data.content)
             except Exception as e:
-                logger.warning(f"更新项目文件失败: {str(e)}")
+                logger.warning("更新项目文件失败: %s", e)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("projects")
 
-        logger.info(f"成功编辑项目信息: {project.title}")
+        logger.info("成功编辑项目信息: %s", project.title)
         return {
             "message": "项目信息编辑成功",
             "id": project.id,
@@ -347,48 +502,46 @@ def update_project(project_id: int, project_data: UpdateProjectRequest, db: Sess
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"编辑项目信息时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("编辑项目信息时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"编辑项目信息时发生错误: {str(e)}")
 
 
 # 编辑项目信息(POST方法，用于兼容性)
 @router.post("/projects/{project_id}/edit")
-def update_project_post(project_id: int, project_data: UpdateProjectRequest, db: Session = Depends(database.get_db)):
-    return update_project(project_id, project_data, db)
+async def update_project_post(project_id: int, project_data: UpdateProjectRequest, db: AsyncSession = Depends(database.get_db)):
+    return await update_project(project_id, project_data, db)
 
 
 # 删除项目，同时删除文件
 @router.delete("/projects/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到删除项目请求: ID={project_id}")
+async def delete_project(project_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到删除项目请求: ID=%s", project_id)
     try:
         # 查找项目
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await db.scalar(select(Project).where(Project.id == project_id))
         if not project:
             raise HTTPException(status_code=404, detail="项目未找到")
 
         # 删除项目-标签关联
-        db.query(ProjectTag).filter(ProjectTag.project_id == project_id).delete()
-
-        # 删除markdown文件
-        try:
-            delete_project_file(project)
-        except Exception as e:
-            logger.warning(f"删除项目文件失败: {str(e)}")
+        await db.execute(delete(ProjectTag).where(ProjectTag.project_id == project_id))
 
         # 删除项目记录
-        db.delete(project)
-        db.commit()
+        await db.delete(project)
+        await db.commit()
+        cache.invalidate("projects")
 
-        logger.info(f"成功删除项目: {project.title}")
+        # 提交成功后再删除markdown文件，回滚时文件不受影响
+        await run_in_threadpool(delete_project_file, project)
+
+        logger.info("成功删除项目: %s", project.title)
         return {"message": "项目删除成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"删除项目时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("删除项目时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"删除项目时发生错误: {str(e)}")
 
 
@@ -427,26 +580,38 @@ def save_project_file(project: Project, content: str):
 
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(file_content)
-            logger.info(f"成功保存项目文件: {file_path}")
+            logger.info("成功保存项目文件: %s", file_path)
+            dist_manifest.refresh_file(file_path)
 
     except Exception as e:
-        logger.error(f"保存项目文件失败: {str(e)}")
+        logger.error("保存项目文件失败: %s", e)
         raise
 
 
-# 删除项目文件
-def delete_project_file(project: Project):
-    try:
-        base_paths = ["../frontend/dist/articles/projects", "../frontend/public/articles/projects"]
-
-        for base_path in base_paths:
+# 删除项目文件(dist和public)
+# 单个文件删除失败只记录日志并继续处理其余路径，返回失败信息列表
+def delete_project_file(project: Project) -> list:
+    errors = []
+    for base_path in ["../frontend/dist/articles/projects", "../frontend/public/articles/projects"]:
+        try:
             file_path = os.path.join(base_path, f"{project.slug}.md")
             if os.path.exists(file_path):
                 os.remove(file_path)
-                logger.info(f"成功删除项目文件: {file_path}")
+                logger.info("成功删除项目文件: %s", file_path)
+                dist_manifest.refresh_file(file_path)
             else:
-                logger.warning(f"项目文件不存在: {file_path}")
-
-    except Exception as e:
-        logger.error(f"删除项目文件失败: {str(e)}")
-        raise
+                logger.warning("项目文件不存在: %s", file_path)
+        except Exception as e:
+            logger.error("删除项目文件失败: %s", e)
+            errors.append(f"删除项目文件失败: {e}")
+    return errors
+
+
+# 批量删除项目文件，返回 {项目ID: 失败信息}
+def delete_project_files(rows) -> dict:
+    warnings = {}
+    for row in rows:
+        errors = delete_project_file(row)
+        if errors:
+            warnings[row.id] = "; ".join(errors)
+    return warnings
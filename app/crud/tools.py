@@ -1,67 +1,109 @@
 import sys
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 sys.path.append("..")
+import bulk
+import cache
 import database
+import facets
+import fieldsets
+import listing
 from database import Tool, Tag, ToolTag
+from pagination import count_rows, fetch_keyset_page
+from search import apply_search
+from tagging import count_tags, filter_by_tags
 import logging
+import logging_config
+import query_budget
+import responses
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("tools_api")
 
 router = APIRouter()
 
+# 状态映射
+STATUS_NAMES = {0: 'draft', 1: 'published', 2: 'recycled'}
+
+# 管理员列表可返回的字段(fields= 参数)及取值方式
+ADMIN_TOOL_FIELDS = {
+    "id": lambda tool: tool.id,
+    "title": lambda tool: tool.title,
+    "description": lambda tool: tool.description,
+    "url": lambda tool: tool.url,
+    "tags": lambda tool: [tag.name for tag in tool.tags],
+    "status": lambda tool: STATUS_NAMES.get(tool.status, 'draft')
+}
+
 
 # 获取所有工具（支持分页和筛选）
 @router.get("/tools")
-def get_tools(
+@query_budget.budget(4)
+@responses.cached("tools")
+async def get_tools(
     page: int = 1,
     limit: int = 6,
     search: str = None,
     tags: str = None,
-    db: Session = Depends(database.get_db)
+    match: str = "all",
+    cursor: str = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(database.get_db)
 ):
-    logger.info(f"收到获取工具数据的请求，页码: {page}, 每页数量: {limit}, 搜索: {search}, 标签: {tags}")
+    logger.debug("收到获取工具数据的请求，页码: %s, 每页数量: %s, 搜索: %s, 标签: %s, 游标: %s", page, limit, search, tags, cursor)
     try:
+        if match not in ("all", "any"):
+            raise HTTPException(status_code=400, detail="match 参数只能为 all 或 any")
+
+        # 每页数量上限与文章、项目列表一致，避免一次请求取出整张表
+        limit = min(limit, listing.MAX_LIMIT)
+
+        # 总数缓存的键，需在筛选参数被改写前确定
+        count_key = ("count", search, tags, match)
+
         # 构建基础查询
-        query = db.query(Tool).filter(Tool.status == 1)
+        query = select(Tool).where(Tool.status == 1)
         
-        # 应用搜索筛选
+        # 应用搜索筛选(MySQL 下走全文索引，relevance 为相关度表达式)
+        relevance = None
         if search:
-            search = f"%{search}%"
-            query = query.filter(
-                (Tool.title.ilike(search)) |
-                (Tool.description.ilike(search))
-            )
+            query, relevance = await apply_search(db, query, [Tool.title, Tool.description], search)
         
-        # 应用标签筛选 (AND 逻辑 - 必须包含所有选中的标签)
+        # 应用标签筛选: match=all 须包含所有选中的标签(默认)，match=any 包含任一标签即可
         if tags:
             tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
             if tag_list:
-                # 对每个标签进行单独的join和filter，实现AND筛选
-                for tag_name in tag_list:
-                    # 为每个标签创建一个子查询，确保工具包含所有选中的标签
-                    subquery = db.query(ToolTag.tool_id).join(Tag).filter(Tag.name == tag_name).subquery()
-                    query = query.filter(Tool.id.in_(subquery))
-        
-        # 获取总数量
-        total_count = query.count()
+                query = await filter_by_tags(db, query, Tool.id, ToolTag.tool_id, tag_list, match_all=(match == "all"))
         
-        # 计算偏移量并获取分页数据
-        offset = (page - 1) * limit
-        tools = query.offset(offset).limit(limit).all()
+        if cursor is not None:
+            # 游标分页: 传入 cursor 参数时启用(第一页传空字符串)，按 id 倒序直接定位到下一页
+            if limit < 1:
+                raise HTTPException(status_code=400, detail="每页数量必须大于0")
+            try:
+                tools, next_cursor = await fetch_keyset_page(db, query.options(selectinload(Tool.tags)), [Tool.id], cursor, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            # 获取总数量
+            total_count = await count_rows(db, query)
+
+            # 全文搜索时按相关度排序
+            page_query = query.order_by(relevance.desc()) if relevance is not None else query
+
+            # 计算偏移量并获取分页数据
+            offset = (page - 1) * limit
+            tools = (await db.scalars(page_query.options(selectinload(Tool.tags)).offset(offset).limit(limit))).all()
         
-        logger.info(f"成功获取到 {len(tools)} 个已发布工具")
+        logger.debug("成功获取到 %s 个已发布工具", len(tools))
 
         # 转换为前端需要的格式
         tools_data = []
         for tool in tools:
             # 获取工具的标签
-            tool_tags = db.query(Tag).join(ToolTag).filter(ToolTag.tool_id == tool.id).all()
-            tags = [tag.name for tag in tool_tags]
+            tags = [tag.name for tag in tool.tags]
 
             tool_dict = {
                 "id": tool.id,
@@ -72,6 +114,20 @@ def get_tools(
             }
             tools_data.append(tool_dict)
 
+        if cursor is not None:
+            pagination = {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+            # 总数为可选项，缓存到工具写操作发生为止
+            if with_total:
+                pagination["total"] = await cache.get_or_set("tools", count_key, lambda: count_rows(db, query))
+            return {
+                "data": tools_data,
+                "pagination": pagination
+            }
+
         # 返回分页数据
         return {
             "data": tools_data,
@@ -82,24 +138,27 @@ def get_tools(
                 "pages": (total_count + limit - 1) // limit if limit > 0 else 0  # 计算总页数
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取工具数据时发生错误: {str(e)}")
+        logger.error("获取工具数据时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取工具数据时发生错误: {str(e)}")
 
 
 # 根据ID获取单个工具详情
 @router.get("/tools/{tool_id}")
-def get_tool_by_id(tool_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到获取工具详情的请求，ID: {tool_id}")
+@query_budget.budget(2)
+@responses.cached("tools")
+async def get_tool_by_id(tool_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取工具详情的请求，ID: %s", tool_id)
     try:
-        tool = db.query(Tool).filter(Tool.id == tool_id, Tool.status == 1).first()
+        tool = await db.scalar(select(Tool).options(selectinload(Tool.tags)).where(Tool.id == tool_id, Tool.status == 1))
         if not tool:
-            logger.warning(f"未找到工具，ID: {tool_id}")
+            logger.warning("未找到工具，ID: %s", tool_id)
             raise HTTPException(status_code=404, detail="工具未找到")
 
         # 获取工具的标签
-        tool_tags = db.query(Tag).join(ToolTag).filter(ToolTag.tool_id == tool.id).all()
-        tags = [tag.name for tag in tool_tags]
+        tags = [tag.name for tag in tool.tags]
 
         tool_dict = {
             "id": tool.id,
@@ -109,84 +168,157 @@ def get_tool_by_id(tool_id: int, db: Session = Depends(database.get_db)):
             "tags": tags
         }
 
-        logger.info(f"成功获取工具详情: {tool.title}")
+        logger.debug("成功获取工具详情: %s", tool.title)
         return tool_dict
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取工具详情时发生错误: {str(e)}")
+        logger.error("获取工具详情时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取工具详情时发生错误: {str(e)}")
 
 
 # 获取所有工具标签及其工具数量
 @router.get("/tool-tags")
-def get_all_tool_tags(db: Session = Depends(database.get_db)):
-    logger.info("收到获取所有工具标签的请求")
+@query_budget.budget(1)
+@responses.cached("tools")
+async def get_all_tool_tags(db: AsyncSession = Depends(database.get_db)):
+    logger.debug("收到获取所有工具标签的请求")
     try:
-        all_tags = []
-        tag_counts = {}
-
-        # 获取所有已发布工具的标签统计
-        tools = db.query(Tool).filter(Tool.status == 1).all()
-        for tool in tools:
-            tool_tags = db.query(Tag).join(ToolTag).filter(ToolTag.tool_id == tool.id).all()
-            for tag in tool_tags:
-                if tag.name not in all_tags:
-                    all_tags.append(tag.name)
-                tag_counts[tag.name] = tag_counts.get(tag.name, 0) + 1
+        # 已发布工具的标签统计按 GROUP BY 聚合，结果缓存到工具写操作发生为止
+        result = await cache.get_or_set("tools", "tag_counts",
+                                        lambda: count_tags(db, ToolTag, ToolTag.tool_id, Tool.status))
 
-        logger.info(f"成功获取 {len(all_tags)} 个工具标签")
-        return {
-            "tags": all_tags,
-            "counts": tag_counts
-        }
+        logger.debug("成功获取 %s 个工具标签", len(result['tags']))
+        return result
     except Exception as e:
-        logger.error(f"获取工具标签时发生错误: {str(e)}")
+        logger.error("获取工具标签时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"获取工具标签时发生错误: {str(e)}")
 
 
-# 管理员获取所有工具(包含所有状态)
+# 管理员获取工具(包含所有状态)，默认按 id 顺序排列
+# fields 为逗号分隔的字段列表(如 id,title,status)，只查询并返回这些字段
+# 筛选: status(draft/published/recycled)、tags(match=all/any)、search 标题或描述关键词(MySQL 下走全文索引)
+# 传入 page/limit 时分页返回，并附带各状态、标签的分面计数；都不传时返回完整列表(兼容旧调用方)
 @router.get("/admin/tools")
-def get_all_tools_admin(db: Session = Depends(database.get_db)):
-    logger.info("收到管理员获取全部工具数据的请求")
+@query_budget.budget(5)
+@responses.cached("tools")
+async def get_all_tools_admin(
+    fields: str = None,
+    status: str = None,
+    tags: str = None,
+    match: str = "all",
+    search: str = None,
+    sort: str = "id_asc",
+    page: int = None,
+    limit: int = None,
+    db: AsyncSession = Depends(database.get_db)
+):
+    logger.debug("收到管理员获取工具数据的请求，字段: %s, 状态: %s, 标签: %s, 搜索: %s, 排序: %s, 页码: %s, 每页数量: %s",
+                 fields, status, tags, search, sort, page, limit)
     try:
-        tools = db.query(Tool).all()
-        logger.info(f"成功获取到 {len(tools)} 个工具（所有状态）")
+        try:
+            requested = fieldsets.parse(fields, ADMIN_TOOL_FIELDS)
+            order_columns, descending = listing.sort_columns(Tool, sort)
+            conditions = await facets.build_conditions(db, Tool, ToolTag.tool_id, [Tool.title, Tool.description],
+                                                       status=status, tags=tags, match=match, keyword=search)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        query = select(Tool).where(*conditions.values())
+        options = fieldsets.load_options(Tool, requested, order_columns)
+
+        if page is None and limit is None:
+            tools = (await db.scalars(query.options(*options).order_by(*listing.order_by(order_columns, descending)))).all()
+            pagination = None
+        else:
+            count_key = ("admin_count", status, tags, match, search)
+            try:
+                tools, pagination = await listing.fetch_page(db, query, options, order_columns, descending,
+                                                             page, limit, None, False, "tools", count_key)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logger.debug("成功获取到 %s 个工具（所有状态）", len(tools))
 
         # 转换为前端需要的格式
         tools_data = []
         for tool in tools:
-            # 获取工具的标签
-            tool_tags = db.query(Tag).join(ToolTag).filter(ToolTag.tool_id == tool.id).all()
-            tags = [tag.name for tag in tool_tags]
+            tools_data.append(fieldsets.serialize(tool, ADMIN_TOOL_FIELDS, requested))
+            logger.debug("工具数据: ID=%s", tool.id, extra=logging_config.SAMPLED)
 
-            # 状态映射
-            status_map = {0: 'draft', 1: 'published', 2: 'recycled'}
+        if pagination is None:
+            return tools_data
+        return {
+            "data": tools_data,
+            "pagination": pagination,
+            "facets": await facets.count_facets(db, Tool, ToolTag.tool_id, conditions)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("获取工具数据时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"获取工具数据时发生错误: {str(e)}")
 
-            tool_dict = {
-                "id": tool.id,
-                "title": tool.title,
-                "description": tool.description,
-                "url": tool.url,
-                "tags": tags,
-                "status": status_map.get(tool.status, 'draft')
-            }
-            tools_data.append(tool_dict)
-            logger.info(f"工具数据: ID={tool.id}, 标题={tool.title}, 状态={tool.status}")
 
-        return tools_data
+# 批量修改工具状态，请求体 {"ids": [...], "status": "draft|published|recycled"}
+# 一条 UPDATE ... WHERE id IN (...) 在同一事务中完成，逐条返回结果(不存在的 id 标记为 not_found)
+@router.patch("/tools/bulk/status")
+async def bulk_update_tool_status(request: bulk.BulkStatusRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量修改工具状态请求: %s 条, 状态=%s", len(request.ids), request.status)
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+            new_status = bulk.parse_status(request.status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.update_status(db, Tool, ids, new_status)
+        await db.commit()
+        cache.invalidate("tools")
+
+        logger.info("成功批量修改工具状态: %s 条 -> %s", len(existing), request.status)
+        return bulk.report(ids, existing, "updated")
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"获取工具数据时发生错误: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"获取工具数据时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("批量修改工具状态时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量修改工具状态时发生错误: {str(e)}")
+
+
+# 批量删除工具，请求体 {"ids": [...]}
+# 标签关联和工具记录各一条 DELETE，在同一事务中提交
+@router.post("/tools/bulk/delete")
+async def bulk_delete_tools(request: bulk.BulkDeleteRequest, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到批量删除工具请求: %s 条", len(request.ids))
+    try:
+        try:
+            ids = bulk.parse_ids(request.ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        existing = await bulk.delete_items(db, Tool, ToolTag.tool_id, ids)
+        await db.commit()
+        cache.invalidate("tools")
+
+        logger.info("成功批量删除工具: %s 条", len(existing))
+        return bulk.report(ids, existing, "deleted")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("批量删除工具时发生错误: %s", e)
+        raise HTTPException(status_code=500, detail=f"批量删除工具时发生错误: {str(e)}")
 
 
 # 修改工具状态
 @router.patch("/tools/{tool_id}/status")
-def update_tool_status(tool_id: int, status_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到修改工具状态请求: ID={tool_id}, 状态={status_data.get('status')}")
+async def update_tool_status(tool_id: int, status_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到修改工具状态请求: ID=%s, 状态=%s", tool_id, status_data.get('status'))
     try:
         # 查找工具
-        tool = db.query(Tool).filter(Tool.id == tool_id).first()
+        tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
         if not tool:
             raise HTTPException(status_code=404, detail="工具未找到")
 
@@ -200,23 +332,24 @@ def update_tool_status(tool_id: int, status_data: dict, db: Session = Depends(da
         # 更新状态
         old_status = tool.status
         tool.status = status_map[new_status]
-        db.commit()
+        await db.commit()
+        cache.invalidate("tools")
 
-        logger.info(f"成功修改工具状态: {tool.title}, {old_status} -> {tool.status}")
+        logger.info("成功修改工具状态: %s, %s -> %s", tool.title, old_status, tool.status)
         return {"message": "工具状态修改成功", "status": new_status}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"修改工具状态时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("修改工具状态时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"修改工具状态时发生错误: {str(e)}")
 
 
 # 创建新工具
 @router.post("/tools")
-def create_tool(tool_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到创建工具请求: {tool_data.get('title')}")
+async def create_tool(tool_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到创建工具请求: %s", tool_data.get('title'))
     try:
         # 创建工具记录
         new_tool = Tool(
@@ -227,71 +360,73 @@ def create_tool(tool_data: dict, db: Session = Depends(database.get_db)):
         )
 
         db.add(new_tool)
-        db.commit()
-        db.refresh(new_tool)
+        await db.commit()
+        await db.refresh(new_tool)
 
         # 处理标签
         tags = tool_data.get('tags', [])
         for tag_name in tags:
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name))
             if not tag:
                 tag = Tag(name=tag_name)
                 db.add(tag)
-                db.commit()
-                db.refresh(tag)
+                await db.commit()
+                await db.refresh(tag)
 
             # 创建工具-标签关联
             tool_tag = ToolTag(tool_id=new_tool.id, tag_id=tag.id)
             db.add(tool_tag)
 
-        db.commit()
+        await db.commit()
+        cache.invalidate("tools")
 
-        logger.info(f"成功创建工具: {new_tool.title}")
+        logger.info("成功创建工具: %s", new_tool.title)
         return {"message": "工具创建成功", "id": new_tool.id}
 
     except Exception as e:
-        db.rollback()
-        logger.error(f"创建工具时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("创建工具时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"创建工具时发生错误: {str(e)}")
 
 
 # 删除工具
 @router.delete("/tools/{tool_id}")
-def delete_tool(tool_id: int, db: Session = Depends(database.get_db)):
-    logger.info(f"收到删除工具请求: ID={tool_id}")
+async def delete_tool(tool_id: int, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到删除工具请求: ID=%s", tool_id)
     try:
         # 查找工具
-        tool = db.query(Tool).filter(Tool.id == tool_id).first()
+        tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
         if not tool:
             raise HTTPException(status_code=404, detail="工具未找到")
 
         # 删除工具-标签关联
-        db.query(ToolTag).filter(ToolTag.tool_id == tool_id).delete()
+        await db.execute(delete(ToolTag).where(ToolTag.tool_id == tool_id))
 
         # 删除工具记录
-        db.delete(tool)
-        db.commit()
+        await db.delete(tool)
+        await db.commit()
+        cache.invalidate("tools")
 
-        logger.info(f"成功删除工具: {tool.title}")
+        logger.info("成功删除工具: %s", tool.title)
         return {"message": "工具删除成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"删除工具时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("删除工具时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"删除工具时发生错误: {str(e)}")
 
 
 # 更新工具信息
 @router.put("/tools/{tool_id}")
-def update_tool(tool_id: int, tool_data: dict, db: Session = Depends(database.get_db)):
-    logger.info(f"收到更新工具请求: ID={tool_id}, 数据={tool_data}")
+async def update_tool(tool_id: int, tool_data: dict, db: AsyncSession = Depends(database.get_db)):
+    logger.info("收到更新工具请求: ID=%s, 数据=%s", tool_id, tool_data)
     try:
         # 查找工具
-        tool = db.query(Tool).filter(Tool.id == tool_id).first()
+        tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
         if not tool:
-            logger.warning(f"工具不存在: ID={tool_id}")
+            logger.warning("工具不存在: ID=%s", tool_id)
             raise HTTPException(status_code=404, detail="工具不存在或已被删除")
 
         # 数据验证
@@ -312,12 +447,12 @@ def update_tool(tool_id: int, tool_data: dict, db: Session = Depends(database.ge
             raise HTTPException(status_code=400, detail="请输入有效的URL地址")
 
         # 检查标题是否重复(排除当前工具)
-        existing_tool = db.query(Tool).filter(Tool.title == title, Tool.id != tool_id).first()
+        existing_tool = await db.scalar(select(Tool).where(Tool.title == title, Tool.id != tool_id))
         if existing_tool:
             raise HTTPException(status_code=409, detail="工具标题已存在")
 
         # 检查URL是否重复(排除当前工具)
-        existing_url = db.query(Tool).filter(Tool.url == url, Tool.id != tool_id).first()
+        existing_url = await db.scalar(select(Tool).where(Tool.url == url, Tool.id != tool_id))
         if existing_url:
             raise HTTPException(status_code=409, detail="工具链接已存在")
 
@@ -335,7 +470,7 @@ def update_tool(tool_id: int, tool_data: dict, db: Session = Depends(database.ge
 
         # 更新标签关联
         # 先删除现有的标签关联
-        db.query(ToolTag).filter(ToolTag.tool_id == tool_id).delete()
+        await db.execute(delete(ToolTag).where(ToolTag.tool_id == tool_id))
 
         # 添加新的标签关联
         for tag_name in tags:
@@ -344,24 +479,25 @@ def update_tool(tool_id: int, tool_data: dict, db: Session = Depends(database.ge
                 continue
 
             # 查找或创建标签
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
+            tag = await db.scalar(select(Tag).where(Tag.name == tag_name))
             if not tag:
                 tag = Tag(name=tag_name)
                 db.add(tag)
-                db.flush()  # 获取新创建标签的ID
-                logger.info(f"创建新标签: {tag_name}")
+                await db.flush()  # 获取新创建标签的ID
+                logger.info("创建新标签: %s", tag_name)
 
             # 创建工具-标签关联
             tool_tag = ToolTag(tool_id=tool_id, tag_id=tag.id)
             db.add(tool_tag)
 
         # 提交所有更改
-        db.commit()
-        db.refresh(tool)
+        await db.commit()
+        cache.invalidate("tools")
+        # 异步会话不能懒加载关系属性，刷新时一并加载新的标签
+        await db.refresh(tool, ["tags"])
 
         # 返回更新后的工具信息
-        updated_tool_tags = db.query(Tag).join(ToolTag).filter(ToolTag.tool_id == tool.id).all()
-        updated_tags = [tag.name for tag in updated_tool_tags]
+        updated_tags = [tag.name for tag in tool.tags]
 
         result = {
             "id": tool.id,
@@ -373,13 +509,13 @@ def update_tool(tool_id: int, tool_data: dict, db: Session = Depends(database.ge
             "updated_at": tool.updated_at.isoformat() if hasattr(tool, 'updated_at') and tool.updated_at else None
         }
 
-        logger.info(f"成功更新工具: {old_title} -> {tool.title}")
+        logger.info("成功更新工具: %s -> %s", old_title, tool.title)
         return result
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"更新工具时发生错误: {str(e)}")
+        await db.rollback()
+        logger.error("更新工具时发生错误: %s", e)
         raise HTTPException(status_code=500, detail=f"服务器内部错误: {str(e)}")
@@ -1,11 +1,17 @@
 import os
+import threading
+import time
 from datetime import datetime
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Date, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, SmallInteger, String, Text, DateTime, Date, ForeignKey, Index
+from sqlalchemy import exc
 from sqlalchemy.dialects.mysql import TINYINT
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # 加载环境变量
 load_dotenv()
@@ -16,15 +22,109 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-# 创建数据库引擎
-engine = create_engine(DATABASE_URL, echo=False)
+# 同步驱动对应的异步驱动，如 mysql+pymysql -> mysql+aiomysql
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+# 将同步数据库 URL 转换为异步驱动 URL，可通过 ASYNC_DATABASE_URL 显式指定
+def get_async_database_url(url: str) -> str:
+    async_url = os.getenv("ASYNC_DATABASE_URL")
+    if async_url:
+        return async_url
+
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"不支持的数据库类型: {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+# 连接池配置，均可通过环境变量调整
+# DB_POOL_RECYCLE 应小于 MySQL 的 wait_timeout，避免使用已被服务端断开的连接
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes", "on")
+# 启动时预先建立的连接数，默认与 pool_size 相同
+POOL_WARM = int(os.getenv("DB_POOL_WARM", str(POOL_SIZE)))
+
+
+# 连接池参数，内存 SQLite 使用单连接池，不支持大小相关参数
+def get_pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": POOL_PRE_PING, "pool_recycle": POOL_RECYCLE}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+    return options
+
+
+# 连接池等待统计
+_pool_stats_lock = threading.Lock()
+_pool_stats = {
+    "checkouts": 0,  # 成功从连接池获取连接的次数
+    "timeouts": 0,  # 等待超过 pool_timeout 的次数
+    "connect_errors": 0,  # 新建连接失败的次数(认证失败、无法解析主机、连接被拒绝等)
+    "wait_time_total_ms": 0.0,
+    "wait_time_max_ms": 0.0,
+}
+
+
+# 记录获取连接耗时的连接池，耗时包含排队等待和新建连接
+# 只有成功获取的连接计入 checkouts 和等待耗时，失败分别计入 timeouts、connect_errors，不拉低平均等待时间
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with _pool_stats_lock:
+                _pool_stats["timeouts"] += 1
+            raise
+        except Exception:
+            with _pool_stats_lock:
+                _pool_stats["connect_errors"] += 1
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        with _pool_stats_lock:
+            _pool_stats["checkouts"] += 1
+            _pool_stats["wait_time_total_ms"] += elapsed
+            _pool_stats["wait_time_max_ms"] = max(_pool_stats["wait_time_max_ms"], elapsed)
+        return connection
+
+
+# 创建数据库引擎(同步，供 init_db.py 等脚本使用)
+engine = create_engine(DATABASE_URL, echo=False, **get_pool_options(DATABASE_URL))
 
 # 创建SessionLocal类
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步数据库引擎，接口请求全部使用异步会话，并发量由连接池而不是线程池决定
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+_async_pool_options = get_pool_options(ASYNC_DATABASE_URL)
+if "pool_size" in _async_pool_options:
+    _async_pool_options["poolclass"] = TimedAsyncQueuePool
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **_async_pool_options)
+
+# 提交后不使对象过期，避免返回响应时访问属性触发隐式的异步 IO
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # 创建Base类
 Base = declarative_base()
 
+# 状态字段类型: MySQL 下为 TINYINT，其他数据库(如本地 SQLite)使用 SMALLINT
+StatusType = SmallInteger().with_variant(TINYINT, "mysql")
+
+
+# title/description 上的全文索引(ngram 解析器支持中文)，仅在 MySQL 下创建
+def fulltext_index(table_name: str):
+    return Index(f"ft_{table_name}_title_description", "title", "description",
+                 mysql_prefix="FULLTEXT", mysql_with_parser="ngram").ddl_if(dialect="mysql")
+
 
 # 时间线模型
 class Timeline(Base):
@@ -38,6 +138,10 @@ class Timeline(Base):
 # 文章模型
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        Index("ix_articles_status_date", "status", "date", "id"),  # 已发布文章按日期排序、游标分页和日期范围筛选
+        Index("ix_articles_status_category", "status", "category"),  # 分类及子分类的前缀匹配
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -45,7 +149,10 @@ class Article(Base):
     category = Column(String(100))
     date = Column(Date)
     summary = Column(Text)
-    status = Column(TINYINT, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+    status = Column(StatusType, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+
+    # 标签关系(只读，标签关联仍通过关联表模型维护)
+    tags = relationship("Tag", secondary="article_tags", viewonly=True)
 
 
 # 标签模型
@@ -67,13 +174,17 @@ class ArticleTag(Base):
 # 项目模型
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_status_date", "status", "date", "id"),)  # 已发布项目按日期排序、游标分页和日期范围筛选
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     slug = Column(String(255), nullable=False, unique=True)
     date = Column(Date)
     summary = Column(Text)
-    status = Column(TINYINT, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+    status = Column(StatusType, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+
+    # 标签关系(只读)
+    tags = relationship("Tag", secondary="project_tags", viewonly=True)
 
 
 # 项目标签关联模型
@@ -87,13 +198,17 @@ class ProjectTag(Base):
 # 书籍模型
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (fulltext_index("books"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     cover = Column(String(500))  # 封面图片路径
     filename = Column(String(255))  # PDF文件名
-    status = Column(TINYINT, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+    status = Column(StatusType, nullable=False, default=1, index=True)  # 0=未发布, 1=已发布, 2=已回收
+
+    # 标签关系(只读)
+    tags = relationship("Tag", secondary="book_tags", viewonly=True)
 
 
 # 书籍标签关联模型
@@ -107,12 +222,16 @@ class BookTag(Base):
 # 图表模型
 class Figure(Base):
     __tablename__ = "figures"
+    __table_args__ = (fulltext_index("figures"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     url = Column(String(2083))  # 改为url字段，与数据库表结构一致
-    status = Column(Integer, default=0)  # 0:草稿, 1:发布, 2:回收站
+    status = Column(Integer, default=0, index=True)  # 0:草稿, 1:发布, 2:回收站
+
+    # 标签关系(只读)
+    tags = relationship("Tag", secondary="figure_tags", viewonly=True)
 
 
 # 图表标签关联模型
@@ -134,12 +253,16 @@ class FavoriteImage(Base):
 # 工具模型
 class Tool(Base):
     __tablename__ = "tools"
+    __table_args__ = (fulltext_index("tools"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     url = Column(String(2083))  # URL字段
-    status = Column(TINYINT, nullable=False, default=1)  # 0=未发布, 1=已发布, 2=已回收
+    status = Column(StatusType, nullable=False, default=1, index=True)  # 0=未发布, 1=已发布, 2=已回收
+
+    # 标签关系(只读)
+    tags = relationship("Tag", secondary="tool_tags", viewonly=True)
 
 
 # 工具标签关联模型
@@ -160,10 +283,50 @@ class Admin(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
-# 数据库会话
-def get_db():
-    db = SessionLocal()
+# 预热连接池: 启动时建立连接并归还，避免首批请求承担建连开销
+async def warm_pool(count: int = POOL_WARM):
+    connections = []
     try:
-        yield db
+        # 超过 pool_size 的连接归还时会被直接关闭，预热没有意义
+        for _ in range(max(min(count, POOL_SIZE), 0)):
+            connections.append(await async_engine.connect())
     finally:
-        db.close()
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+# 连接池状态与等待统计
+def pool_status() -> dict:
+    pool = async_engine.sync_engine.pool
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    status = {
+        "pool_class": type(pool).__name__,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pre_ping": POOL_PRE_PING,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    status.update(
+        checkouts=stats["checkouts"],
+        timeouts=stats["timeouts"],
+        connect_errors=stats["connect_errors"],
+        wait_time_total_ms=round(stats["wait_time_total_ms"], 3),
+        wait_time_avg_ms=round(stats["wait_time_total_ms"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0,
+        wait_time_max_ms=round(stats["wait_time_max_ms"], 3),
+    )
+    return status
+
+
+# 数据库会话
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,118 @@
+# 前端构建产物(frontend/dist)清单
+# 启动时遍历一次 dist 目录，记录 相对路径 -> (绝对路径, 大小, 修改时间, MIME 类型, ETag)，
+# 捕获所有路由直接查表，不再对每个请求做 exists/isfile/listdir 等文件系统调用。
+# 文章、项目等内容写入 dist 后调用 refresh_file() 增量更新对应条目及其预压缩版本。
+import logging
+import mimetypes
+import os
+import threading
+from collections import namedtuple
+
+import precompress
+
+logger = logging.getLogger("dist_manifest")
+
+# Vue 项目构建后的输出目录，可通过 FRONTEND_DIST_DIR 指定
+DIST_DIR = os.path.abspath(os.getenv(
+    "FRONTEND_DIST_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
+))
+
+# mimetypes 无法识别时的补充类型
+EXTRA_MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".md": "text/markdown",
+}
+
+ManifestEntry = namedtuple("ManifestEntry", ["path", "size", "mtime", "mime", "etag", "stat"])
+
+_lock = threading.Lock()
+_entries = {}  # 相对路径(使用 / 分隔) -> ManifestEntry
+_loaded = False
+
+
+# 获取文件的 MIME 类型
+def guess_mime(path: str) -> str:
+    mime_type, _ = mimetypes.guess_type(path)
+    if mime_type is None:
+        ext = os.path.splitext(path)[1].lower()
+        mime_type = EXTRA_MIME_TYPES.get(ext, "application/octet-stream")
+    return mime_type
+
+
+def _make_entry(abs_path: str, stat_result: os.stat_result) -> ManifestEntry:
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    return ManifestEntry(abs_path, stat_result.st_size, stat_result.st_mtime, guess_mime(abs_path), etag, stat_result)
+
+
+# 绝对路径转换为清单中的相对路径，不在 dist 目录下时返回 None
+def _relative_key(abs_path: str):
+    rel_path = os.path.relpath(abs_path, DIST_DIR)
+    if rel_path == "." or rel_path.startswith(".."):
+        return None
+    return rel_path.replace(os.sep, "/")
+
+
+# 全量构建清单(启动时调用)
+def build():
+    global _entries, _loaded
+    entries = {}
+    if os.path.isdir(DIST_DIR):
+        for root, dirs, files in os.walk(DIST_DIR):
+            for name in files:
+                abs_path = os.path.join(root, name)
+                try:
+                    entries[_relative_key(abs_path)] = _make_entry(abs_path, os.stat(abs_path))
+                except OSError:
+                    continue
+    with _lock:
+        _entries = entries
+        _loaded = True
+    logger.info("dist 清单构建完成，共 %s 个文件", len(entries))
+
+
+# 按请求路径查找文件，未找到返回 None
+def lookup(path: str):
+    if not _loaded:
+        build()
+    return _entries.get(path.strip("/"))
+
+
+def _refresh_entry(abs_path: str):
+    key = _relative_key(abs_path)
+    try:
+        entry = _make_entry(abs_path, os.stat(abs_path))
+    except OSError:
+        entry = None
+    with _lock:
+        if entry is None:
+            _entries.pop(key, None)
+        else:
+            _entries[key] = entry
+
+
+# 文件写入或删除后更新对应条目，同时重新生成或清理其预压缩版本；dist 目录之外的路径直接忽略
+def refresh_file(path: str):
+    abs_path = os.path.abspath(path)
+    if _relative_key(abs_path) is None:
+        return
+    try:
+        precompress.compress_file(abs_path, force=True)
+    except OSError as e:
+        logger.warning("预压缩文件失败 %s: %s", abs_path, e)
+        precompress.remove_variants(abs_path)
+    if not _loaded:
+        return
+    _refresh_entry(abs_path)
+    for suffix in precompress.VARIANT_SUFFIXES:
+        _refresh_entry(abs_path + suffix)
+
+
+# 列出某个目录下的清单条目(调试用)
+def list_dir(path: str):
+    prefix = path.strip("/")
+    prefix = prefix + "/" if prefix else ""
+    with _lock:
+        keys = list(_entries)
+    return sorted(key[len(prefix):] for key in keys
+                  if key.startswith(prefix) and "/" not in key[len(prefix):])
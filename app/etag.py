@@ -0,0 +1,88 @@
+# 公开 GET 接口的 ETag / If-None-Match 条件请求
+# ETag 由相关实体的内容版本号(见 cache.py，写接口调用 invalidate 时自增)和请求路径、查询参数计算得到，
+# 不依赖响应内容，因此在进入路由、执行任何 ORM 查询之前就能判断并直接返回 304
+# 中间件为纯 ASGI 实现: 不在 ROUTE_NAMESPACES 中的路径(静态文件、dist 文件下载等)直接交给下层应用，
+# 不经过 BaseHTTPMiddleware 的任务组和内存流，pathsend/zerocopysend 等扩展消息原样传递
+import hashlib
+import secrets
+
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+import cache
+
+# 进程标识: 版本号只在进程内有效，多进程部署时避免不同进程算出相同的 ETag
+_EPOCH = secrets.token_hex(8)
+
+# 公开接口路径前缀 -> 其内容依赖的实体命名空间
+ROUTE_NAMESPACES = [
+    ("/api/articles", ("articles",)),
+    ("/api/tags", ("articles",)),
+    ("/api/projects", ("projects",)),
+    ("/api/project-tags", ("projects",)),
+    ("/api/books", ("books",)),
+    ("/api/book-tags", ("books",)),
+    ("/api/figures", ("figures",)),
+    ("/api/figure-tags", ("figures",)),
+    ("/api/tools", ("tools",)),
+    ("/api/tool-tags", ("tools",)),
+    ("/api/timeline", ("timeline",)),
+    ("/api/favorite-images", ("favorite_images",)),
+    ("/api/home", ("articles", "projects", "timeline", "favorite_images")),
+]
+
+
+# 查找路径对应的实体命名空间，不支持条件请求的路径返回 None
+def namespaces_for(path: str):
+    for prefix, namespaces in ROUTE_NAMESPACES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return namespaces
+    return None
+
+
+# 根据内容版本号和请求参数计算强 ETag
+def compute_etag(path: str, query: str, namespaces) -> str:
+    versions = ",".join(f"{ns}:{cache.version(ns)}" for ns in namespaces)
+    digest = hashlib.sha1(f"{_EPOCH}|{versions}|{path}?{query}".encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+# 判断 If-None-Match 请求头是否命中
+def if_none_match(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    # If-None-Match 使用弱比较，忽略 W/ 前缀
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+# ETag 中间件: 命中时直接返回 304，未命中时为成功响应附加 ETag
+class ETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        namespaces = namespaces_for(path)
+        if namespaces is None:
+            return await self.app(scope, receive, send)
+
+        # 在执行路由之前计算，处理期间发生写操作时客户端下次请求会拿到新版本
+        etag = compute_etag(path, scope.get("query_string", b"").decode("latin-1"), namespaces)
+        headers = {"etag": etag, "cache-control": "no-cache"}
+
+        if if_none_match(Headers(scope=scope).get("if-none-match"), etag):
+            return await Response(status_code=304, headers=headers)(scope, receive, send)
+
+        # 只改写成功响应的 http.response.start，其余消息原样转发
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,90 @@
+# 管理员列表的服务端筛选与分面统计
+# 筛选维度: status 状态、tags 标签、category 分类(含子分类，仅文章)、search 关键词
+# 分面计数: 状态和分类的计数不应用自身维度的筛选(选中"草稿"时仍能看到其他状态各有多少)，
+# 标签筛选是逐步收窄的"全部匹配"，标签计数应用全部条件；
+# 各维度的 GROUP BY 通过 UNION ALL 合并为一条 SQL，一次往返完成
+from typing import Optional
+
+from sqlalchemy import String, cast, func, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import listing
+from database import Tag
+from search import like_condition, search_condition
+from tagging import tag_condition
+
+# 状态映射
+STATUS_VALUES = {'draft': 0, 'published': 1, 'recycled': 2}
+STATUS_NAMES = {value: name for name, value in STATUS_VALUES.items()}
+
+
+# 构造各维度的筛选条件，返回 {维度: 条件}；参数无效时抛出 ValueError
+# search_columns 为关键词搜索的列，fulltext=False 时(表上没有全文索引)直接使用 LIKE 匹配
+async def build_conditions(db: AsyncSession, model, link_entity_column, search_columns,
+                           status: Optional[str] = None, tags: Optional[str] = None, match: str = "all",
+                           category: Optional[str] = None, keyword: Optional[str] = None,
+                           fulltext: bool = True) -> dict:
+    if match not in ("all", "any"):
+        raise ValueError("match 参数只能为 all 或 any")
+
+    conditions = {}
+    if status:
+        if status not in STATUS_VALUES:
+            raise ValueError("无效的状态值")
+        conditions["status"] = model.status == STATUS_VALUES[status]
+        # 可为空的状态列(如图片)中 NULL 按草稿显示，筛选草稿时一并匹配
+        if status == 'draft' and model.__table__.c.status.nullable:
+            conditions["status"] = or_(conditions["status"], model.status.is_(None))
+
+    if tags:
+        tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+        if tag_list:
+            conditions["tags"] = await tag_condition(db, model.id, link_entity_column, tag_list, match_all=(match == "all"))
+
+    if category:
+        conditions["category"] = listing.category_condition(model.category, category)
+
+    if keyword:
+        if fulltext:
+            conditions["search"], _ = await search_condition(db, search_columns, keyword)
+        else:
+            conditions["search"] = like_condition(search_columns, keyword)
+
+    return conditions
+
+
+# 统计分面计数: {"status": {状态: 数量}, "tags": {标签: 数量}, "categories": {分类: 数量}}
+# 只有传入 category_column 时统计分类(按完整路径计数，子树合计由前端按路径前缀累加)
+async def count_facets(db: AsyncSession, model, link_entity_column, conditions: dict, category_column=None) -> dict:
+    def where(exclude=None):
+        return [condition for dimension, condition in conditions.items() if dimension != exclude]
+
+    link_model = link_entity_column.class_
+    queries = [
+        select(literal("status").label("facet"), cast(model.status, String).label("value"), func.count().label("count"))
+        .where(*where("status")).group_by(model.status),
+        select(literal("tags"), Tag.name, func.count())
+        .select_from(link_model).join(Tag, Tag.id == link_model.tag_id).join(model, model.id == link_entity_column)
+        .where(*where()).group_by(Tag.id, Tag.name),
+    ]
+    if category_column is not None:
+        queries.append(
+            select(literal("categories"), category_column, func.count())
+            .where(*where("category")).group_by(category_column)
+        )
+
+    facets = {"status": {name: 0 for name in STATUS_VALUES}, "tags": {}}
+    if category_column is not None:
+        facets["categories"] = {}
+
+    for facet, value, count in (await db.execute(union_all(*queries))).all():
+        if facet == "status":
+            # 状态为 NULL 的记录(图片的状态列可为空)计入草稿，与列表中的显示一致
+            name = 'draft' if value is None else STATUS_NAMES.get(int(value), 'draft')
+            facets["status"][name] += count
+        else:
+            facets[facet][value or ""] = count
+
+    # 标签按数量从多到少排列
+    facets["tags"] = dict(sorted(facets["tags"].items(), key=lambda item: -item[1]))
+    return facets
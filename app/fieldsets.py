@@ -0,0 +1,43 @@
+# 稀疏字段集: 列表接口的 fields= 参数
+# 例如 /api/articles?fields=slug,title,date 只返回这几个字段；
+# 查询时通过 load_only 只 SELECT 请求的列，summary、description 等 TEXT 大字段未请求时
+# 既不从数据库传输也不写入 ORM 对象，未请求 tags 时也不再执行预加载标签的查询
+from typing import Optional
+
+from sqlalchemy.orm import load_only, selectinload
+
+
+# 解析 fields 参数
+# 返回请求的字段集合(总是包含 id)，未传入时返回 None 表示全部字段；含未知字段时抛出 ValueError
+def parse(fields: Optional[str], available: dict) -> Optional[frozenset]:
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - available.keys()
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(sorted(unknown))}，可选字段: {', '.join(available)}")
+    return frozenset(requested | {"id"})
+
+
+# 查询选项: 只加载请求字段对应的列，请求了 tags 时才预加载标签
+# 字段名与模型列名一致的字段视为列字段，其余字段(如 tags)由关联关系提供
+# extra_columns 为未请求但仍需加载的列，如游标分页的排序键
+def load_options(model, requested: Optional[frozenset], extra_columns=()) -> list:
+    if requested is None:
+        return [selectinload(model.tags)]
+
+    columns = {column.key: column for column in extra_columns}
+    columns.update({name: getattr(model, name) for name in requested if name in model.__table__.columns})
+    options = [load_only(*columns.values())]
+    if "tags" in requested:
+        options.append(selectinload(model.tags))
+    return options
+
+
+# 按字段表输出一条记录，只计算请求的字段(未加载的列不会被访问)
+# available 为 {字段名: 取值函数}，输出顺序与字段表一致
+def serialize(item, available: dict, requested: Optional[frozenset]) -> dict:
+    if requested is None:
+        return {name: getter(item) for name, getter in available.items()}
+    return {name: getter(item) for name, getter in available.items() if name in requested}
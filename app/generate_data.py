@@ -0,0 +1,220 @@
+# 批量生成测试数据
+# 在 init_db 建表的基础上写入指定数量的文章、项目、书籍、图表、工具和时间线数据，
+# 标签按幂律(Zipf)分布关联，少数热门标签覆盖大部分内容，与真实站点的标签分布接近；
+# 同时为文章和项目生成 markdown 文件(与 save_article_file / save_project_file 的目录结构一致)。
+#
+# 用法(DATABASE_URL 与 init_db.py 相同，从环境变量或 .env 读取):
+#   python generate_data.py --count 10000
+#   python generate_data.py --count 1000000 --no-files          # 只写数据库
+#   python generate_data.py --articles 5000 --books 200000 --tags 1000 --tag-alpha 1.2
+#
+# 使用 Core insert() 按批 executemany，不经过 ORM 对象；主键由脚本按当前最大 ID 连续分配，
+# 标签关联无需回查插入结果。100 万行/类在 SQLite 上约需数分钟。
+import argparse
+import bisect
+import datetime
+import itertools
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, insert, select
+
+from database import (Article, ArticleTag, Book, BookTag, Figure, FigureTag, Project, ProjectTag, Tag, Timeline,
+                      Tool, ToolTag)
+from init_db import create_database_tables
+
+# 加载环境变量
+load_dotenv()
+
+DEFAULT_DIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "dist")
+
+WORDS = [
+    "深度学习", "机器学习", "数据结构", "算法", "操作系统", "计算机网络", "数据库", "编译原理",
+    "分布式系统", "网络安全", "Python", "Rust", "Linux", "Kubernetes", "TensorFlow", "PyTorch",
+    "设计模式", "微服务", "并发编程", "数学分析", "线性代数", "概率论", "统计学习", "强化学习",
+    "introduction", "practical", "guide", "handbook", "advanced", "fundamentals", "systems", "design",
+]
+
+CATEGORIES = [
+    "编程语言/Python", "编程语言/Rust", "编程语言/Go", "计算机基础/操作系统", "计算机基础/计算机网络",
+    "计算机基础/数据库", "人工智能/机器学习", "人工智能/深度学习", "网络安全", "其他",
+]
+
+# 内容类型 -> (模型, 标签关联模型, 关联外键列)
+CONTENT_TYPES = {
+    "articles": (Article, ArticleTag, "article_id"),
+    "projects": (Project, ProjectTag, "project_id"),
+    "books": (Book, BookTag, "book_id"),
+    "figures": (Figure, FigureTag, "figure_id"),
+    "tools": (Tool, ToolTag, "tool_id"),
+    "timeline": (Timeline, None, None),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="批量生成测试数据")
+    parser.add_argument("--count", type=int, default=1000, help="每类内容的默认行数")
+    for name in CONTENT_TYPES:
+        parser.add_argument(f"--{name}", type=int, help=f"{name} 的行数，默认使用 --count")
+    parser.add_argument("--tags", type=int, default=500, help="标签总数")
+    parser.add_argument("--tag-alpha", type=float, default=1.1, help="标签幂律分布指数，越大热门标签越集中")
+    parser.add_argument("--max-tags", type=int, default=5, help="每行最多关联的标签数")
+    parser.add_argument("--batch-size", type=int, default=10000, help="每批插入的行数")
+    parser.add_argument("--dist-dir", default=DEFAULT_DIST_DIR, help="markdown 文件写入的 dist 目录")
+    parser.add_argument("--no-files", action="store_true", help="不生成 markdown 文件")
+    parser.add_argument("--seed", type=int, default=42, help="随机数种子")
+    return parser.parse_args()
+
+
+def random_text(rng: random.Random, min_words: int, max_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+# Zipf 分布的标签抽样器: 第 k 个标签的权重为 1/k^alpha
+class TagSampler:
+    def __init__(self, tag_ids: list, alpha: float, max_tags: int, rng: random.Random):
+        self.tag_ids = tag_ids
+        self.max_tags = min(max_tags, len(tag_ids))
+        self.rng = rng
+        weights = [1 / (rank ** alpha) for rank in range(1, len(tag_ids) + 1)]
+        self.cum_weights = list(itertools.accumulate(weights))
+
+    # 为一行内容抽取 0~max_tags 个不重复的标签
+    def sample(self) -> set:
+        count = self.rng.randint(0, self.max_tags)
+        total = self.cum_weights[-1]
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(self.tag_ids[bisect.bisect_left(self.cum_weights, self.rng.random() * total)])
+        return chosen
+
+
+# 创建缺少的标签，返回按热度排序的标签 ID(名称 tag-1 最热门)
+def ensure_tags(conn, count: int) -> list:
+    names = [f"tag-{rank}" for rank in range(1, count + 1)]
+    existing = dict(conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    missing = [{"name": name} for name in names if name not in existing]
+    if missing:
+        conn.execute(insert(Tag), missing)
+        existing.update(conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    return [existing[name] for name in names]
+
+
+def _row_factory(name: str, rng: random.Random, run_id: str):
+    base_date = datetime.date(2015, 1, 1)
+    if name == "articles":
+        return lambda i: {
+            "id": i, "title": random_text(rng, 2, 6), "slug": f"gen-{run_id}-article-{i}",
+            "category": rng.choice(CATEGORIES), "summary": random_text(rng, 10, 30),
+            "date": base_date + datetime.timedelta(days=rng.randrange(3650)), "status": rng.choice((0, 1, 1, 1, 2)),
+        }
+    if name == "projects":
+        return lambda i: {
+            "id": i, "title": random_text(rng, 2, 6), "slug": f"gen-{run_id}-project-{i}",
+            "summary": random_text(rng, 10, 30), "date": base_date + datetime.timedelta(days=rng.randrange(3650)),
+            "status": rng.choice((0, 1, 1, 1, 2)),
+        }
+    if name == "books":
+        return lambda i: {
+            "id": i, "title": random_text(rng, 2, 5), "description": random_text(rng, 10, 40), "cover": None,
+            "filename": f"https://pan.example.com/s/{run_id}-{i}", "status": rng.choice((0, 1, 1, 1, 2)),
+        }
+    if name == "figures":
+        return lambda i: {
+            "id": i, "title": random_text(rng, 2, 5), "description": random_text(rng, 5, 20),
+            "url": f"https://img.example.com/{run_id}/{i}.jpg", "status": rng.choice((0, 1, 1, 1, 2)),
+        }
+    if name == "tools":
+        return lambda i: {
+            "id": i, "title": random_text(rng, 1, 3), "description": random_text(rng, 5, 20),
+            "url": f"https://tool-{run_id}-{i}.example.com", "status": rng.choice((0, 1, 1, 1, 2)),
+        }
+    return lambda i: {
+        "id": i, "content": random_text(rng, 5, 20),
+        "timestamp": datetime.datetime(2015, 1, 1) + datetime.timedelta(minutes=rng.randrange(3650 * 24 * 60)),
+    }
+
+
+def _write_markdown(path: str, title: str, body: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# {title}\n\n{body}\n")
+
+
+# 写入一类内容
+def generate_rows(engine, name: str, count: int, sampler: TagSampler, rng: random.Random, run_id: str,
+                  batch_size: int, dist_dir: str = None):
+    model, link_model, link_column = CONTENT_TYPES[name]
+    make_row = _row_factory(name, rng, run_id)
+    with engine.connect() as conn:
+        first_id = (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    knowledge_dir = projects_dir = None
+    if dist_dir and name == "articles":
+        knowledge_dir = os.path.join(dist_dir, "articles", "knowledge")
+        for category in CATEGORIES:
+            os.makedirs(os.path.join(knowledge_dir, category.replace("/", os.sep)), exist_ok=True)
+    if dist_dir and name == "projects":
+        projects_dir = os.path.join(dist_dir, "articles", "projects")
+        os.makedirs(projects_dir, exist_ok=True)
+    # 所有文件共用几段正文，避免生成文本成为瓶颈
+    bodies = ["\n\n".join(random_text(rng, 30, 80) for _ in range(rng.randint(3, 10))) for _ in range(16)]
+
+    start = time.perf_counter()
+    for batch_start in range(first_id, first_id + count, batch_size):
+        ids = range(batch_start, min(batch_start + batch_size, first_id + count))
+        rows = [make_row(i) for i in ids]
+        links = []
+        if link_model is not None:
+            links = [{link_column: i, "tag_id": tag_id} for i in ids for tag_id in sampler.sample()]
+        # 每批一个事务，失败时只回滚当前批
+        with engine.begin() as conn:
+            conn.execute(insert(model), rows)
+            if links:
+                conn.execute(insert(link_model), links)
+
+        if knowledge_dir:
+            for row in rows:
+                path = os.path.join(knowledge_dir, row["category"].replace("/", os.sep), f"{row['slug']}.md")
+                _write_markdown(path, row["title"], rng.choice(bodies))
+        if projects_dir:
+            for row in rows:
+                _write_markdown(os.path.join(projects_dir, f"{row['slug']}.md"), row["title"], rng.choice(bodies))
+
+    elapsed = time.perf_counter() - start
+    print(f"{name}: 写入 {count} 行，耗时 {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} 行/s)")
+
+
+# 生成全部数据；counts 为 内容类型 -> 行数
+# run_id 用于 slug 等唯一字段，默认取当前时间，多次运行不会冲突
+def generate(engine, counts: dict, tags: int = 500, tag_alpha: float = 1.1, max_tags: int = 5,
+             batch_size: int = 10000, dist_dir: str = None, seed: int = 42, run_id: str = None):
+    create_database_tables(engine)
+    rng = random.Random(seed)
+    run_id = run_id or f"{int(time.time()):x}"
+    with engine.begin() as conn:
+        tag_ids = ensure_tags(conn, tags)
+    sampler = TagSampler(tag_ids, tag_alpha, max_tags, rng)
+    for name, count in counts.items():
+        if count:
+            generate_rows(engine, name, count, sampler, rng, run_id, batch_size, dist_dir)
+
+
+def main():
+    args = parse_args()
+    DATABASE_URL = os.getenv("DATABASE_URL")
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    counts = {name: getattr(args, name) if getattr(args, name) is not None else args.count for name in CONTENT_TYPES}
+    engine = create_engine(DATABASE_URL)
+    start = time.perf_counter()
+    generate(engine, counts, tags=args.tags, tag_alpha=args.tag_alpha, max_tags=args.max_tags,
+             batch_size=args.batch_size, dist_dir=None if args.no_files else os.path.abspath(args.dist_dir),
+             seed=args.seed)
+    print(f"数据生成完成，共 {sum(counts.values())} 行，总耗时 {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# 文章、项目列表的服务端筛选、排序与分页
+# 未传入 page/limit/cursor 时接口仍返回完整列表(兼容旧调用方)，传入任一参数时返回 {"data": [...], "pagination": {...}}
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import cache
+from pagination import count_rows, fetch_keyset_page
+
+# 默认每页数量与上限
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+# 排序方式 -> (排序列名, 是否倒序)；排序键后总是追加 id，保证顺序唯一(游标分页依赖)
+SORTS = {
+    "date_desc": ("date", True),
+    "date_asc": ("date", False),
+    "title_asc": ("title", False),
+    "title_desc": ("title", True),
+    "id_desc": ("id", True),
+    "id_asc": ("id", False),
+}
+
+
+# 解析排序方式，返回 (排序列, 是否倒序)；模型没有对应列的排序方式(如书籍按日期)视为无效
+def sort_columns(model, sort: str):
+    available = [key for key, (name, _) in SORTS.items() if hasattr(model, name)]
+    if sort not in available:
+        raise ValueError(f"sort 参数只能为 {', '.join(available)}")
+    name, descending = SORTS[sort]
+    if name == "id":
+        return [model.id], descending
+    return [getattr(model, name), model.id], descending
+
+
+def order_by(columns, descending: bool) -> list:
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+# 解析 YYYY-MM-DD 格式的日期参数
+def parse_date(value: Optional[str], name: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} 日期格式错误，请使用 YYYY-MM-DD 格式")
+
+
+# 分类筛选: 匹配该分类本身及其所有子分类(路径以 "分类/" 开头)
+# 前缀 LIKE 可以利用 (status, category) 索引做范围扫描
+def filter_category(stmt, column, category: str):
+    return stmt.where(category_condition(column, category))
+
+
+def category_condition(column, category: str):
+    category = category.strip("/")
+    escaped = category.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(column == category, column.like(f"{escaped}/%", escape="\\"))
+
+
+# 日期范围筛选，两端均包含
+def filter_date_range(stmt, column, date_from: Optional[date], date_to: Optional[date]):
+    if date_from is not None:
+        stmt = stmt.where(column >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(column <= date_to)
+    return stmt
+
+
+# 获取一页数据，返回 (当前页数据, 分页信息)
+# 传入 cursor 时使用游标分页(第一页传空字符串)，否则按 page/limit 偏移分页
+# count_key 为总数在 namespace 命名空间中的缓存键，游标分页只在 with_total=True 时统计总数
+async def fetch_page(db: AsyncSession, stmt, options, columns, descending: bool,
+                     page: Optional[int], limit: Optional[int], cursor: Optional[str],
+                     with_total: bool, namespace: str, count_key):
+    limit = DEFAULT_LIMIT if limit is None else limit
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"每页数量必须在 1 到 {MAX_LIMIT} 之间")
+
+    if cursor is not None:
+        rows, next_cursor = await fetch_keyset_page(db, stmt.options(*options), columns, cursor, limit, descending)
+        pagination = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+        if with_total:
+            pagination["total"] = await cache.get_or_set(namespace, count_key, lambda: count_rows(db, stmt))
+        return rows, pagination
+
+    page = 1 if page is None else page
+    if page < 1:
+        raise ValueError("页码必须大于0")
+
+    total = await cache.get_or_set(namespace, count_key, lambda: count_rows(db, stmt))
+    rows = (await db.scalars(
+        stmt.options(*options).order_by(*order_by(columns, descending)).offset((page - 1) * limit).limit(limit)
+    )).all()
+    return rows, {
+        "page": page,
+        "limit": limit,
+        "total": total,
+        "pages": (total + limit - 1) // limit
+    }
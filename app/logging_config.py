@@ -0,0 +1,96 @@
+# 集中的日志配置
+# 请求线程中的日志只写入内存队列(QueueHandler)，由 QueueListener 后台线程写入控制台/文件，
+# 磁盘和终端 I/O 不再阻塞事件循环。低于 LOG_LEVEL 的日志在调用处即被丢弃，参数不会被格式化。
+#
+# 环境变量:
+#   LOG_LEVEL        日志级别，默认 INFO；逐行诊断日志为 DEBUG，默认不输出
+#   LOG_FILE         同时写入的日志文件，默认不写文件
+#   LOG_QUEUE_SIZE   队列长度上限，队列满时丢弃新日志而不是阻塞请求，默认 10000
+#   LOG_SAMPLE_RATE  高频日志(extra=SAMPLED)的采样比例，0~1，默认 1 即全部输出
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# 高频日志(如逐行输出的数据)调用时传入 extra=SAMPLED，按 LOG_SAMPLE_RATE 采样
+SAMPLED = {"sampled": True}
+
+_listener = None
+
+
+# 对标记为 sampled 的记录按消息模板计数，每 1/rate 条保留一条；其他记录全部保留
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.rate >= 1:
+            return True
+        if self.every == 0:
+            return False
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts[key]
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+# 队列满时丢弃日志，保证请求线程不会因日志阻塞
+class _NonBlockingQueueHandler(QueueHandler):
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+# 安装队列日志，重复调用无效果；返回后台 QueueListener
+def setup_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE):
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # 进程退出前把队列中剩余的日志写完
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
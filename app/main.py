@@ -1,23 +1,68 @@
 import logging
-import mimetypes
 import os
+from contextlib import asynccontextmanager
 from urllib.parse import unquote
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response
 
 # 修复导入问题 - 直接导入而不使用相对导入
-from crud import articles, books, favorite_images, figures, projects, timeline, tools, admin
-
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+from crud import articles, books, favorite_images, figures, home, projects, timeline, tools, admin
+import category_index
+import compression
+import database
+import dist_manifest
+import precompress
+import static_files
+import etag
+import logging_config
+import metrics
+import query_budget
+import responses
+
+# 配置日志(队列 + 后台写入线程，见 logging_config.py)
+logging_config.setup_logging()
 logger = logging.getLogger("app")
 
+
+# 应用生命周期: 启动时加载常驻索引，关闭时停止后台线程
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 文章分类索引只在启动时全量扫描一次
+    category_index.load()
+    # 增量生成 dist 中文本资源的 .br/.gz 预压缩版本(已是最新的跳过)，再构建文件清单
+    if os.getenv("PRECOMPRESS_ON_STARTUP", "true").lower() in ("1", "true", "yes", "on"):
+        generated = await run_in_threadpool(precompress.precompress_tree, dist_manifest.DIST_DIR)
+        logger.info("预压缩完成，生成 %s 个压缩文件", generated)
+    # dist 文件清单，捕获所有路由直接查表
+    logger.info("Dist目录: %s", dist_manifest.DIST_DIR)
+    dist_manifest.build()
+    # 设置 ARTICLE_INDEX_POLL_INTERVAL(秒)后，后台轮询同步外部对文章目录的修改
+    category_index.start_watcher(float(os.getenv("ARTICLE_INDEX_POLL_INTERVAL", "0")))
+    # 预热数据库连接池，失败时不影响启动，首个请求会重新建立连接
+    try:
+        warmed = await database.warm_pool()
+        logger.info("数据库连接池预热完成，建立 %s 个连接", warmed)
+    except Exception as e:
+        logger.warning("数据库连接池预热失败: %s", e)
+    yield
+    category_index.stop_watcher()
+    await database.async_engine.dispose()
+
+
 # 创建 FastAPI 应用实例
-app = FastAPI(title="NyeWeb API", version="1.0.0")
+# 默认使用 orjson 序列化响应，见 responses.py
+app = FastAPI(title="NyeWeb API", version="1.0.0", lifespan=lifespan, default_response_class=responses.DefaultJSONResponse)
+
+# 公开 GET 接口的 ETag 条件请求，内容未变化时直接返回 304
+# 需在 CORS 之前注册，使 CORS 位于外层，304 响应同样带有跨域头
+app.add_middleware(etag.ETagMiddleware)
+
+# /api/* 响应压缩(brotli/gzip)，位于 ETag 之外，304 响应不受影响
+app.add_middleware(compression.CompressionMiddleware)
 
 # 添加 CORS 中间件 - 修复跨域问题
 app.add_middleware(
@@ -28,6 +73,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# N+1 检测，raise 模式下超出预算的请求在结束时抛出异常
+if query_budget.MODE == "raise":
+    app.add_middleware(query_budget.QueryBudgetMiddleware)
+
+# 按路由统计延迟、状态码和 SQL 条数，位于最外层，统计包含全部中间件的耗时
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(timeline.router, prefix="/api", tags=["timeline"])
 app.include_router(articles.router, prefix="/api", tags=["articles"])
 app.include_router(projects.router, prefix="/api", tags=["projects"])
@@ -36,18 +88,25 @@ app.include_router(figures.router, prefix="/api", tags=["figures"])
 app.include_router(favorite_images.router, prefix="/api", tags=["favorite-images"])
 app.include_router(tools.router, prefix="/api", tags=["tools"])
 app.include_router(admin.router, prefix="/api", tags=["admin"])
+app.include_router(home.router, prefix="/api", tags=["home"])
 
 
 # 添加根路径API测试端点
 # 健康检查端点
 @app.get("/api/health")
+@compression.exempt
 def health_check():
     return {"status": "ok", "message": "API服务正常运行"}
 
 
+# Prometheus 指标，需携带 METRICS_TOKEN
+@app.get("/api/metrics", dependencies=[Depends(metrics.verify_token)])
+def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # 定义 Vue 项目构建后的输出目录路径
-dist_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend", "dist"))
-print(f"Dist目录: {dist_dir}")
+dist_dir = dist_manifest.DIST_DIR
 
 # 定义静态资源目录 (JS, CSS, 图片等)
 # Vite 构建的项目通常将打包后的资源放在 'assets' 文件夹下
@@ -56,7 +115,8 @@ static_assets_dir = os.path.join(dist_dir, "assets")
 # 挂载 'assets' 目录
 # 当浏览器请求 /assets/xxx.js ，FastAPI 会从 frontend/dist/assets/ 目录中查找文件
 if os.path.exists(static_assets_dir):
-    app.mount("/assets", StaticFiles(directory=static_assets_dir), name="assets")
+    # 优先返回预压缩版本，带哈希的文件使用长期不可变缓存
+    app.mount("/assets", static_files.DistStaticFiles(directory=static_assets_dir, prefix="assets", immutable_hashed=True), name="assets")
 
 # 挂载整个 public 目录的内容 (现在位于 dist 目录的根)
 # 所有其他静态资源, 如:
@@ -68,7 +128,20 @@ if os.path.exists(dist_dir):
     # 为了提供 .md 文件等，我们需要一个能直接访问它们的挂载点。
     # 我们将 dist 目录挂载到根路径，但要确保它不会捕获所有内容。
     # 一个更健壮的方法是只挂载 dist 目录本身。
-    app.mount("/static", StaticFiles(directory=dist_dir), name="dist")
+    app.mount("/static", static_files.DistStaticFiles(directory=dist_dir), name="dist")
+
+
+# dist 文件响应，文件信息取自启动时构建的清单，无需再次 stat，支持预压缩版本
+def _file_response(key: str, entry, request: Request) -> Response:
+    return static_files.file_response(key, entry, request.headers, filename=os.path.basename(entry.path))
+
+
+# 返回 Vue 应用入口 index.html
+def _index_response(request: Request, detail: str) -> Response:
+    entry = dist_manifest.lookup("index.html")
+    if entry is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return static_files.file_response("index.html", entry, request.headers)
 
 
 # 创建一个"捕获所有"的路由
@@ -76,75 +149,33 @@ if os.path.exists(dist_dir):
 # 它总是返回 Vue 应用的入口点 index.html
 # 这样，Vue Router 就可以接管并在前端处理路由
 @app.get("/{path:path}")
-async def serve_vue_app(path: str):
+async def serve_vue_app(path: str, request: Request):
     # URL 解码
     decoded_path = unquote(path)
-    print(f"原始请求路径: {path}")
-    print(f"解码后路径: {decoded_path}")
+    logger.debug("请求路径: %s, 解码后路径: %s", path, decoded_path)
 
     # 如果是根路径，返回 index.html
     if not decoded_path:
-        index_html_path = os.path.join(dist_dir, "index.html")
-        if os.path.exists(index_html_path):
-            return FileResponse(index_html_path)
-        else:
-            raise HTTPException(status_code=404, detail="Frontend not built")
-
-    # 标准化路径分隔符
-    normalized_path = decoded_path.replace('/', os.sep)
-    file_path = os.path.join(dist_dir, normalized_path)
-    print(f"标准化后的文件路径: {file_path}")
-
-    # 检查文件是否存在
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        print(f"找到文件: {file_path}")
-
-        # 获取 MIME 类型
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type is None:
-            if file_path.lower().endswith('.pdf'):
-                mime_type = 'application/pdf'
-            elif file_path.lower().endswith('.md'):
-                mime_type = 'text/markdown'
-            else:
-                mime_type = 'application/octet-stream'
-
-        print(f"MIME类型: {mime_type}")
-
-        return FileResponse(
-            path=file_path,
-            media_type=mime_type,
-            filename=os.path.basename(file_path)
-        )
+        return _index_response(request, "Frontend not built")
+
+    # 在 dist 清单中查找文件
+    entry = dist_manifest.lookup(decoded_path)
+    if entry is not None:
+        return _file_response(decoded_path, entry, request)
 
     # 尝试添加 .pdf 扩展名
     if not decoded_path.endswith('.pdf'):
-        pdf_path = os.path.join(dist_dir, normalized_path + '.pdf')
-        print(f"尝试添加.pdf扩展名: {pdf_path}")
-
-        if os.path.exists(pdf_path) and os.path.isfile(pdf_path):
-            print(f"找到PDF文件: {pdf_path}")
-            return FileResponse(
-                path=pdf_path,
-                media_type='application/pdf',
-                filename=os.path.basename(pdf_path)
-            )
+        entry = dist_manifest.lookup(decoded_path + '.pdf')
+        if entry is not None:
+            return _file_response(decoded_path + '.pdf', entry, request)
 
     # 列出父目录的内容进行调试
-    parent_dir = os.path.dirname(file_path)
-    if os.path.exists(parent_dir):
-        files = os.listdir(parent_dir)
-        print(f"父目录 {parent_dir} 存在，内容: {files}")
-    else:
-        print(f"父目录 {parent_dir} 不存在")
+    if logger.isEnabledFor(logging.DEBUG):
+        parent_dir = decoded_path.rsplit('/', 1)[0] if '/' in decoded_path else ''
+        logger.debug("文件不存在: %s，父目录 %s 内容: %s", decoded_path, parent_dir or '/', dist_manifest.list_dir(parent_dir))
 
     # 如果文件不存在，返回 index.html 用于前端路由
-    print(f"文件不存在，返回 index.html 用于前端路由")
-    index_html_path = os.path.join(dist_dir, "index.html")
-    if os.path.exists(index_html_path):
-        return FileResponse(index_html_path)
-    else:
-        raise HTTPException(status_code=404, detail="File not found")
+    return _index_response(request, "File not found")
 
 
 if __name__ == "__main__":
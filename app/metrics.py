@@ -0,0 +1,253 @@
+# 请求指标: 按路由统计延迟直方图、状态码、并发请求数，以及每个请求执行的 SQL 条数和数据库耗时
+# 通过 /api/metrics 以 Prometheus 文本格式输出，不依赖 prometheus_client。
+# SQL 统计挂在 async_engine 的 before/after_cursor_execute 事件上，
+# 用 contextvar 把查询归属到当前请求(异步驱动在同一个 task 的上下文中执行游标操作)。
+import contextvars
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from sqlalchemy import event
+from starlette.routing import Match
+
+import database
+
+# 延迟直方图的桶上界(秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每个请求 SQL 条数直方图的桶上界
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 指标接口(/api/metrics、/api/admin/metrics/pool)的访问令牌，未配置时接口关闭
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+_lock = threading.Lock()
+
+
+# 单个请求的数据库统计；shapes/violations 供 query_budget 使用，未启用时为 None
+class RequestStats:
+    __slots__ = ("scope", "queries", "db_time", "shapes", "violations")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = None
+        self.violations = None
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def copy(self):
+        histogram = _Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.sum = self.sum
+        histogram.count = self.count
+        return histogram
+
+
+# (method, route) -> 指标
+_latency = defaultdict(lambda: _Histogram(LATENCY_BUCKETS))
+_query_counts = defaultdict(lambda: _Histogram(QUERY_COUNT_BUCKETS))
+_db_seconds = defaultdict(float)
+# (method, route, status) -> 请求数
+_responses = defaultdict(int)
+_in_flight = 0
+# 全部 SQL(包括请求之外的，如启动时的预热)
+_db_totals = {"queries": 0, "seconds": 0.0}
+
+
+def current_stats():
+    return _current.get()
+
+
+# SQL 执行计时，开始时间存放在连接的 info 中(同一连接上的游标操作是串行的)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    with _lock:
+        _db_totals["queries"] += 1
+        _db_totals["seconds"] += elapsed
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+instrument_engine(database.async_engine.sync_engine)
+
+
+# 路由模板作为标签，避免路径参数导致标签数量无限增长
+# 正常请求由 FastAPI 在 scope["route"] 中记录匹配的路由；在路由之前就返回的请求(如 ETag 304)按路由表重新匹配
+def route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match != Match.NONE:
+            return candidate.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with _lock:
+            _in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            key = (scope["method"], route_label(scope))
+            with _lock:
+                _in_flight -= 1
+                _latency[key].observe(elapsed)
+                _query_counts[key].observe(stats.queries)
+                _db_seconds[key] += stats.db_time
+                _responses[key + (str(status_code),)] += 1
+
+
+# 指标接口的访问控制: 请求须携带 Authorization: Bearer <METRICS_TOKEN>
+def verify_token(authorization: Optional[str] = Header(None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="未配置 METRICS_TOKEN，指标接口已关闭")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="无效的访问令牌", headers={"WWW-Authenticate": "Bearer"})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_histogram(lines, name, histograms):
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+
+# 输出 Prometheus 文本格式(0.0.4)
+def render() -> str:
+    with _lock:
+        latency = {key: h.copy() for key, h in _latency.items()}
+        query_counts = {key: h.copy() for key, h in _query_counts.items()}
+        db_seconds = dict(_db_seconds)
+        responses = dict(_responses)
+        in_flight = _in_flight
+        db_totals = dict(_db_totals)
+
+    lines = [
+        "# HELP http_requests_in_flight Requests currently being processed.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+        "# HELP http_requests_total Completed requests by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(responses.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    _format_histogram(lines, "http_request_duration_seconds", latency)
+
+    lines += [
+        "# HELP http_request_db_queries SQL statements executed per request.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    _format_histogram(lines, "http_request_db_queries", query_counts)
+
+    lines += [
+        "# HELP http_request_db_seconds_total Time spent executing SQL by route.",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (method, route), seconds in sorted(db_seconds.items()):
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {seconds}")
+
+    lines += [
+        "# HELP db_queries_total SQL statements executed, including those outside requests.",
+        "# TYPE db_queries_total counter",
+        f"db_queries_total {db_totals['queries']}",
+        "# HELP db_query_seconds_total Time spent executing SQL, including outside requests.",
+        "# TYPE db_query_seconds_total counter",
+        f"db_query_seconds_total {db_totals['seconds']}",
+    ]
+
+    pool = database.pool_status()
+    for name, key, kind in (
+        ("db_pool_checked_out", "checked_out", "gauge"),
+        ("db_pool_checked_in", "checked_in", "gauge"),
+        ("db_pool_overflow", "overflow", "gauge"),
+        ("db_pool_checkouts_total", "checkouts", "counter"),
+        ("db_pool_timeouts_total", "timeouts", "counter"),
+        ("db_pool_connect_errors_total", "connect_errors", "counter"),
+    ):
+        if key in pool:
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {pool[key]}")
+    lines.append("# TYPE db_pool_wait_seconds_total counter")
+    lines.append(f"db_pool_wait_seconds_total {pool['wait_time_total_ms'] / 1000}")
+    return "\n".join(lines) + "\n"
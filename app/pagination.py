@@ -0,0 +1,97 @@
+# 游标(keyset)分页工具
+# 游标对调用方不透明，内部是最后一行排序键值的 base64 编码，
+# 下一页通过 WHERE (key, id) < (...) 直接定位，无需 OFFSET 扫描前面的行
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, false, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# 编码单个排序键值，日期类型单独标记以便解码还原
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("无效的游标值")
+    return value
+
+
+# 将排序键值编码为游标字符串
+def encode_cursor(values) -> str:
+    raw = json.dumps([_dump_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+# 解析游标字符串，格式不正确时抛出 ValueError
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError("无效的游标")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("无效的游标")
+    return [_load_value(v) for v in values]
+
+
+# 构造 (k1, k2, ...) < (v1, v2, ...) 的等价条件
+# 展开为 OR/AND 形式，各数据库都能利用 (k1, k2, ...) 上的索引
+# 可为空的列(如文章、项目的日期)按 MySQL、SQLite 的默认排序把 NULL 视为最小值:
+# 倒序时 NULL 排在最后，正序时排在最前；不显式处理时 "< NULL" 恒不成立，这些行会被跳过
+def keyset_condition(columns, values, descending: bool = True):
+    conditions = []
+    for i, column in enumerate(columns):
+        conditions.append(and_(*[_equal(columns[j], values[j]) for j in range(i)], _after(column, values[i], descending)))
+    return or_(*conditions)
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+# 排在 value 之后的行
+def _after(column, value, descending: bool):
+    nullable = getattr(column, "nullable", False)
+    if value is None:
+        return false() if descending else column.is_not(None)
+    if descending:
+        return or_(column < value, column.is_(None)) if nullable else column < value
+    return column > value
+
+
+# 按游标获取一页数据
+# stmt 为查询单个实体的 select()，columns 为排序键(最后一列必须唯一，通常为 id)，cursor 为空字符串时从第一页开始
+# 返回 (当前页数据, 下一页游标)，没有更多数据时下一页游标为 None
+async def fetch_keyset_page(db: AsyncSession, stmt, columns, cursor: str, limit: int, descending: bool = True):
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        stmt = stmt.where(keyset_condition(columns, values, descending))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    # 多取一行用于判断是否还有下一页
+    rows = (await db.scalars(stmt.order_by(*order).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return rows, next_cursor
+
+
+# 统计查询结果总行数，等价于旧 Query API 的 query.count()
+async def count_rows(db: AsyncSession, stmt) -> int:
+    return await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
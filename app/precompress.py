@@ -0,0 +1,113 @@
+# 预压缩 dist 中的文本资源
+# 为 JS/CSS/HTML/markdown 等文件生成 .br 和 .gz 同名文件，静态文件层根据 Accept-Encoding 直接返回压缩版本。
+# 构建后可单独执行: python precompress.py [dist目录]；服务启动时也会增量执行一次，只处理有变化的文件。
+import gzip
+import logging
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只生成 gzip
+    brotli = None
+
+logger = logging.getLogger("precompress")
+
+# 需要预压缩的文件类型
+COMPRESSIBLE_EXTENSIONS = {
+    ".js", ".mjs", ".css", ".html", ".htm", ".md", ".json", ".svg", ".txt", ".xml", ".map", ".csv",
+}
+
+# 过小的文件压缩收益不明显
+MIN_SIZE = 1024
+
+# Content-Encoding -> 文件后缀，按优先顺序排列
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+VARIANT_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+
+def is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _is_fresh(variant_path: str, source_mtime: float) -> bool:
+    try:
+        return os.path.getmtime(variant_path) >= source_mtime
+    except OSError:
+        return False
+
+
+def _write_variant(variant_path: str, data: bytes):
+    # 先写临时文件再替换，避免并发请求读到写了一半的文件
+    tmp_path = variant_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, variant_path)
+
+
+# 删除文件的压缩版本，返回被删除的路径
+def remove_variants(path: str) -> list:
+    removed = []
+    for suffix in VARIANT_SUFFIXES:
+        variant_path = path + suffix
+        if os.path.exists(variant_path):
+            os.remove(variant_path)
+            removed.append(variant_path)
+    return removed
+
+
+# 为单个文件生成压缩版本，已是最新的版本跳过；force=True 时强制重新生成
+# 返回本次写入或删除的压缩文件路径
+def compress_file(path: str, force: bool = False) -> list:
+    if not is_compressible(path) or path.endswith(VARIANT_SUFFIXES):
+        return []
+
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        # 源文件已删除，同时清理压缩版本
+        return remove_variants(path)
+
+    if stat_result.st_size < MIN_SIZE:
+        return remove_variants(path)
+
+    changed = []
+    data = None
+    for encoding, suffix in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        variant_path = path + suffix
+        if not force and _is_fresh(variant_path, stat_result.st_mtime):
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        _write_variant(variant_path, compressed)
+        changed.append(variant_path)
+    return changed
+
+
+# 预压缩整个目录，返回生成的压缩文件数量
+def precompress_tree(root: str) -> int:
+    count = 0
+    for dir_path, _, files in os.walk(root):
+        for name in files:
+            try:
+                count += len(compress_file(os.path.join(dir_path, name)))
+            except OSError as e:
+                logger.warning("预压缩文件失败 %s: %s", name, e)
+    return count
+
+
+if __name__ == "__main__":
+    import dist_manifest
+    import logging_config
+
+    logging_config.setup_logging()
+
+    target = sys.argv[1] if len(sys.argv) > 1 else dist_manifest.DIST_DIR
+    logger.info("预压缩 %s，共生成 %s 个压缩文件", target, precompress_tree(target))
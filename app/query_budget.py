@@ -0,0 +1,100 @@
+# N+1 查询检测: 每个请求执行的 SQL 条数超过路由声明的预算，或同一形状的 SQL 重复执行过多时告警或抛出异常
+# 依赖 metrics.py 记录的当前请求统计，开发/测试环境开启:
+#   QUERY_BUDGET_MODE     off(默认) / warn(记录警告日志) / raise(抛出 QueryBudgetExceeded，测试和检查脚本中使用)
+#   QUERY_BUDGET_DEFAULT  未声明预算的路由默认允许的 SQL 条数，默认 10
+#   QUERY_REPEAT_LIMIT    同一形状 SQL 在一个请求内允许执行的次数，默认 3
+# 路由用 @budget(n) 声明自己的预算，例如:
+#   @router.get("/books")
+#   @query_budget.budget(3)
+#   async def get_books(...): ...
+import logging
+import os
+import re
+from collections import Counter
+
+from sqlalchemy import event
+
+import database
+import metrics
+
+MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+DEFAULT_BUDGET = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", "3"))
+
+logger = logging.getLogger("query_budget")
+
+# IN 列表展开后的占位符(?, ?, ? 或 %s, %s)合并为一个，使不同长度的 IN 查询视为同一形状
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(\?|%s|%\(\w+\)s)(\s*,\s*(\?|%s|%\(\w+\)s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+# 路由装饰器: 声明该路由每个请求最多执行的 SQL 条数
+def budget(limit: int):
+    def decorator(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+    return decorator
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+# raise 模式下在超出的那条 SQL 处直接抛出，便于定位循环查询的位置；
+# 路由自身的 try/except 可能把异常转换为 500，因此同时记录下来，由 QueryBudgetMiddleware 在请求结束后再次抛出
+def _violation(stats, message: str, *args):
+    if MODE != "raise":
+        logger.warning(message, *args)
+        return
+    if stats.violations is None:
+        stats.violations = []
+    stats.violations.append(message % args)
+    raise QueryBudgetExceeded(message % args)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = metrics.current_stats()
+    if stats is None:
+        return
+    if stats.shapes is None:
+        stats.shapes = Counter()
+    shape = statement_shape(statement)
+    stats.shapes[shape] += 1
+
+    scope = stats.scope
+    endpoint = scope.get("endpoint")
+    limit = getattr(endpoint, "query_budget", DEFAULT_BUDGET)
+    # 每类问题只在刚超出时报告一次
+    if stats.queries == limit + 1:
+        _violation(stats, "%s %s 执行了超过 %s 条 SQL，可能存在 N+1 查询",
+                   scope["method"], metrics.route_label(scope), limit)
+    if stats.shapes[shape] == REPEAT_LIMIT + 1:
+        _violation(stats, "%s %s 重复执行同一 SQL 超过 %s 次: %s",
+                   scope["method"], metrics.route_label(scope), REPEAT_LIMIT, shape)
+
+
+# 需位于 MetricsMiddleware 之内，请求结束时当前请求统计仍然可用
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        stats = metrics.current_stats()
+        if stats is not None and stats.violations:
+            raise QueryBudgetExceeded("; ".join(stats.violations))
+
+
+# 在 metrics 的计数监听器之后注册，stats.queries 已包含当前语句
+def enable(engine=None):
+    engine = engine or database.async_engine.sync_engine
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+if MODE in ("warn", "raise"):
+    enable()
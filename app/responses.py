@@ -0,0 +1,58 @@
+# JSON 响应
+# 默认响应类使用 orjson 序列化(未安装时退回标准库 json)；
+# @cached(namespace) 装饰的接口把序列化后的字节缓存到 cache.py 的对应命名空间，
+# 命中时直接返回字节，跳过 ORM 查询、jsonable_encoder 和序列化，写接口调用 cache.invalidate 后失效。
+import functools
+import json
+
+from fastapi.responses import JSONResponse, Response
+
+import cache
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:  # 未安装 orjson 时使用标准库
+    orjson = None
+    ORJSONResponse = None
+
+# FastAPI 默认响应类
+DefaultJSONResponse = ORJSONResponse or JSONResponse
+
+# 不参与缓存键的接口参数(数据库会话、请求对象等依赖)
+_EXCLUDED_PARAMS = ("db", "request")
+
+
+def _default(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+# 已编码的 JSON 字节直接作为响应体
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+# 接口装饰器: 按接口参数缓存序列化后的响应体，需放在 @router.get 与被装饰函数之间
+# 被装饰的接口须返回可序列化的数据(dict/list)，异常(如 HTTPException)照常抛出且不缓存
+def cached(namespace: str):
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            key = (endpoint.__name__,) + tuple(
+                (name, value) for name, value in sorted(kwargs.items()) if name not in _EXCLUDED_PARAMS
+            )
+
+            async def render():
+                return dumps(await endpoint(*args, **kwargs))
+
+            return json_bytes_response(await cache.get_or_set(namespace, key, render))
+        return wrapper
+    return decorator
@@ -0,0 +1,79 @@
+# 书籍、图表、工具的关键词搜索
+# MySQL 下使用 title/description 上的 FULLTEXT 索引(ngram 解析器，支持中文)并返回相关度表达式，
+# 其他数据库(如本地 SQLite)、过短的关键词或缺少全文索引的表自动退回 LIKE 模糊匹配
+import logging
+import re
+
+from sqlalchemy import literal, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger("search")
+
+# 与 MySQL 的 ngram_token_size 保持一致(默认 2)，更短的关键词无法命中全文索引
+NGRAM_TOKEN_SIZE = 2
+
+# MySQL 错误码: 找不到与列匹配的 FULLTEXT 索引(旧部署未执行 db/migrate_indexes.sql 时出现)
+ER_FT_MATCHING_KEY_NOT_FOUND = 1191
+
+# 表名 -> 全文索引是否可用，每个进程首次搜索该表时探测一次(补建索引后重启服务生效)
+_fulltext_tables = {}
+
+# 布尔模式下有特殊含义的字符
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+# 是否可以使用全文索引
+def fulltext_supported(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+# 清理关键词中的布尔模式运算符，避免用户输入改变查询语义
+def _clean_term(term: str) -> str:
+    return ' '.join(_BOOLEAN_OPERATORS.sub(' ', term).split())
+
+
+# 全文匹配表达式，关键词作为整体短语匹配，效果接近 LIKE '%x%'
+def fulltext_match(columns, term: str):
+    return match(*columns, against=f'"{term}"').in_boolean_mode()
+
+
+# LIKE 模糊匹配条件(原有实现)
+def like_condition(columns, term: str):
+    pattern = f"%{term}%"
+    return or_(*[column.ilike(pattern) for column in columns])
+
+
+# 表上是否存在可用的全文索引
+# 用一条 LIMIT 1 的 MATCH 查询探测，MySQL 报 1191 时记录为不可用，该表的搜索退回 LIKE
+async def _fulltext_index_available(db: AsyncSession, columns) -> bool:
+    table = columns[0].table
+    if table.name not in _fulltext_tables:
+        try:
+            await db.execute(select(literal(1)).select_from(table).where(fulltext_match(columns, "probe")).limit(1))
+            _fulltext_tables[table.name] = True
+        except DBAPIError as e:
+            if getattr(e.orig, "args", (None,))[0] != ER_FT_MATCHING_KEY_NOT_FOUND:
+                raise
+            logger.warning("表 %s 缺少全文索引，关键词搜索退回 LIKE 匹配，请执行 db/migrate_indexes.sql", table.name)
+            _fulltext_tables[table.name] = False
+    return _fulltext_tables[table.name]
+
+
+# 为 select() 查询添加搜索条件
+# 返回 (stmt, relevance)，relevance 为相关度表达式，LIKE 回退时为 None
+async def apply_search(db: AsyncSession, stmt, columns, term: str):
+    condition, relevance = await search_condition(db, columns, term)
+    return stmt.where(condition), relevance
+
+
+# 搜索条件本身，返回 (condition, relevance)
+async def search_condition(db: AsyncSession, columns, term: str):
+    cleaned = _clean_term(term)
+    if (fulltext_supported(db) and len(cleaned) >= NGRAM_TOKEN_SIZE
+            and await _fulltext_index_available(db, columns)):
+        relevance = fulltext_match(columns, cleaned)
+        return relevance, relevance
+
+    return like_condition(columns, term), None
@@ -0,0 +1,175 @@
+# dist 静态文件响应
+# 文件信息来自 dist_manifest，根据 Accept-Encoding 选择预压缩的 .br/.gz 版本(见 precompress.py)，
+# 带哈希的构建产物(如 /assets/index-BkZ3x9aQ.js)附加长期不可变缓存头。
+# Range/多段 Range/If-Range/206/416 由 FileResponse 处理，服务器支持 zerocopysend 扩展时零拷贝发送文件
+# (uvicorn 没有实现该扩展，在 uvicorn 下零拷贝分支不会生效，见 ZeroCopyFileResponse)
+import os
+import re
+from secrets import token_hex
+
+import anyio
+
+from fastapi.responses import FileResponse, Response
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+import dist_manifest
+import precompress
+from etag import if_none_match
+
+# 带内容哈希文件的缓存策略: 内容变化时文件名随之变化，可以永久缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Vite 输出的文件名形如 name-<hash>.ext
+_HASHED_NAME = re.compile(r"[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+# 304 响应保留的头
+_NOT_MODIFIED_HEADERS = ("etag", "cache-control", "vary", "last-modified")
+
+
+def is_hashed_name(path: str) -> bool:
+    return bool(_HASHED_NAME.search(os.path.basename(path)))
+
+
+# 解析 Accept-Encoding，返回可接受的编码集合(忽略 q=0)
+def accepted_encodings(header: str) -> set:
+    encodings = set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name)
+    return encodings
+
+
+# 支持 ASGI zerocopysend 扩展的文件响应
+# 服务器在 scope["extensions"] 中声明该扩展时把文件描述符交给服务器用 os.sendfile 发送，数据不经过用户态缓冲；
+# 否则退回 FileResponse 原有的 pathsend 或分块读取方式。
+# 注意: 本项目使用的 uvicorn 不声明 zerocopysend，在 uvicorn 下只有更大的读取块(chunk_size)生效，
+# 零拷贝分支仅在实现了该扩展的服务器上使用。
+# zerocopysend 消息需原样穿过全部中间件，因此中间件均为纯 ASGI 实现(BaseHTTPMiddleware 会拒绝该消息)
+class ZeroCopyFileResponse(FileResponse):
+    chunk_size = 256 * 1024  # 不支持零拷贝时的读取块大小，大文件(如 PDF)减少 send 次数
+
+    async def __call__(self, scope, receive, send):
+        self._zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    # count 为 None 时发送到文件末尾(未传入 stat_result 时从打开的文件获取大小)
+    async def _send_file(self, send, offset: int, count: int = None):
+        with open(self.path, "rb") as file:
+            if count is None:
+                count = os.fstat(file.fileno()).st_size - offset
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file,
+                "offset": offset,
+                "count": count,
+                "more_body": False,
+            })
+
+    async def _handle_simple(self, send, send_header_only: bool, send_pathsend: bool):
+        if send_header_only or not self._zerocopy:
+            return await super()._handle_simple(send, send_header_only, send_pathsend)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await self._send_file(send, 0)
+
+    async def _handle_single_range(self, send, start: int, end: int, file_size: int, send_header_only: bool):
+        if send_header_only or not self._zerocopy:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._send_file(send, start, end - start)
+
+    # 多段 Range: 边界信息放在 Content-Type 中(RFC 9110)，不使用 Content-Range
+    async def _handle_multiple_ranges(self, send, ranges, file_size: int, send_header_only: bool):
+        boundary = token_hex(13)
+        content_length, header_generator = self.generate_multipart(
+            ranges, boundary, file_size, self.headers["content-type"]
+        )
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for start, end in ranges:
+                await send({"type": "http.response.body", "body": header_generator(start, end), "more_body": True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"\n", "more_body": True})
+        await send({"type": "http.response.body", "body": f"\n--{boundary}--\n".encode("latin-1"), "more_body": False})
+
+
+# 为清单中的文件构造响应
+# key 为 dist 中的相对路径；filename 不为空时附带 Content-Disposition
+def file_response(key: str, entry, request_headers: Headers, filename: str = None,
+                  cache_control: str = None) -> Response:
+    headers = {}
+    if cache_control:
+        headers["cache-control"] = cache_control
+
+    served = entry
+    # Range 请求的偏移量针对原始文件，此时不使用压缩版本
+    ranged = request_headers.get("range") is not None
+    if precompress.is_compressible(key):
+        accepted = accepted_encodings(request_headers.get("accept-encoding"))
+        has_variant = False
+        for encoding, suffix in precompress.ENCODINGS:
+            variant = dist_manifest.lookup(key + suffix)
+            if variant is None:
+                continue
+            has_variant = True
+            if not ranged and served is entry and (encoding in accepted or "*" in accepted):
+                served = variant
+                headers["content-encoding"] = encoding
+        # 同一 URL 的响应随 Accept-Encoding 变化，缓存需区分
+        if has_variant:
+            headers["vary"] = "Accept-Encoding"
+
+    headers["etag"] = served.etag
+    if if_none_match(request_headers.get("if-none-match"), served.etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k in _NOT_MODIFIED_HEADERS})
+
+    return ZeroCopyFileResponse(
+        path=served.path,
+        media_type=entry.mime,
+        filename=filename,
+        stat_result=served.stat,
+        headers=headers
+    )
+
+
+# 基于 dist 清单的 StaticFiles
+# prefix 为挂载目录在 dist 中的相对路径；immutable_hashed=True 时带哈希的文件使用不可变缓存
+# 清单中不存在的文件交给 StaticFiles 原有逻辑处理
+class DistStaticFiles(StaticFiles):
+    def __init__(self, *args, prefix: str = "", immutable_hashed: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix = prefix.strip("/")
+        self.immutable_hashed = immutable_hashed
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] in ("GET", "HEAD") and path != ".":
+            rel_path = path.replace(os.sep, "/")
+            key = f"{self.prefix}/{rel_path}" if self.prefix else rel_path
+            entry = dist_manifest.lookup(key)
+            if entry is not None:
+                cache_control = None
+                if self.immutable_hashed and is_hashed_name(rel_path):
+                    cache_control = IMMUTABLE_CACHE_CONTROL
+                return file_response(key, entry, Headers(scope=scope), cache_control=cache_control)
+        return await super().get_response(path, scope)
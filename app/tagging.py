@@ -0,0 +1,71 @@
+# 标签相关的通用查询
+from sqlalchemy import distinct, false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import cache
+from database import Tag
+
+
+# 统计标签及其关联数量，一条 GROUP BY tag_id 聚合查询完成
+# entity_id_column 为关联表中指向实体的外键列，如 BookTag.book_id
+# 传入 status_column 时只统计该状态(默认已发布)的实体
+async def count_tags(db: AsyncSession, link_model, entity_id_column, status_column=None, status: int = 1):
+    stmt = select(Tag.name, func.count(entity_id_column)).join(link_model, link_model.tag_id == Tag.id)
+
+    if status_column is not None:
+        entity_table = status_column.class_
+        stmt = stmt.join(entity_table, entity_table.id == entity_id_column).where(status_column == status)
+
+    rows = (await db.execute(stmt.group_by(link_model.tag_id, Tag.name).order_by(link_model.tag_id))).all()
+
+    return {
+        "tags": [name for name, _ in rows],
+        "counts": {name: count for name, count in rows}
+    }
+
+
+# 标签名称到 id 的完整映射
+async def _load_tag_map(db: AsyncSession) -> dict:
+    return dict((await db.execute(select(Tag.name, Tag.id))).all())
+
+
+# 标签名解析为 id
+# 标签表的名称到 id 映射整体缓存；标签只会新增，缓存中找不到的名称再查一次数据库
+async def resolve_tag_ids(db: AsyncSession, names) -> dict:
+    name_to_id = await cache.get_or_set("tags", "name_to_id", lambda: _load_tag_map(db))
+
+    resolved = {name: name_to_id[name] for name in names if name in name_to_id}
+    missing = [name for name in names if name not in name_to_id]
+    if missing:
+        # 数据库排序规则可能不区分大小写，按小写名称对应回请求中的标签名
+        rows = (await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))).all()
+        found = {name.lower(): tag_id for name, tag_id in rows}
+        for name in missing:
+            if name.lower() in found:
+                resolved[name] = found[name.lower()]
+    return resolved
+
+
+# 按标签筛选实体
+# entity_id_column 为实体主键(如 Book.id)，link_entity_column 为关联表外键(如 BookTag.book_id)
+# match_all=True 时须包含所有标签，否则包含任一标签即可；两种模式都只有一个 GROUP BY 子查询
+async def filter_by_tags(db: AsyncSession, stmt, entity_id_column, link_entity_column, tag_names, match_all: bool = True):
+    return stmt.where(await tag_condition(db, entity_id_column, link_entity_column, tag_names, match_all))
+
+
+# 标签筛选条件本身，供需要组合多组条件的查询(如管理员分面统计)使用
+async def tag_condition(db: AsyncSession, entity_id_column, link_entity_column, tag_names, match_all: bool = True):
+    tag_names = list(dict.fromkeys(tag_names))  # 去重并保持顺序
+    resolved = await resolve_tag_ids(db, tag_names)
+    tag_ids = set(resolved.values())
+
+    # 全部匹配时存在未知标签，或没有任何已知标签，结果必为空
+    if not tag_ids or (match_all and len(resolved) < len(tag_names)):
+        return false()
+
+    link_model = link_entity_column.class_
+    subquery = select(link_entity_column).where(link_model.tag_id.in_(tag_ids)).group_by(link_entity_column)
+    if match_all:
+        subquery = subquery.having(func.count(distinct(link_model.tag_id)) == len(tag_ids))
+
+    return entity_id_column.in_(subquery)
@@ -13,7 +13,9 @@ CREATE TABLE IF NOT EXISTS `articles`
     `category` VARCHAR(100),
     `date`     DATE,
     `summary`  TEXT,
-    `status`   TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收'
+    `status`   TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收',
+    INDEX `ix_articles_status_date` (`status`, `date`, `id`), -- 按日期排序、游标分页和日期范围筛选
+    INDEX `ix_articles_status_category` (`status`, `category`) -- 分类及子分类的前缀匹配
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8mb4;
 
@@ -25,7 +27,8 @@ CREATE TABLE IF NOT EXISTS `projects`
     `slug`    VARCHAR(255) NOT NULL UNIQUE,
     `date`    DATE,
     `summary` TEXT,
-    `status`  TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收'
+    `status`  TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收',
+    INDEX `ix_projects_status_date` (`status`, `date`, `id`) -- 按日期排序、游标分页和日期范围筛选
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8mb4;
 
@@ -37,7 +40,9 @@ CREATE TABLE IF NOT EXISTS `books`
     `description` TEXT,
     `filename`    VARCHAR(255),
     `cover`       VARCHAR(255),
-    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收'
+    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收',
+    INDEX `ix_books_status` (`status`), -- 配合按 id 倒序的游标分页
+    FULLTEXT INDEX `ft_books_title_description` (`title`, `description`) WITH PARSER ngram -- 关键词搜索
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8mb4;
 
@@ -48,7 +53,9 @@ CREATE TABLE IF NOT EXISTS `figures`
     `title`       VARCHAR(255) NOT NULL,
     `description` TEXT,
     `url`         VARCHAR(2083), -- 改为url字段，存储图床链接
-    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收'
+    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收',
+    INDEX `ix_figures_status` (`status`), -- 配合按 id 倒序的游标分页
+    FULLTEXT INDEX `ft_figures_title_description` (`title`, `description`) WITH PARSER ngram -- 关键词搜索
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8mb4;
 
@@ -59,7 +66,9 @@ CREATE TABLE IF NOT EXISTS `tools`
     `title`       VARCHAR(255) NOT NULL,
     `description` TEXT,
     `url`         VARCHAR(2083),
-    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收'
+    `status`      TINYINT      NOT NULL DEFAULT 1 COMMENT '0=未发布, 1=已发布, 2=已回收',
+    INDEX `ix_tools_status` (`status`), -- 配合按 id 倒序的游标分页
+    FULLTEXT INDEX `ft_tools_title_description` (`title`, `description`) WITH PARSER ngram -- 关键词搜索
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8mb4;
 
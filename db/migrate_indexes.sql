@@ -0,0 +1,46 @@
+-- 为已有数据库补建索引，可重复执行(已存在的索引跳过)
+-- create_table.sql 中的索引只在建表时创建，旧部署升级后执行一次:
+--   mysql -u <用户> -p nyeweb < db/migrate_indexes.sql
+-- 也可以运行 python app/init_db.py，效果相同
+USE `nyeweb`;
+
+DROP PROCEDURE IF EXISTS `add_index_if_missing`;
+
+DELIMITER //
+CREATE PROCEDURE `add_index_if_missing`(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_definition TEXT)
+BEGIN
+    IF NOT EXISTS (SELECT 1
+                   FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = p_table
+                     AND INDEX_NAME = p_index) THEN
+        SET @ddl = CONCAT('ALTER TABLE `', p_table, '` ADD ', p_definition);
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+DELIMITER ;
+
+-- 文章: 按日期排序、游标分页和日期范围筛选；分类及子分类的前缀匹配
+CALL add_index_if_missing('articles', 'ix_articles_status_date',
+                          'INDEX `ix_articles_status_date` (`status`, `date`, `id`)');
+CALL add_index_if_missing('articles', 'ix_articles_status_category',
+                          'INDEX `ix_articles_status_category` (`status`, `category`)');
+
+-- 项目: 按日期排序、游标分页和日期范围筛选
+CALL add_index_if_missing('projects', 'ix_projects_status_date',
+                          'INDEX `ix_projects_status_date` (`status`, `date`, `id`)');
+
+-- 书籍、图表、工具: 配合按 id 倒序的游标分页；关键词搜索(ngram 全文索引)
+CALL add_index_if_missing('books', 'ix_books_status', 'INDEX `ix_books_status` (`status`)');
+CALL add_index_if_missing('books', 'ft_books_title_description',
+                          'FULLTEXT INDEX `ft_books_title_description` (`title`, `description`) WITH PARSER ngram');
+CALL add_index_if_missing('figures', 'ix_figures_status', 'INDEX `ix_figures_status` (`status`)');
+CALL add_index_if_missing('figures', 'ft_figures_title_description',
+                          'FULLTEXT INDEX `ft_figures_title_description` (`title`, `description`) WITH PARSER ngram');
+CALL add_index_if_missing('tools', 'ix_tools_status', 'INDEX `ix_tools_status` (`status`)');
+CALL add_index_if_missing('tools', 'ft_tools_title_description',
+                          'FULLTEXT INDEX `ft_tools_title_description` (`title`, `description`) WITH PARSER ngram');
+
+DROP PROCEDURE `add_index_if_missing`;
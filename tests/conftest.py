@@ -0,0 +1,46 @@
+# 测试环境: 临时目录中的 SQLite 数据库和前端目录
+# 接口代码以 ../frontend/... 相对路径读写文章文件，工作目录切换到临时目录下的 app，
+# 应用启动(预压缩、dist 清单、分类索引)和文件写删都不会触及仓库工作区
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+TEST_ROOT = tempfile.mkdtemp(prefix="nyeweb-test-")
+DIST_DIR = os.path.join(TEST_ROOT, "frontend", "dist")
+os.makedirs(os.path.join(TEST_ROOT, "app"))
+os.makedirs(DIST_DIR)
+# 前端入口文件，供捕获所有路由和静态文件响应的测试使用
+INDEX_HTML = b"<!DOCTYPE html><html><body><div id=\"app\"></div></body></html>"
+with open(os.path.join(DIST_DIR, "index.html"), "wb") as f:
+    f.write(INDEX_HTML)
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(TEST_ROOT, "test.db")
+os.environ["FRONTEND_DIST_DIR"] = DIST_DIR
+os.environ["PRECOMPRESS_ON_STARTUP"] = "false"
+os.environ["METRICS_TOKEN"] = "test-metrics-token"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+sys.path.insert(0, os.path.abspath(APP_DIR))
+os.chdir(os.path.join(TEST_ROOT, "app"))
+
+# 每类内容生成的行数
+ROW_COUNT = 40
+
+
+# 生成测试数据(含文章、项目的 markdown 文件)并启动应用，整个测试会话共用
+@pytest.fixture(scope="session")
+def client():
+    import database
+    import generate_data
+    from fastapi.testclient import TestClient
+
+    generate_data.generate(database.engine, {name: ROW_COUNT for name in generate_data.CONTENT_TYPES},
+                           tags=10, dist_dir=DIST_DIR, run_id="test")
+
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
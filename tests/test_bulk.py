@@ -0,0 +1,42 @@
+# 批量修改状态与批量删除: 逐条结果、文件清理
+import os
+
+from conftest import DIST_DIR, TEST_ROOT
+
+
+def test_bulk_status_reports_each_id(client):
+    ids = [book["id"] for book in client.get("/api/admin/books").json()[:3]]
+    response = client.patch("/api/books/bulk/status", json={"ids": ids + [999999], "status": "recycled"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 3 and body["not_found"] == 1
+    assert [entry["result"] for entry in body["results"]] == ["updated"] * 3 + ["not_found"]
+
+    statuses = {book["id"]: book["status"] for book in client.get("/api/admin/books").json()}
+    assert all(statuses[book_id] == "recycled" for book_id in ids)
+
+
+def test_bulk_delete_tries_every_project_file(client):
+    project = client.get("/api/admin/projects").json()[0]
+    dist_path = os.path.join(DIST_DIR, "articles", "projects", f"{project['slug']}.md")
+    public_path = os.path.join(TEST_ROOT, "frontend", "public", "articles", "projects", f"{project['slug']}.md")
+
+    # dist 中的文件无法删除(同名目录)，public 中的文件仍应被删除，失败信息出现在该条结果中
+    os.remove(dist_path)
+    os.makedirs(dist_path)
+    os.makedirs(os.path.dirname(public_path), exist_ok=True)
+    with open(public_path, "w", encoding="utf-8") as f:
+        f.write("# 项目")
+
+    response = client.post("/api/projects/bulk/delete", json={"ids": [project["id"], 999999]})
+    assert response.status_code == 200
+    first, missing = response.json()["results"]
+    assert first["result"] == "deleted" and "warning" in first
+    assert missing == {"id": 999999, "result": "not_found"}
+    assert not os.path.exists(public_path)
+    os.rmdir(dist_path)
+
+
+def test_bulk_rejects_invalid_requests(client):
+    assert client.patch("/api/tools/bulk/status", json={"ids": [1], "status": "x"}).status_code == 400
+    assert client.post("/api/tools/bulk/delete", json={"ids": []}).status_code == 400
@@ -0,0 +1,18 @@
+# 分类树: 文章信息按批查询(slug 列表按 bulk.BATCH_SIZE 切分)，批次较小时结果仍然完整
+import bulk
+import cache
+
+
+def test_category_articles_are_resolved_in_batches(client, monkeypatch):
+    published = {(article["category"], article["slug"]): article for article in client.get("/api/articles").json()}
+    assert len(published) > 5
+
+    monkeypatch.setattr(bulk, "BATCH_SIZE", 5)
+    cache.invalidate("articles")
+    body = client.get("/api/articles/categories").json()
+
+    resolved = {(category["path"], article["slug"]): article
+                for category in body["categories"] for article in category["articles"]}
+    for key, article in published.items():
+        assert resolved[key]["title"] == article["title"]
+        assert resolved[key]["date"] == article["date"]
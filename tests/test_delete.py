@@ -0,0 +1,40 @@
+# 删除文章、项目: 数据库提交成功后才删除 markdown 文件，提交失败时文件保留
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conftest import DIST_DIR
+
+
+def _article_path(article):
+    return os.path.join(DIST_DIR, "articles", "knowledge", article["category"], f"{article['slug']}.md")
+
+
+def _project_path(project):
+    return os.path.join(DIST_DIR, "articles", "projects", f"{project['slug']}.md")
+
+
+@pytest.mark.parametrize("kind, path_of", [("articles", _article_path), ("projects", _project_path)])
+def test_delete_removes_file_after_commit(client, kind, path_of):
+    item = client.get(f"/api/admin/{kind}").json()[0]
+    assert os.path.exists(path_of(item))
+
+    assert client.delete(f"/api/{kind}/{item['id']}").status_code == 200
+    assert not os.path.exists(path_of(item))
+    assert item["id"] not in [row["id"] for row in client.get(f"/api/admin/{kind}").json()]
+
+
+@pytest.mark.parametrize("kind, path_of", [("articles", _article_path), ("projects", _project_path)])
+def test_failed_commit_keeps_file(client, monkeypatch, kind, path_of):
+    item = client.get(f"/api/admin/{kind}").json()[0]
+
+    async def broken_commit(self):
+        raise RuntimeError("提交失败")
+
+    monkeypatch.setattr(AsyncSession, "commit", broken_commit)
+    assert client.delete(f"/api/{kind}/{item['id']}").status_code == 500
+    monkeypatch.undo()
+
+    assert os.path.exists(path_of(item))
+    assert item["id"] in [row["id"] for row in client.get(f"/api/admin/{kind}").json()]
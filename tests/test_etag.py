@@ -0,0 +1,24 @@
+# ETag 条件请求: 公开接口附加 ETag，命中 If-None-Match 时返回 304，写操作后 ETag 变化；其他路径不附加
+def test_etag_and_not_modified(client):
+    first = client.get("/api/books")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    not_modified = client.get("/api/books", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    # 压缩后的 200 响应为弱 ETag，304 响应未经压缩为强 ETag
+    assert not_modified.headers["etag"] == etag.removeprefix("W/")
+
+    book_id = client.get("/api/admin/books").json()[0]["id"]
+    assert client.patch(f"/api/books/{book_id}/status", json={"status": "published"}).status_code == 200
+    changed = client.get("/api/books", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_query_string_changes_etag(client):
+    assert client.get("/api/books?page=1").headers["etag"] != client.get("/api/books?page=2").headers["etag"]
+
+
+def test_other_paths_have_no_etag_header_added(client):
+    assert "etag" not in client.get("/api/health").headers
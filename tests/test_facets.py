@@ -0,0 +1,22 @@
+# 管理员列表分面: 状态为 NULL 的图片计入草稿，筛选草稿时也能查到
+from sqlalchemy import update
+
+import cache
+import database
+from database import Figure
+
+
+def test_null_status_counts_as_draft(client):
+    figure_id = client.get("/api/admin/figures").json()[0]["id"]
+    with database.engine.begin() as conn:
+        conn.execute(update(Figure).where(Figure.id == figure_id).values(status=None))
+    cache.invalidate("figures")
+
+    response = client.get("/api/admin/figures", params={"page": 1, "limit": 100})
+    assert response.status_code == 200
+    body = response.json()
+    assert sum(body["facets"]["status"].values()) == body["pagination"]["total"]
+
+    drafts = client.get("/api/admin/figures", params={"page": 1, "limit": 100, "status": "draft"}).json()
+    assert figure_id in [figure["id"] for figure in drafts["data"]]
+    assert drafts["pagination"]["total"] == body["facets"]["status"]["draft"]
@@ -0,0 +1,57 @@
+# init_db 为已有的表补建缺少的索引，可重复执行
+import os
+
+from sqlalchemy import create_engine, inspect, text
+
+import init_db
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_missing_indexes_are_created(tmp_path):
+    engine = create_engine("sqlite:///" + os.path.join(tmp_path, "migrate.db"))
+    init_db.create_database_tables(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_articles_status_date"))
+        conn.execute(text("DROP INDEX ix_books_status"))
+
+    init_db.create_database_tables(engine)
+    assert "ix_articles_status_date" in _index_names(engine, "articles")
+    assert "ix_books_status" in _index_names(engine, "books")
+
+    # 再次执行不报错，也不会在 SQLite 上创建 MySQL 专用的全文索引
+    init_db.create_database_tables(engine)
+    assert "ft_books_title_description" not in _index_names(engine, "books")
+    engine.dispose()
+
+
+# 按 create_table.sql 建好的旧库(只有主键、唯一键，缺少本系列新增的索引)
+CREATE_TABLE_SQL = [
+    "CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title VARCHAR(255) NOT NULL, "
+    "slug VARCHAR(255) NOT NULL UNIQUE, category VARCHAR(100), date DATE, summary TEXT, "
+    "status SMALLINT NOT NULL DEFAULT 1)",
+    "CREATE TABLE books (id INTEGER PRIMARY KEY AUTOINCREMENT, title VARCHAR(255) NOT NULL, "
+    "description TEXT, filename VARCHAR(255), cover VARCHAR(255), status SMALLINT NOT NULL DEFAULT 1)",
+    "CREATE TABLE admins (id INTEGER PRIMARY KEY AUTOINCREMENT, username VARCHAR(50) UNIQUE, "
+    "password_hash VARCHAR(128), created_at DATETIME)",
+]
+
+
+def test_migration_skips_indexes_covered_by_keys(tmp_path):
+    engine = create_engine("sqlite:///" + os.path.join(tmp_path, "legacy.db"))
+    with engine.begin() as conn:
+        for statement in CREATE_TABLE_SQL:
+            conn.execute(text(statement))
+
+    init_db.create_database_tables(engine)
+    articles = _index_names(engine, "articles")
+    assert {"ix_articles_status_date", "ix_articles_status_category"} <= articles
+    assert "ix_books_status" in _index_names(engine, "books")
+
+    # 主键和唯一键已覆盖的列不再建冗余的二级索引
+    assert "ix_articles_id" not in articles
+    assert "ix_books_id" not in _index_names(engine, "books")
+    assert not {"ix_admins_id", "ix_admins_username"} & _index_names(engine, "admins")
+    engine.dispose()
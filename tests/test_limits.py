@@ -0,0 +1,16 @@
+# 书籍、图表、工具列表的每页数量不超过 listing.MAX_LIMIT
+import pytest
+
+import listing
+
+
+@pytest.mark.parametrize("path", ["/api/books", "/api/figures", "/api/tools"])
+@pytest.mark.parametrize("mode", ["page=1", "cursor="])
+def test_limit_is_clamped(client, path, mode):
+    response = client.get(f"{path}?{mode}&limit=1000000")
+    assert response.status_code == 200
+    assert response.json()["pagination"]["limit"] == listing.MAX_LIMIT
+
+
+def test_cursor_limit_lower_bound(client):
+    assert client.get("/api/books?cursor=&limit=0").status_code == 400
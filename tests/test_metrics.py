@@ -0,0 +1,25 @@
+# 指标接口需要携带 METRICS_TOKEN
+import os
+
+import pytest
+
+import metrics
+
+AUTH = {"Authorization": "Bearer " + os.environ["METRICS_TOKEN"]}
+
+
+@pytest.mark.parametrize("path", ["/api/metrics", "/api/admin/metrics/pool"])
+def test_metrics_require_token(client, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(path, headers=AUTH).status_code == 200
+
+
+def test_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert client.get("/api/metrics", headers=AUTH).status_code == 403
+
+
+def test_metrics_output(client):
+    body = client.get("/api/metrics", headers=AUTH).text
+    assert "db_pool_wait_seconds_total" in body
@@ -0,0 +1,43 @@
+# 游标分页: 日期为空的行不会在翻页时被跳过或重复
+import asyncio
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import listing
+from database import Article, Base
+from pagination import fetch_keyset_page
+
+DATES = [date(2024, 3, 1), None, date(2024, 1, 1), date(2024, 3, 1), None, date(2024, 2, 1)]
+
+
+@pytest.mark.parametrize("sort", ["date_desc", "date_asc"])
+def test_null_dates_cross_page_boundary(tmp_path, sort):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///" + os.path.join(tmp_path, "pages.db"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Article.__table__])
+        try:
+            async with AsyncSession(engine) as db:
+                db.add_all(Article(title=f"a{i}", slug=f"a{i}", date=value, status=1)
+                           for i, value in enumerate(DATES))
+                await db.commit()
+
+                columns, descending = listing.sort_columns(Article, sort)
+                stmt = select(Article)
+                expected = (await db.scalars(stmt.order_by(*listing.order_by(columns, descending)))).all()
+
+                seen, cursor = [], ""
+                while cursor is not None:
+                    rows, cursor = await fetch_keyset_page(db, stmt, columns, cursor, 2, descending)
+                    seen.extend(rows)
+                return [row.id for row in expected], [row.id for row in seen]
+        finally:
+            await engine.dispose()
+
+    expected, seen = asyncio.run(run())
+    assert len(expected) == len(DATES)
+    assert seen == expected
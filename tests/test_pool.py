@@ -0,0 +1,56 @@
+# 连接池统计: 只有等待超过 pool_timeout 计入 timeouts，新建连接失败计入 connect_errors，
+# checkouts 和等待耗时只统计成功获取的连接
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import database
+
+
+def _stats():
+    with database._pool_stats_lock:
+        return dict(database._pool_stats)
+
+
+def test_pool_timeout_is_counted(tmp_path):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///" + os.path.join(tmp_path, "pool.db"),
+                                     poolclass=database.TimedAsyncQueuePool,
+                                     pool_size=1, max_overflow=0, pool_timeout=0.05)
+        held = await engine.connect()
+        try:
+            with pytest.raises(exc.TimeoutError):
+                await engine.connect()
+        finally:
+            await held.close()
+            await engine.dispose()
+
+    before = _stats()
+    asyncio.run(run())
+    after = _stats()
+    assert after["timeouts"] == before["timeouts"] + 1
+    assert after["connect_errors"] == before["connect_errors"]
+    # 只有持有的那次获取成功，超时的那次不计入 checkouts
+    assert after["checkouts"] == before["checkouts"] + 1
+
+
+def test_connect_error_is_not_a_timeout(tmp_path):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///" + os.path.join(tmp_path, "missing", "pool.db"),
+                                     poolclass=database.TimedAsyncQueuePool,
+                                     pool_size=1, max_overflow=0, pool_timeout=0.05)
+        try:
+            with pytest.raises(exc.OperationalError):
+                await engine.connect()
+        finally:
+            await engine.dispose()
+
+    before = _stats()
+    asyncio.run(run())
+    after = _stats()
+    assert after["connect_errors"] == before["connect_errors"] + 1
+    assert after["timeouts"] == before["timeouts"]
+    assert after["checkouts"] == before["checkouts"]
@@ -0,0 +1,97 @@
+# 公开 GET 接口的 SQL 条数回归测试: 断言每个接口首次请求(缓存为空)和再次请求(命中缓存)执行的 SQL 条数
+# 以 QUERY_BUDGET_MODE=raise 的方式运行，超出路由预算或重复执行同一 SQL 的请求返回错误；
+# 条数不随数据量变化，出现变化通常说明引入了 N+1 查询或缓存失效
+import pytest
+from sqlalchemy import event, select
+
+import cache
+import database
+import query_budget
+from database import Article, Book, Figure, Project, Tool
+
+# 请求路径 -> (首次请求的 SQL 条数, 再次请求的 SQL 条数)
+# 路径中的 {占位符} 在测试时替换为测试数据中已发布的记录
+EXPECTED = {
+    "/api/articles": (2, 0),
+    "/api/articles/categories": (1, 0),  # 分类来自内存中的分类索引，文章信息一次集合查询
+    "/api/articles/{article_slug}": (2, 0),
+    "/api/articles/{article_category}/{article_slug}": (2, 0),
+    "/api/tags": (1, 0),
+    "/api/projects": (2, 0),
+    "/api/projects/{project_slug}": (2, 0),
+    "/api/project-tags": (1, 0),
+    "/api/books": (3, 0),
+    "/api/books?tags=tag-1": (4, 0),
+    "/api/books/{book_id}": (2, 0),
+    "/api/book-tags": (1, 0),
+    "/api/figures": (3, 0),
+    "/api/figures/{figure_id}": (2, 0),
+    "/api/figure-tags": (1, 0),
+    "/api/tools": (3, 0),
+    "/api/tools/{tool_id}": (2, 0),
+    "/api/tool-tags": (1, 0),
+    "/api/timeline": (1, 0),
+    "/api/timeline/database": (1, 1),  # 不缓存
+    "/api/favorite-images": (1, 0),
+    "/api/favorite-images/{image_id}": (1, 0),
+    "/api/home": (6, 0),
+}
+
+# 各接口使用的缓存命名空间，每个用例开始前全部失效
+NAMESPACES = ("articles", "projects", "books", "figures", "tools", "timeline", "favorite_images", "home")
+
+
+@pytest.fixture(scope="module")
+def query_counter(client):
+    counter = {"queries": 0}
+
+    def count_query(*_):
+        counter["queries"] += 1
+
+    engine = database.async_engine.sync_engine
+    event.listen(engine, "after_cursor_execute", count_query)
+    query_budget.enable(engine)
+    mode = query_budget.MODE
+    query_budget.MODE = "raise"
+    yield counter
+    query_budget.MODE = mode
+    event.remove(engine, "after_cursor_execute", query_budget._after_cursor_execute)
+    event.remove(engine, "after_cursor_execute", count_query)
+
+
+@pytest.fixture(scope="module")
+def path_params(client):
+    image = client.post("/api/favorite-images", json={"url": "https://example.com/budget.jpg"}).json()
+
+    def first_published(*columns):
+        model = columns[0].class_
+        return conn.execute(select(*columns).where(model.status == 1).order_by(model.id)).first()
+
+    with database.engine.connect() as conn:
+        article = first_published(Article.slug, Article.category)
+        params = {
+            "article_slug": article.slug,
+            "article_category": article.category,
+            "project_slug": first_published(Project.slug).slug,
+            "book_id": first_published(Book.id).id,
+            "figure_id": first_published(Figure.id).id,
+            "tool_id": first_published(Tool.id).id,
+            "image_id": image["id"],
+        }
+    yield params
+    client.delete(f"/api/favorite-images/{image['id']}")
+
+
+@pytest.mark.parametrize("template, expected", EXPECTED.items(), ids=list(EXPECTED))
+def test_query_count(client, query_counter, path_params, template, expected):
+    path = template.format(**path_params)
+    cache.invalidate(*NAMESPACES)
+
+    counts = []
+    for _ in expected:
+        query_counter["queries"] = 0
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+        counts.append(query_counter["queries"])
+
+    assert tuple(counts) == expected
@@ -0,0 +1,40 @@
+# @responses.cached 只缓存正常结果: 接口出错时返回 500 且不写入缓存，恢复后的下一次请求返回真实数据
+import pytest
+
+import cache
+import category_index
+from crud import articles, favorite_images
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError("数据库暂时不可用")
+
+
+@pytest.fixture
+def favorite_image(client):
+    response = client.post("/api/favorite-images", json={"url": "https://example.com/a.jpg"})
+    assert response.status_code == 200
+    yield response.json()["id"]
+    client.delete(f"/api/favorite-images/{response.json()['id']}")
+
+
+@pytest.mark.parametrize("path, namespace, module, name, check", [
+    ("/api/tags", "articles", articles, "count_tags", lambda body: body["tags"]),
+    ("/api/articles/categories", "articles", category_index, "snapshot", lambda body: body["categories"]),
+    ("/api/favorite-images", "favorite_images", favorite_images, "select", lambda body: body),
+])
+def test_error_is_not_cached(client, favorite_image, monkeypatch, path, namespace, module, name, check):
+    cache.invalidate(namespace)
+
+    monkeypatch.setattr(module, name, _fail)
+    failed = client.get(path)
+    assert failed.status_code == 500
+    assert "etag" not in failed.headers
+
+    monkeypatch.undo()
+    recovered = client.get(path)
+    assert recovered.status_code == 200
+    assert check(recovered.json())
+
+    # 缓存中保存的是恢复后的真实数据
+    assert client.get(path).json() == recovered.json()
@@ -0,0 +1,57 @@
+# 关键词搜索: MySQL 缺少全文索引(错误 1191)时退回 LIKE 匹配
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import search
+from database import Book
+
+
+class FakeMySQLSession:
+    def __init__(self, error_code=None):
+        self.error_code = error_code
+        self.executed = 0
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+
+    async def execute(self, stmt):
+        self.executed += 1
+        if self.error_code is not None:
+            raise OperationalError("SELECT ... MATCH", {}, Exception(self.error_code, "模拟的 MySQL 错误"))
+
+
+@pytest.fixture(autouse=True)
+def reset_probe_cache():
+    search._fulltext_tables.clear()
+    yield
+    search._fulltext_tables.clear()
+
+
+def test_missing_fulltext_index_falls_back_to_like():
+    db = FakeMySQLSession(search.ER_FT_MATCHING_KEY_NOT_FOUND)
+    columns = [Book.title, Book.description]
+
+    condition, relevance = asyncio.run(search.search_condition(db, columns, "Python"))
+    assert relevance is None
+    assert "LIKE" in str(condition).upper()
+
+    # 探测结果按表缓存，之后的搜索不再重复探测
+    asyncio.run(search.search_condition(db, columns, "Python"))
+    assert db.executed == 1
+
+
+def test_fulltext_index_is_used_when_present():
+    db = FakeMySQLSession()
+    condition, relevance = asyncio.run(search.search_condition(db, [Book.title, Book.description], "Python"))
+    assert relevance is not None
+    assert db.executed == 1
+
+
+def test_other_database_errors_are_raised():
+    db = FakeMySQLSession(2013)
+    with pytest.raises(OperationalError):
+        asyncio.run(search.search_condition(db, [Book.title, Book.description], "Python"))
+    assert "books" not in search._fulltext_tables
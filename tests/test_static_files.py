@@ -0,0 +1,90 @@
+# 文件响应: 服务器声明 zerocopysend 扩展时发送文件描述符；压缩中间件转发扩展消息前先发送响应头
+import asyncio
+import os
+
+import pytest
+
+from compression import CompressionMiddleware
+from conftest import INDEX_HTML
+from static_files import ZeroCopyFileResponse
+
+CONTENT = b"0123456789" * 100
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    path = os.path.join(tmp_path, "book.pdf")
+    with open(path, "wb") as f:
+        f.write(CONTENT)
+    return path
+
+
+def _scope(extensions, headers=(), path="/books/book.pdf"):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"testserver")] + [(name.encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        "extensions": extensions,
+    }
+
+
+def _run(response, scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            # 模拟服务器用文件描述符发送，记录实际发送的内容
+            message = dict(message, data=os.pread(message["file"].fileno(), message["count"], message["offset"]))
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+# file_response() 传入清单中的 stat_result，直接构造时由响应自行获取文件大小
+@pytest.mark.parametrize("with_stat", [True, False])
+def test_zerocopysend_when_server_supports_it(file_path, with_stat):
+    response = ZeroCopyFileResponse(file_path, stat_result=os.stat(file_path) if with_stat else None)
+    messages = _run(response, _scope({"http.response.zerocopysend": {}}))
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.zerocopysend"]
+    assert messages[1]["data"] == CONTENT
+
+
+def test_zerocopysend_single_range(file_path):
+    messages = _run(ZeroCopyFileResponse(file_path),
+                    _scope({"http.response.zerocopysend": {}}, [("range", "bytes=10-19")]))
+    assert messages[0]["status"] == 206
+    assert messages[1]["type"] == "http.response.zerocopysend"
+    assert messages[1]["data"] == CONTENT[10:20]
+
+
+def test_falls_back_to_body_without_extension(file_path):
+    messages = _run(ZeroCopyFileResponse(file_path), _scope({}))
+    assert messages[0]["type"] == "http.response.start"
+    assert b"".join(message.get("body", b"") for message in messages[1:]) == CONTENT
+
+
+def test_compression_forwards_start_before_extension_message(file_path):
+    app = CompressionMiddleware(ZeroCopyFileResponse(file_path, media_type="text/plain"), path_prefix="/")
+    messages = _run(app, _scope({"http.response.zerocopysend": {}}, [("accept-encoding", "gzip")]))
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.zerocopysend"]
+    assert messages[1]["data"] == CONTENT
+
+
+# 经过完整的中间件栈(指标、CORS、压缩、ETag)，扩展消息不被中间件拦截
+@pytest.mark.parametrize("headers, status, body", [
+    ((), 200, INDEX_HTML),
+    ((("range", "bytes=0-14"),), 206, INDEX_HTML[:15]),
+    ((("accept-encoding", "gzip, br"),), 200, INDEX_HTML),
+])
+def test_zerocopysend_through_full_app(client, headers, status, body):
+    import main
+
+    messages = _run(main.app, _scope({"http.response.zerocopysend": {}}, headers, path="/index.html"))
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.zerocopysend"]
+    assert messages[0]["status"] == status
+    assert messages[1]["data"] == body